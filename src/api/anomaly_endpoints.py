@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 import asyncio
 import json
+import uuid
 import logging
 import pytz
 
@@ -16,11 +17,20 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from simulation.opendss_anomaly_simulator import (
+# One package root with backend_server (src.simulation), so the scheduler and
+# load flow classes shared with it are the same classes
+from src.simulation.opendss_anomaly_simulator import (
     OpenDSSAnomalySimulator,
     AnomalyType,
-    AnomalyProfile
+    AnomalyProfile,
+    run_scenario_in_worker
 )
+from src.simulation.anomaly_dataset import AnomalyDatasetGenerator
+from src.simulation.anomaly_scheduler import AnomalyScheduler, AnomalyTimeline, RAMP_PROFILES, ScheduledAnomaly
+from src.simulation.solver_service import timeline_in_worker
+from src.config import Config
+from src.api.job_endpoints import get_job_manager, job_accepted, submit_job
+from src.services.state_broadcaster import StateBroadcaster
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +39,12 @@ router = APIRouter(prefix="/api/simulation", tags=["simulation"])
 
 # Global simulator instance and active anomaly tracking
 anomaly_simulator = None
-active_anomaly = None
+active_anomalies: Dict[str, Dict[str, Any]] = {}  # Anomaly records by id; timing lives in the scheduler
 active_anomaly_task = None
+_anomaly_scheduler = None  # Used when the main load flow engine is not running
 _load_flow_engine = None  # Reference to the main load flow engine
+DSS_FILE = Path(__file__).parent.parent / "models" / "IndianEHVSubstation.dss"
+_state_stream = None  # Shared producer for /ws/anomaly subscribers
 
 def set_load_flow_engine(engine):
     """Set reference to the main load flow engine"""
@@ -39,57 +52,80 @@ def set_load_flow_engine(engine):
     _load_flow_engine = engine
     logger.info("Load flow engine reference set for anomaly simulation")
 
-def get_active_anomaly():
-    """Get the currently active anomaly"""
-    return active_anomaly
-
-def apply_anomaly_to_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
-    """Apply active anomaly modifications to metrics"""
-    global active_anomaly
-    logger.info(f"🔍 apply_anomaly_to_metrics called, active_anomaly: {active_anomaly}")
-
-    if not active_anomaly:
-        logger.info("No active anomaly, returning metrics unchanged")
-        return metrics
-
+def get_anomaly_scheduler() -> AnomalyScheduler:
+    """Anomaly scheduler of the main load flow engine (a local one if it is not running)"""
+    global _anomaly_scheduler
     try:
-        anomaly_type = active_anomaly.get('type')
-        params = active_anomaly.get('parameters', {})
-        logger.info(f"Applying anomaly type: {anomaly_type}, params: {params}")
-
-        # Apply frequency deviation
-        if anomaly_type == 'frequency_deviation':
-            deviation = params.get('deviation', 0.3)
-            freq_type = params.get('type', 'under')
-            # Get current frequency (which has normal variations) and apply deviation
-            current_freq = metrics.get('frequency', 50.0)
-            if freq_type == 'under':
-                metrics['frequency'] = current_freq - deviation
-            else:
-                metrics['frequency'] = current_freq + deviation
-
-        # Apply voltage sag
-        elif anomaly_type == 'voltage_sag':
-            severity = active_anomaly.get('severity', 0.85)
-            metrics['voltage_400kv'] = metrics.get('voltage_400kv', 400) * severity
-            metrics['voltage_220kv'] = metrics.get('voltage_220kv', 220) * severity
-
-        # Apply voltage surge
-        elif anomaly_type == 'voltage_surge':
-            severity = active_anomaly.get('severity', 1.12)
-            metrics['voltage_400kv'] = metrics.get('voltage_400kv', 400) * severity
-            metrics['voltage_220kv'] = metrics.get('voltage_220kv', 220) * severity
-
-        # Apply transformer overload
-        elif anomaly_type == 'overload' or anomaly_type == 'transformer_overload':
-            load_factor = params.get('load_factor', 1.2)
-            metrics['total_load'] = metrics.get('total_load', 0) * load_factor
-            metrics['total_power'] = metrics.get('total_power', 0) * load_factor
-            metrics['efficiency'] = max(0, metrics.get('efficiency', 0) - 25)  # Reduce efficiency
-
-        logger.debug(f"Applied {anomaly_type} anomaly to metrics")
+        import src.backend_server as backend
+        if getattr(backend, 'load_flow', None):
+            return backend.load_flow.anomalies
     except Exception as e:
-        logger.error(f"Error applying anomaly to metrics: {e}")
+        logger.debug(f"Main load flow engine unavailable: {e}")
+    if _anomaly_scheduler is None:
+        _anomaly_scheduler = AnomalyScheduler()
+    return _anomaly_scheduler
+
+def get_active_anomalies() -> List[Dict[str, Any]]:
+    """Records of the anomalies in effect now, with their current intensity"""
+    scheduler = get_anomaly_scheduler()
+    states = {state['id']: state for state in scheduler.active()}
+    for anomaly_id in [a for a in active_anomalies if scheduler.get(a) is None]:
+        del active_anomalies[anomaly_id]
+    return [{**record, 'intensity': states[anomaly_id]['intensity']}
+            for anomaly_id, record in active_anomalies.items() if anomaly_id in states]
+
+def _anomaly_record(anomaly: ScheduledAnomaly, location: Optional[str] = None,
+                    severity: Optional[float] = None) -> Dict[str, Any]:
+    record = {
+        'id': anomaly.id,
+        'type': anomaly.type,
+        'location': location or anomaly.location or anomaly.parameters.get('location'),
+        'severity': severity if severity is not None else anomaly.parameters.get('severity'),
+        'parameters': anomaly.parameters,
+        'start_time': datetime.now().isoformat(),
+        'start': anomaly.start,  # Scheduler clock seconds
+        'duration': anomaly.duration,
+        'ramp': anomaly.ramp
+    }
+    active_anomalies[anomaly.id] = record
+    return record
+
+def apply_anomaly_to_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the modifications of every active anomaly to metrics, scaled by its ramp"""
+    for anomaly in get_active_anomalies():
+        try:
+            anomaly_type = anomaly.get('type')
+            params = anomaly.get('parameters') or {}
+            k = anomaly.get('intensity', 1.0)
+
+            # Apply frequency deviation
+            if anomaly_type == 'frequency_deviation':
+                deviation = params.get('deviation', 0.3) * k
+                # Get current frequency (which has normal variations) and apply deviation
+                current_freq = metrics.get('frequency', 50.0)
+                if params.get('type', 'under') == 'under':
+                    metrics['frequency'] = current_freq - deviation
+                else:
+                    metrics['frequency'] = current_freq + deviation
+
+            # Apply voltage sag / surge
+            elif anomaly_type in ('voltage_sag', 'voltage_surge'):
+                default = 0.85 if anomaly_type == 'voltage_sag' else 1.12
+                severity = anomaly.get('severity')
+                factor = 1.0 + ((severity if severity is not None else default) - 1.0) * k
+                metrics['voltage_400kv'] = metrics.get('voltage_400kv', 400) * factor
+                metrics['voltage_220kv'] = metrics.get('voltage_220kv', 220) * factor
+
+            # Apply transformer overload
+            elif anomaly_type == 'overload' or anomaly_type == 'transformer_overload':
+                load_factor = 1.0 + (params.get('load_factor', 1.2) - 1.0) * k
+                metrics['total_load'] = metrics.get('total_load', 0) * load_factor
+                metrics['total_power'] = metrics.get('total_power', 0) * load_factor
+                metrics['efficiency'] = max(0, metrics.get('efficiency', 0) - 25 * k)  # Reduce efficiency
+
+            logger.debug(f"Applied {anomaly_type} anomaly to metrics")
+        except Exception as e:
+            logger.error(f"Error applying anomaly to metrics: {e}")
 
     return metrics
 
@@ -97,11 +133,9 @@ def get_simulator():
     """Get or create anomaly simulator instance"""
     global anomaly_simulator
     if anomaly_simulator is None:
-        # Use the correct DSS file path
-        dss_file = Path(__file__).parent.parent / "models" / "IndianEHVSubstation.dss"
-        if not dss_file.exists():
-            raise FileNotFoundError(f"DSS file not found: {dss_file}")
-        anomaly_simulator = OpenDSSAnomalySimulator(str(dss_file))
+        if not DSS_FILE.exists():
+            raise FileNotFoundError(f"DSS file not found: {DSS_FILE}")
+        anomaly_simulator = OpenDSSAnomalySimulator(str(DSS_FILE))
     return anomaly_simulator
 
 # Request models
@@ -110,6 +144,17 @@ class AnomalyRequest(BaseModel):
     severity: Optional[float] = None  # Severity in p.u. or load factor
     location: Optional[str] = "Bus220_1"  # Bus or component
     parameters: Optional[Dict[str, Any]] = {}  # Additional parameters like transformer, harmonic_order, etc.
+    duration: Optional[float] = None  # Seconds on the scheduler clock; None = until cleared
+    ramp: str = "step"  # step, linear or smooth
+    ramp_time: float = 0.0  # Seconds to reach (and leave) full severity
+
+class TimelineRequest(BaseModel):
+    anomalies: List[Dict[str, Any]]  # ScheduledAnomaly fields: type, parameters, start, duration, ramp, ramp_time, location
+    duration: Optional[float] = None  # Defaults to the end of the last anomaly
+    speed: Optional[float] = 60.0  # Timeline seconds per wall-clock second; None = unpaced (jobs only)
+    step: float = 1.0  # Timeline seconds between solves (jobs only)
+    start_time: Optional[str] = None  # ISO time the load pattern starts at (jobs only; default now)
+    live: bool = False  # Play on the running twin instead of in a job
 
 class SimulationScenarioRequest(BaseModel):
     scenario: str  # Scenario name
@@ -131,6 +176,7 @@ class AnomalyResponse(BaseModel):
 
 class SimulationStatusResponse(BaseModel):
     active_anomalies: List[Dict[str, Any]]
+    scheduler: Dict[str, Any] = {}
     system_state: Dict[str, Any]
     timestamp: str
 
@@ -149,22 +195,21 @@ async def trigger_anomaly(request: AnomalyRequest):
     - breaker_failure, switching_transient
     - capacitor_failure, capacitor_switching
     - frequency_deviation, power_oscillation
-    """
-    global active_anomaly, active_anomaly_task
 
+    Anomalies run concurrently with any already active. With duration set
+    the anomaly ends by itself; ramp/ramp_time shape how it develops.
+    """
     try:
-        # Check if another anomaly is currently active
-        if active_anomaly is not None:
-            raise HTTPException(
-                status_code=409,
-                detail=f"Another anomaly '{active_anomaly['type']}' is currently active. Please wait for it to complete or stop it first."
-            )
+        if request.ramp not in RAMP_PROFILES:
+            raise HTTPException(status_code=400, detail=f"Unknown ramp profile: {request.ramp}")
+        if (request.duration is not None and request.duration < 0) or request.ramp_time < 0:
+            raise HTTPException(status_code=400, detail="duration and ramp_time must not be negative")
 
         # Use severity value (defaults to 0.7 for moderate severity)
         severity_value = request.severity if request.severity is not None else 0.7
 
-        # Generate anomaly ID
-        anomaly_id = f"ANM_{datetime.now().strftime('%Y%m%d%H%M%S')}_{request.type}"
+        # Generate anomaly ID (unique while several anomalies of one type are active)
+        anomaly_id = f"ANM_{datetime.now().strftime('%Y%m%d%H%M%S')}_{request.type}_{uuid.uuid4().hex[:4]}"
 
         # === GENERATE INSIGHTS & STORE ALERT FIRST (before simulation) ===
         # Get predefined insights for this anomaly type
@@ -333,28 +378,14 @@ async def trigger_anomaly(request: AnomalyRequest):
                 'insights': insights
             }
 
-        # Store active anomaly info for persistence (use global variable from function start)
-        active_anomaly = {
-            'id': anomaly_id,
-            'type': request.type,
-            'location': request.location,
-            'severity': severity_value,
-            'parameters': request.parameters,  # Store parameters for applying anomaly
-            'start_time': datetime.now().isoformat()
-        }
-        logger.info(f"🔥 Active anomaly SET: {active_anomaly}")
-
-        # *** INJECT ANOMALY INTO OPENDSS CIRCUIT ***
-        try:
-            import src.backend_server as backend
-            if hasattr(backend, 'load_flow') and backend.load_flow:
-                # Set anomaly in load_flow - it will be injected before next solve()
-                backend.load_flow.set_anomaly(request.type, request.parameters)
-                logger.info(f"✅ Anomaly injected into OpenDSS load_flow: {request.type}")
-            else:
-                logger.warning("load_flow not available - anomaly will only modify metrics, not OpenDSS circuit")
-        except Exception as inject_error:
-            logger.error(f"Failed to inject anomaly into OpenDSS circuit: {inject_error}")
+        # *** SCHEDULE ANOMALY IN THE OPENDSS CIRCUIT ***
+        # The load flow engine composes all active anomalies before each solve()
+        scheduled = get_anomaly_scheduler().start_now(
+            request.type, request.parameters,
+            id=anomaly_id, duration=request.duration, ramp=request.ramp, ramp_time=request.ramp_time
+        )
+        record = _anomaly_record(scheduled, location=request.location, severity=severity_value)
+        logger.info(f"🔥 Active anomaly SET: {record}")
 
         # NOTE: Auto-clear disabled - user must manually clear via /clear endpoint
         # asyncio.create_task(clear_anomaly_after_delay(
@@ -376,15 +407,25 @@ async def trigger_anomaly(request: AnomalyRequest):
         logger.info(f"Anomaly triggered: {anomaly_id}")
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error triggering anomaly: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _scenario_job(job, dss_file: str, scenario: str) -> List[Dict[str, Any]]:
+    """Run a scenario in a job worker process, which holds its own OpenDSS engine"""
+    result = await get_job_manager().run_in_process(run_scenario_in_worker, dss_file, scenario)
+    return process_scenario_results(result)
+
 @router.post("/scenario")
-async def run_scenario(request: SimulationScenarioRequest):
+async def run_scenario(request: SimulationScenarioRequest, background: bool = False):
     """
     Run predefined anomaly scenarios
 
+    The scenario runs as a background job. With background=true the job ID is
+    returned immediately (202); poll /api/jobs/{job_id} for its result.
+
     Available scenarios:
     - voltage_collapse: Progressive voltage collapse
     - cascading_failure: Cascading outage scenario
@@ -393,13 +434,15 @@ async def run_scenario(request: SimulationScenarioRequest):
     - protection_misoperation: Relay misoperation scenario
     """
     try:
-        simulator = get_simulator()
-
-        # Run the requested scenario
-        result = simulator.run_anomaly_scenario(request.scenario)
+        if not DSS_FILE.exists():
+            raise FileNotFoundError(f"DSS file not found: {DSS_FILE}")
+        job = submit_job("anomaly_scenario", _scenario_job, str(DSS_FILE), request.scenario,
+                         params={"scenario": request.scenario})
+        if background:
+            return job_accepted(job)
 
-        # Process results for frontend
-        processed_result = process_scenario_results(result)
+        # Processed for the frontend in the job
+        processed_result = await get_job_manager().wait(job)
 
         return {
             "success": True,
@@ -408,6 +451,8 @@ async def run_scenario(request: SimulationScenarioRequest):
             "stages": processed_result
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error running scenario: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -415,19 +460,15 @@ async def run_scenario(request: SimulationScenarioRequest):
 @router.get("/status", response_model=SimulationStatusResponse)
 async def get_simulation_status():
     """Get current simulation status and active anomalies"""
-    global active_anomaly
     try:
         simulator = get_simulator()
 
         # Get current system state
         system_state = simulator._capture_system_state()
 
-        # Get list of active anomalies from global variable
-        active_anomalies = [active_anomaly] if active_anomaly else []
-        logger.info(f"🔍 Status endpoint: active_anomaly = {active_anomaly}")
-
         return SimulationStatusResponse(
-            active_anomalies=active_anomalies,
+            active_anomalies=get_active_anomalies(),
+            scheduler=get_anomaly_scheduler().get_status(),
             system_state=simplify_system_state(system_state),
             timestamp=datetime.now().isoformat()
         )
@@ -439,7 +480,7 @@ async def get_simulation_status():
 @router.post("/clear")
 async def clear_all_anomalies():
     """Clear all active anomalies and restore normal operation"""
-    global active_anomaly, active_anomaly_task
+    global active_anomaly_task
 
     try:
         simulator = get_simulator()
@@ -448,19 +489,12 @@ async def clear_all_anomalies():
         simulator._initialize_dss()
 
         # Clear the active anomaly tracking
-        active_anomaly = None
+        active_anomalies.clear()
         active_anomaly_task = None
 
-        # *** CLEAR ANOMALY FROM OPENDSS CIRCUIT ***
-        try:
-            import src.backend_server as backend
-            if hasattr(backend, 'load_flow') and backend.load_flow:
-                backend.load_flow.clear_anomaly()
-                logger.info("✅ Anomaly cleared from OpenDSS load_flow")
-            else:
-                logger.warning("load_flow not available")
-        except Exception as clear_error:
-            logger.error(f"Failed to clear anomaly from OpenDSS circuit: {clear_error}")
+        # *** CLEAR ANOMALIES FROM OPENDSS CIRCUIT ***
+        get_anomaly_scheduler().clear()
+        logger.info("✅ Anomalies cleared from the load flow scheduler")
 
         return {
             "success": True,
@@ -472,63 +506,168 @@ async def clear_all_anomalies():
         logger.error(f"Error clearing anomalies: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/generate-dataset")
-async def generate_training_dataset(num_samples: int = 1000):
-    """Generate anomaly dataset for AI/ML training"""
+@router.delete("/anomaly/{anomaly_id}")
+async def clear_anomaly(anomaly_id: str):
+    """Clear one active or scheduled anomaly, leaving the others running"""
+    if not get_anomaly_scheduler().cancel(anomaly_id):
+        raise HTTPException(status_code=404, detail=f"Anomaly not found: {anomaly_id}")
+    active_anomalies.pop(anomaly_id, None)
+    return {
+        "success": True,
+        "anomaly_id": anomaly_id,
+        "timestamp": datetime.now().isoformat()
+    }
+
+async def _timeline_job(job, dss_file: str, timeline: Dict[str, Any], step: float,
+                        speed: Optional[float], start_time: Optional[str]) -> List[Dict[str, Any]]:
+    """Play a timeline in a job worker process, which holds its own OpenDSS engine"""
+    return await get_job_manager().run_in_process(timeline_in_worker, dss_file, timeline,
+                                                  step, speed, start_time)
+
+@router.post("/timeline")
+async def play_timeline(request: TimelineRequest, background: bool = False):
+    """
+    Play a scripted timeline of concurrent anomalies faster than real time
+
+    With live=true the timeline replaces the running twin's anomalies and its
+    clock restarts at 0, running at speed x real time until the timeline ends
+    or /clear is called. Otherwise the timeline
+    is solved every step seconds in a background job and the job result holds
+    one load flow sample per step (speed=null solves as fast as possible);
+    with background=true the job ID is returned immediately (202).
+    """
     try:
-        simulator = get_simulator()
+        timeline = AnomalyTimeline.from_dict({"anomalies": request.anomalies,
+                                              "duration": request.duration})
+        if request.start_time:
+            datetime.fromisoformat(request.start_time)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.step <= 0 or (request.speed is not None and request.speed <= 0):
+        raise HTTPException(status_code=400, detail="step and speed must be positive")
 
-        # Generate dataset
-        dataset = simulator.generate_anomaly_dataset(num_samples)
+    try:
+        if request.live:
+            if request.speed is None:
+                raise HTTPException(status_code=400, detail="Live playback needs a speed")
+            active_anomalies.clear()
+            get_anomaly_scheduler().load_timeline(timeline.anomalies, speed=request.speed,
+                                                 duration=timeline.duration)
+            for anomaly in timeline.anomalies:
+                _anomaly_record(anomaly)
+            return {
+                "success": True,
+                "live": True,
+                "duration": timeline.duration,
+                "speed": request.speed,
+                "wall_seconds": timeline.duration / request.speed,
+                "timestamp": datetime.now().isoformat()
+            }
 
-        # Save to CSV
-        filename = f"anomaly_dataset_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv"
-        dataset.to_csv(filename, index=False)
+        if not DSS_FILE.exists():
+            raise FileNotFoundError(f"DSS file not found: {DSS_FILE}")
+        job = submit_job("anomaly_timeline", _timeline_job, str(DSS_FILE), timeline.to_dict(),
+                         request.step, request.speed, request.start_time,
+                         params={"events": len(timeline.anomalies), "duration": timeline.duration,
+                                 "step": request.step, "speed": request.speed})
+        if background:
+            return job_accepted(job)
 
-        # Get statistics
-        stats = {
-            "total_samples": len(dataset),
-            "normal_samples": len(dataset[dataset['label'] == 0]),
-            "anomaly_samples": len(dataset[dataset['label'] == 1]),
-            "anomaly_types": dataset['anomaly_type'].value_counts().to_dict(),
-            "features": dataset.columns.tolist()
+        samples = await get_job_manager().wait(job)
+        return {
+            "success": True,
+            "duration": timeline.duration,
+            "timestamp": datetime.now().isoformat(),
+            "samples": samples
         }
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error playing timeline: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _dataset_job(job, generator: AnomalyDatasetGenerator, num_samples: int,
+                 filename: str, format: str) -> Dict[str, Any]:
+    """Generate a dataset in worker processes; each finished shard reports progress"""
+    stats = generator.generate(num_samples, filename, format, progress=job.update_progress)
+    return {"filename": filename, "statistics": stats}
+
+@router.post("/generate-dataset")
+async def generate_training_dataset(num_samples: int = 1000, format: str = "csv",
+                                    workers: Optional[int] = None, seed: Optional[int] = None,
+                                    background: bool = False):
+    """Generate anomaly dataset for AI/ML training (csv or parquet, streamed to disk)
+
+    Runs as a background job; with background=true the job ID is returned
+    immediately (202) and progress is reported per shard at /api/jobs/{job_id}.
+    """
+    try:
+        if format not in ("csv", "parquet"):
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+        if not DSS_FILE.exists():
+            raise FileNotFoundError(f"DSS file not found: {DSS_FILE}")
+        generator = AnomalyDatasetGenerator(str(DSS_FILE),
+                                            workers=workers or Config.DATASET_WORKERS or None,
+                                            seed=seed)
+        filename = f"anomaly_dataset_{datetime.now().strftime('%Y%m%d%H%M%S')}.{format}"
+
+        # Shards are generated in worker processes with their own circuits
+        job = submit_job("anomaly_dataset", _dataset_job, generator, num_samples, filename, format,
+                         params={"num_samples": num_samples, "format": format,
+                                 "workers": generator.workers, "seed": generator.seed})
+        if background:
+            return job_accepted(job)
+        result = await get_job_manager().wait(job)
+
         return {
             "success": True,
-            "filename": filename,
-            "statistics": stats,
+            "filename": result["filename"],
+            "statistics": result["statistics"],
             "timestamp": datetime.now().isoformat()
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating dataset: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _capture_state_message() -> str:
+    """One state_update message, serialized once for every subscriber"""
+    state = get_simulator()._capture_system_state()
+    return json.dumps({
+        "type": "state_update",
+        "data": simplify_system_state(state),
+        "timestamp": datetime.now().isoformat()
+    })
+
+def get_state_stream() -> StateBroadcaster:
+    """Get or create the shared anomaly state stream"""
+    global _state_stream
+    if _state_stream is None:
+        _state_stream = StateBroadcaster(_capture_state_message, interval=1.0, queue_size=4)
+    return _state_stream
+
 @router.websocket("/ws/anomaly")
 async def anomaly_websocket(websocket: WebSocket):
-    """WebSocket for real-time anomaly updates"""
+    """WebSocket for real-time anomaly updates
+
+    All connections share one state capture per second; a client that falls
+    behind skips to the newest states instead of slowing down the others.
+    """
     await websocket.accept()
+    stream = get_state_stream()
+    updates = stream.subscribe()
 
     try:
-        simulator = get_simulator()
-
         while True:
-            # Send system state every second
-            state = simulator._capture_system_state()
-            simplified_state = simplify_system_state(state)
-
-            await websocket.send_json({
-                "type": "state_update",
-                "data": simplified_state,
-                "timestamp": datetime.now().isoformat()
-            })
-
-            await asyncio.sleep(1)
+            await websocket.send_text(await updates.get())
 
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        stream.unsubscribe(updates)
         await websocket.close()
 
 # Helper functions
@@ -975,8 +1114,8 @@ def calculate_anomaly_impact(result: Dict, anomaly_type: str) -> Dict[str, Any]:
     if 'buses' in result:
         voltages = []
         for bus_data in result['buses'].values():
-            if 'voltage_pu' in bus_data:
-                voltages.extend(bus_data['voltage_pu'])
+            if 'voltage_pu_mag' in bus_data:
+                voltages.extend(bus_data['voltage_pu_mag'])
 
         if voltages:
             impact["voltage_deviation"] = max(abs(1.0 - v) for v in voltages) * 100
@@ -1020,8 +1159,8 @@ def generate_visualization_data(result: Dict, anomaly_type: str) -> Dict[str, An
     # Extract affected components from result
     if 'buses' in result:
         for bus_name, bus_data in result['buses'].items():
-            if 'voltage_mag' in bus_data:
-                v_mag = bus_data['voltage_mag']
+            if 'voltage_pu_mag' in bus_data:
+                v_mag = bus_data['voltage_pu_mag']
                 if any(v < 0.95 or v > 1.05 for v in v_mag):
                     viz_data["affected_buses"].append(bus_name)
 
@@ -1041,10 +1180,10 @@ def simplify_system_state(state: Dict) -> Dict:
     # Extract key metrics
     if 'buses' in state:
         for bus_name, bus_data in state['buses'].items():
-            if 'voltage_mag' in bus_data:
+            if 'voltage_pu_mag' in bus_data:
                 simplified["bus_voltages"][bus_name] = {
-                    "voltage_pu": sum(bus_data['voltage_mag']) / len(bus_data['voltage_mag'])
-                        if bus_data['voltage_mag'] else 1.0
+                    "voltage_pu": sum(bus_data['voltage_pu_mag']) / len(bus_data['voltage_pu_mag'])
+                        if bus_data['voltage_pu_mag'] else 1.0
                 }
 
     if 'summary' in state:
@@ -202,6 +202,7 @@ async def activate_dss_version(version_id: int):
                 temp_dss_path = dss_file_path.parent / "active_circuit.dss"
                 temp_dss_path.write_text(version['content'])
                 load_flow_analyzer.load_circuit(str(temp_dss_path))
+                load_flow_analyzer.fault_study.invalidate()
                 load_flow_analyzer.solve()
                 reload_success = True
                 logger.info(f"Activated and reloaded DSS version {version['version_number']}")
@@ -0,0 +1,87 @@
+"""
+Background Job API Endpoints
+Status polling, results and cancellation of long-running simulation jobs
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from src.config import Config
+from src.services.job_manager import Job, JobManager, JobQueueFull
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Global job manager instance
+_job_manager: Optional[JobManager] = None
+
+def get_job_manager() -> JobManager:
+    """Get or create the job manager"""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(Config.JOB_RESULTS_DIR,
+                                  max_concurrent=Config.JOB_WORKERS,
+                                  max_pending=Config.JOB_MAX_PENDING)
+    return _job_manager
+
+def shutdown_job_manager():
+    """Cancel running jobs and stop job worker processes"""
+    if _job_manager is not None:
+        _job_manager.shutdown()
+
+def submit_job(kind: str, fn: Callable[..., Any], *args, params: Optional[Dict[str, Any]] = None) -> Job:
+    """Queue a job, answering 429 when the queue is full"""
+    try:
+        return get_job_manager().submit(kind, fn, *args, params=params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+def job_accepted(job: Job, **extra: Any) -> JSONResponse:
+    """202 response pointing the client at the job's status URL (plus any extra fields)"""
+    return JSONResponse(status_code=202, content={
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status.value,
+        "status_url": f"{router.prefix}/{job.id}",
+        "result_url": f"{router.prefix}/{job.id}/result",
+        **extra
+    })
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.get("")
+async def list_jobs(kind: Optional[str] = Query(None, description="Only jobs of this kind")):
+    """Known jobs, newest first"""
+    manager = get_job_manager()
+    return {
+        "jobs": [job.to_dict() for job in manager.list_jobs(kind)],
+        "stats": manager.get_stats()
+    }
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a job"""
+    return _get_job(job_id).to_dict()
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Result of a succeeded job"""
+    job = _get_job(job_id)
+    if not job.has_result:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status.value}, no result available")
+    return {"job_id": job_id, "kind": job.kind, "result": get_job_manager().result(job_id)}
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = _get_job(job_id)
+    if not get_job_manager().cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already {job.status.value}")
+    return {"job_id": job_id, "cancel_requested": True, "status": job.status.value}
@@ -30,17 +30,24 @@ from src.config import Config
 from src.data_manager import data_manager
 from src.integration.scada_integration import SCADAIntegrationManager
 from src.simulation.load_flow import LoadFlowAnalysis
+from src.simulation.solver_service import (SolverService, SolveResult, fault_in_worker,
+                                           fault_levels_in_worker, qsts_in_worker)
+from src.simulation.solve_cache import SolveResultCache
 from src.models.ai_ml_models import SubstationAIManager
 from src.models.asset_models import SubstationAssetManager  # Import asset manager
+from src.models.asset_mapping import AssetResultMapper
 from src.monitoring.real_time_monitor import RealTimeMonitor
 from src.visualization.circuit_visualizer import OpenDSSVisualizer as CircuitVisualizer
-from src.api.anomaly_endpoints import router as anomaly_router
+from src.api.anomaly_endpoints import router as anomaly_router, get_state_stream
 from src.api.asset_endpoints import router as asset_router
 from src.api.historical_endpoints import router as historical_router
 from src.api.alerts_endpoints import router as alerts_router
 from src.api.threshold_endpoints import router as threshold_router
 from src.api.dss_endpoints import router as dss_router
 from src.api.circuit_topology_endpoints import router as circuit_router
+from src.api.job_endpoints import router as job_router
+from src.api.job_endpoints import get_job_manager, job_accepted, shutdown_job_manager, submit_job
+from src.services.job_manager import JobStatus
 from src.database import db  # Import database module
 from src.monitoring import alert_service, ai_insights_service
 
@@ -66,6 +73,7 @@ app.include_router(alerts_router)
 app.include_router(threshold_router)
 app.include_router(dss_router)
 app.include_router(circuit_router)
+app.include_router(job_router)
 
 # Add CORS middleware
 app.add_middleware(
@@ -79,10 +87,13 @@ app.add_middleware(
 # Global instances
 scada = None
 load_flow = None
+solver_service = None  # Out-of-process OpenDSS solves
+solve_cache = SolveResultCache(freshness_seconds=Config.SOLVE_CACHE_FRESHNESS)  # Shared recent solve results
 ai_manager = None
 monitor = None
 visualizer = None
 asset_manager = None  # Add asset manager instance
+asset_mapper = None  # DSS result -> asset index
 connected_websockets = []
 
 # Data models
@@ -98,6 +109,11 @@ class SimulationRequest(BaseModel):
     scenario: str
     parameters: Dict[str, Any]
 
+class QSTSRequest(BaseModel):
+    start: Optional[datetime] = None  # default: 1 January of the current year
+    hours: int = 8760
+    step_minutes: int = 60
+
 class ControlCommand(BaseModel):
     asset_id: str
     command: str
@@ -107,7 +123,7 @@ class ControlCommand(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize all system components"""
-    global scada, load_flow, ai_manager, monitor, visualizer, asset_manager
+    global scada, load_flow, solver_service, ai_manager, monitor, visualizer, asset_manager, asset_mapper
 
     try:
         logger.info("Initializing Digital Twin Backend...")
@@ -120,6 +136,7 @@ async def startup_event():
         # Initialize Asset Manager
         asset_manager = SubstationAssetManager()
         logger.info(f"Asset Manager initialized with {len(asset_manager.assets)} assets")
+        asset_mapper = AssetResultMapper.from_file(Config.ASSET_MAPPING_FILE or None)
 
         # Set asset manager in asset endpoints
         from src.api.asset_endpoints import set_asset_manager
@@ -152,8 +169,14 @@ async def startup_event():
         dss_path = Path(__file__).parent.parent / "src/models/IndianEHVSubstation.dss"
         if dss_path.exists():
             load_flow.load_circuit(str(dss_path))
+            load_flow.contingency_workers = Config.CONTINGENCY_WORKERS or None
             logger.info("OpenDSS circuit loaded")
 
+            # Start solver workers so periodic solves stay off the event loop
+            if Config.SOLVER_WORKERS > 0:
+                solver_service = SolverService(workers=Config.SOLVER_WORKERS)
+                solver_service.start()
+
             # Set DSS endpoints dependencies
             from src.api.dss_endpoints import set_dss_dependencies
             set_dss_dependencies(None, load_flow, dss_path)
@@ -222,6 +245,40 @@ async def startup_event():
         logger.error(f"Startup error: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background solver and job workers"""
+    shutdown_job_manager()
+    if solver_service:
+        solver_service.shutdown()
+    if load_flow and load_flow.contingency_analyzer:
+        load_flow.contingency_analyzer.shutdown()
+
+async def solve_load_flow() -> Optional[SolveResult]:
+    """Solve the active circuit, sharing recent results for the same operating point
+
+    Results are cached for Config.SOLVE_CACHE_FRESHNESS seconds; concurrent misses
+    are merged into one solve by the solver service.
+    """
+    if not load_flow or not load_flow.circuit:
+        return None
+
+    version_hash = load_flow.session.version_hash if load_flow.session else None
+    anomalies = load_flow.active_anomalies()
+    cache_key = solve_cache.make_key(version_hash, load_flow.get_load_multiplier(anomalies), anomalies)
+    cached = solve_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if solver_service is None:
+        flow = load_flow.solve(anomalies)
+        result = SolveResult(flow=flow, elements=load_flow.get_element_results())
+    else:
+        result = await solver_service.solve(load_flow._dss_file, version_hash, anomalies)
+
+    solve_cache.put(cache_key, result)
+    return result
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
@@ -285,7 +342,7 @@ async def real_time_data_generator():
 
             if load_flow and load_flow.circuit:
                 try:
-                    flow_results = load_flow.solve()
+                    flow_results = (await solve_load_flow()).flow
                     voltage_400kv = flow_results.get('voltage_400kv', 400.0)
                     voltage_220kv = flow_results.get('voltage_220kv', 220.0)
                     active_power = flow_results.get('total_power_kw', 350000) / 1000  # Convert to MW
@@ -499,49 +556,18 @@ async def run_opendss_and_update_assets():
 
     try:
         # Solve power flow
-        flow_results = load_flow.solve()
+        solved = await solve_load_flow()
+        if solved is None:
+            return None
+        flow_results = solved.flow
 
         if not flow_results.get('converged', False):
             logger.warning("OpenDSS power flow did not converge")
             return flow_results
 
-        # Update assets with OpenDSS results (using opendssdirect API)
-        if asset_manager and load_flow.dss:
-            # Get bus voltages
-            bus_names = load_flow.dss.Circuit.AllBusNames()
-            for bus_name in bus_names:
-                load_flow.dss.Circuit.SetActiveBus(bus_name)
-                v_pu = load_flow.dss.Bus.puVmagAngle()
-                kv_base = load_flow.dss.Bus.kVBase()
-
-                if v_pu and len(v_pu) > 0:
-                    kv_actual = v_pu[0] * kv_base
-
-                    # Update assets connected to this bus
-                    for asset_id, asset in asset_manager.assets.items():
-                        if bus_name.lower() in asset.location.lower() or bus_name in asset_id:
-                            asset.real_time_data['voltage_kv'] = kv_actual
-
-            # Get line/transformer currents and loadings
-            element_names = load_flow.dss.Circuit.AllElementNames()
-            for elem_name in element_names:
-                if 'transformer' in elem_name.lower():
-                    load_flow.dss.Circuit.SetActiveElement(elem_name)
-                    currents = load_flow.dss.CktElement.Currents()
-                    powers = load_flow.dss.CktElement.Powers()
-
-                    # Find matching asset
-                    for asset_id, asset in asset_manager.assets.items():
-                        if 'TR' in asset_id or 'T' in asset_id:
-                            if currents and len(currents) > 0:
-                                asset.real_time_data['current_a'] = abs(currents[0])
-                            if powers and len(powers) > 0:
-                                asset.real_time_data['power_mw'] = abs(powers[0]) / 1000
-                                # Calculate loading percentage if rated power available
-                                if hasattr(asset.electrical, 'rated_power_mva') and asset.electrical.rated_power_mva:
-                                    rated_power = asset.electrical.rated_power_mva * 1000  # Convert to kW
-                                    loading_pct = (abs(powers[0]) / rated_power) * 100
-                                    asset.real_time_data['loading_percent'] = min(100, loading_pct)
+        # Update assets with OpenDSS results through the bus/element -> asset index
+        if asset_manager and asset_mapper:
+            asset_mapper.apply(asset_manager, solved.elements)
 
         return flow_results
 
@@ -663,7 +689,7 @@ async def get_current_metrics():
 
             if load_flow and load_flow.circuit:
                 try:
-                    flow_results = load_flow.solve()
+                    flow_results = (await solve_load_flow()).flow
                     voltage_400kv = flow_results.get('voltage_400kv', 400.0)
                     voltage_220kv = flow_results.get('voltage_220kv', 220.0)
                 except:
@@ -1463,26 +1489,59 @@ def generate_llm_insights(anomalies, predictions, optimization, metrics, current
 
     return insights
 
+async def _simulation_job(job, scenario: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Load flow plus the contingency or fault study of a simulation request"""
+    solved = await solve_load_flow()
+    results = dict(solved.flow) if solved else load_flow.solve()
+
+    # Analyze based on scenario
+    if scenario == "contingency":
+        # N-1 (optionally N-2) outage sweep in worker processes
+        n2 = bool(parameters.get("n2", False))
+        contingency_results = await asyncio.to_thread(load_flow.run_contingency_analysis, n2)
+        results["contingency"] = contingency_results
+        results["contingency_summary"] = load_flow.results.get("contingency_summary")
+    elif scenario == "fault":
+        # Simulate fault condition
+        bus = parameters.get("bus")
+        breaker_rating_ka = float(parameters.get("breaker_rating_ka", 40.0))
+        # The fault study is a full OpenDSS solve; keep it off the event loop and
+        # out of this process's engine (a job worker holds its own)
+        version_hash = load_flow.session.version_hash if load_flow.session else None
+        if solver_service is None:
+            fault_results = await get_job_manager().run_in_process(
+                fault_in_worker, load_flow._dss_file, version_hash, bus, breaker_rating_ka)
+        else:
+            fault_results = await solver_service.analyze_fault(load_flow._dss_file, version_hash,
+                                                               bus, breaker_rating_ka)
+        results["fault"] = fault_results
+    return results
+
 @app.post("/api/simulation")
-async def run_simulation(request: SimulationRequest):
-    """Run a simulation scenario"""
+async def run_simulation(request: SimulationRequest, background: bool = False):
+    """Run a simulation scenario
+
+    Runs as a background job; with background=true the job ID is returned
+    immediately (202) and the result is fetched from /api/jobs/{job_id}/result.
+    """
     if not load_flow:
         raise HTTPException(status_code=503, detail="Simulation engine not available")
+    if request.scenario == "fault":
+        bus = request.parameters.get("bus")
+        try:
+            float(request.parameters.get("breaker_rating_ka", 40.0))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="breaker_rating_ka must be a number")
+        if bus is not None and not load_flow.has_bus(str(bus)):
+            raise HTTPException(status_code=404, detail=f"Unknown bus: {bus}")
 
-    try:
-        # Run load flow analysis
-        results = load_flow.solve()
-
-        # Analyze based on scenario
-        if request.scenario == "contingency":
-            # Simulate N-1 contingency
-            contingency_results = load_flow.run_contingency_analysis()
-            results["contingency"] = contingency_results
-        elif request.scenario == "fault":
-            # Simulate fault condition
-            fault_results = load_flow.analyze_fault_current()
-            results["fault"] = fault_results
+    job = submit_job(f"simulation_{request.scenario}", _simulation_job, request.scenario, request.parameters,
+                     params={"scenario": request.scenario, "parameters": request.parameters})
+    if background:
+        return job_accepted(job)
 
+    try:
+        results = await get_job_manager().wait(job)
         return {
             "scenario": request.scenario,
             "timestamp": datetime.now(IST).isoformat(),
@@ -1493,6 +1552,71 @@ async def run_simulation(request: SimulationRequest):
         logger.error(f"Simulation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _qsts_job(job, run_id: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """QSTS run in a job worker process, streaming step results to the time-series DB"""
+    from functools import partial
+    from timeseries_db import timeseries_db
+
+    # A year of steps takes minutes: run it in a job worker (its own OpenDSS engine),
+    # not on the event loop or the solver workers that serve real-time solves
+    version_hash = load_flow.session.version_hash if load_flow.session else None
+    on_chunk = partial(timeseries_db.insert_qsts_results, run_id)
+    summary = await get_job_manager().run_in_process(
+        qsts_in_worker, load_flow._dss_file, version_hash, options, on_chunk)
+    return {"run_id": run_id, "summary": summary}
+
+@app.post("/api/simulation/qsts")
+async def run_qsts_simulation(request: QSTSRequest):
+    """Start a quasi-static time-series simulation as a background job
+
+    Answers 202 with the job ID and the run ID; step results are paged from
+    /api/simulation/qsts/{run_id} as they are written, the summary is the
+    job's result.
+    """
+    if not load_flow or not load_flow.circuit:
+        raise HTTPException(status_code=503, detail="Simulation engine not available")
+    if request.hours <= 0 or request.step_minutes <= 0:
+        raise HTTPException(status_code=400, detail="hours and step_minutes must be positive")
+
+    run_id = f"qsts_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    options = {"start": request.start, "hours": request.hours, "step_minutes": request.step_minutes}
+    job = submit_job("qsts", _qsts_job, run_id, options,
+                     params={"run_id": run_id, **options})
+    return job_accepted(job, run_id=run_id, results_url=f"/api/simulation/qsts/{run_id}")
+
+@app.get("/api/simulation/qsts/{run_id}")
+async def get_qsts_results(run_id: str, offset: int = 0, limit: int = 1000):
+    """Step results of a QSTS run (empty while its job has not written any yet)"""
+    from timeseries_db import timeseries_db
+    rows = timeseries_db.get_qsts_results(run_id, offset=offset, limit=limit)
+    if not rows and offset == 0:
+        jobs = [job for job in get_job_manager().list_jobs("qsts") if job.params.get("run_id") == run_id]
+        if not jobs or jobs[0].status == JobStatus.FAILED:
+            raise HTTPException(status_code=404, detail=f"QSTS run {run_id} not found")
+    return {"run_id": run_id, "offset": offset, "count": len(rows), "data": rows}
+
+@app.get("/api/simulation/fault-levels")
+async def get_fault_levels(bus: Optional[str] = None):
+    """Per-bus fault levels (3-phase, SLG, LL, X/R) from the cached fault study"""
+    if not load_flow:
+        raise HTTPException(status_code=503, detail="Simulation engine not available")
+
+    # The first call after a circuit change runs the full fault study; like the
+    # /api/simulation fault path, keep it off the event loop and this process's engine
+    version_hash = load_flow.session.version_hash if load_flow.session else None
+    if not load_flow.session or not load_flow.session.is_compiled:
+        level = load_flow.get_fault_levels(bus)
+    elif solver_service is None:
+        level = await get_job_manager().run_in_process(
+            fault_levels_in_worker, load_flow._dss_file, version_hash, bus)
+    else:
+        level = await solver_service.fault_levels(load_flow._dss_file, version_hash, bus)
+    if bus is None:
+        return {"buses": level}
+    if level is None:
+        raise HTTPException(status_code=404, detail=f"Bus {bus} not found")
+    return level
+
 @app.get("/api/ai/analysis")
 async def get_ai_analysis():
     """Get AI/ML analysis results"""
@@ -1668,7 +1792,15 @@ async def websocket_endpoint(websocket: WebSocket):
 @app.get("/api/cache/stats")
 async def get_cache_stats():
     """Get cache and storage statistics"""
-    return data_manager.get_cache_stats()
+    stats = data_manager.get_cache_stats()
+    stats['solve_cache'] = solve_cache.get_stats()
+    if solver_service:
+        stats['solver_service'] = solver_service.get_stats()
+    if load_flow:
+        stats['fault_study'] = load_flow.fault_study.stats
+    stats['jobs'] = get_job_manager().get_stats()
+    stats['anomaly_stream'] = get_state_stream().get_stats()
+    return stats
 
 @app.get("/api/metrics/historical")
 async def get_historical_metrics(hours: int = 24):
@@ -1701,6 +1833,7 @@ async def health_check():
         "components": {
             "scada": scada is not None,
             "load_flow": load_flow is not None,
+            "solver_service": solver_service.get_stats() if solver_service else None,
             "ai_manager": ai_manager is not None,
             "monitor": monitor is not None,
             "websocket_connections": len(manager.active_connections),
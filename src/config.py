@@ -42,6 +42,18 @@ class Config:
     METRICS_STORAGE_INTERVAL = int(os.getenv('METRICS_STORAGE_INTERVAL', '3600'))  # 1 hour
     ANALYSIS_BATCH_SIZE = int(os.getenv('ANALYSIS_BATCH_SIZE', '100'))
 
+    # OpenDSS Solver Service
+    SOLVER_WORKERS = int(os.getenv('SOLVER_WORKERS', '1'))  # 0 = solve on the event loop (no worker processes)
+    SOLVE_CACHE_FRESHNESS = float(os.getenv('SOLVE_CACHE_FRESHNESS', '1.0'))  # seconds a solve result is shared
+    CONTINGENCY_WORKERS = int(os.getenv('CONTINGENCY_WORKERS', '0'))  # 0 = one per spare CPU core
+    DATASET_WORKERS = int(os.getenv('DATASET_WORKERS', '0'))  # anomaly dataset generation, 0 = one per spare CPU core
+    ASSET_MAPPING_FILE = os.getenv('ASSET_MAPPING_FILE', '')  # DSS bus/element -> asset ID map (empty = bundled default)
+
+    # Background Jobs (long simulation studies)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))  # jobs running at the same time
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '32'))  # queued + running jobs before submissions are rejected
+    JOB_RESULTS_DIR = os.getenv('JOB_RESULTS_DIR', 'data/jobs')  # job records and results
+
     # SCADA Configuration
     SCADA_ENABLED = os.getenv('SCADA_ENABLED', 'true').lower() == 'true'
     MODBUS_HOST = os.getenv('MODBUS_HOST', 'localhost')
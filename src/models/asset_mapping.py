@@ -0,0 +1,128 @@
+"""
+OpenDSS Result to Asset Mapping
+Explicit bus/element -> asset ID index used to scatter solve results onto substation assets
+"""
+
+import json
+import logging
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAPPING_FILE = Path(__file__).parent / "asset_mapping.json"
+
+
+def load_asset_mapping(path: Optional[str] = None) -> Dict[str, Dict[str, List[str]]]:
+    """Load a mapping config ({"buses": {...}, "elements": {...}}) from JSON"""
+    mapping_file = Path(path) if path else DEFAULT_MAPPING_FILE
+    with open(mapping_file, 'r') as f:
+        config = json.load(f)
+    return {
+        'buses': config.get('buses', {}),
+        'elements': config.get('elements', {})
+    }
+
+
+class AssetResultMapper:
+    """Scatters OpenDSS bus voltages and element flows onto mapped assets
+
+    The config maps DSS bus/element names to asset ID patterns. It is resolved
+    once per circuit version and asset set into index arrays, so each update is
+    a gather over the result arrays plus one write per mapped asset.
+    """
+
+    def __init__(self, config: Dict[str, Dict[str, List[str]]]):
+        self.config = config
+        self._signature: Optional[Tuple] = None
+
+        # Resolved index: result array positions and the assets they feed
+        self._bus_src = np.zeros(0, dtype=int)
+        self._bus_assets: List[Any] = []
+        self._elem_src = np.zeros(0, dtype=int)
+        self._elem_assets: List[Any] = []
+        self._elem_rating_kva = np.zeros(0)
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None) -> 'AssetResultMapper':
+        return cls(load_asset_mapping(path))
+
+    def _resolve(self, names: List[str], patterns_by_name: Dict[str, List[str]],
+                 asset_manager) -> Tuple[np.ndarray, List[Any]]:
+        index = {name.lower(): i for i, name in enumerate(names)}
+        src, assets, seen = [], [], {}
+        for dss_name, patterns in patterns_by_name.items():
+            position = index.get(dss_name.lower())
+            if position is None:
+                logger.warning(f"Asset mapping references unknown circuit object: {dss_name}")
+                continue
+            for asset_id, asset in asset_manager.assets.items():
+                if any(fnmatchcase(asset_id, pattern) for pattern in patterns):
+                    if asset_id in seen:
+                        logger.warning(f"Asset {asset_id} mapped to both {seen[asset_id]} and {dss_name}")
+                        continue
+                    seen[asset_id] = dss_name
+                    src.append(position)
+                    assets.append(asset)
+        return np.asarray(src, dtype=int), assets
+
+    def build(self, asset_manager, elements: Dict[str, Any]):
+        """Resolve the config against the circuit names and the current asset set"""
+        bus_names = list(elements['buses'].get('names', []))
+        elem_names = list(elements['elements'].get('names', []))
+
+        self._bus_src, self._bus_assets = self._resolve(bus_names, self.config['buses'], asset_manager)
+        self._elem_src, self._elem_assets = self._resolve(elem_names, self.config['elements'], asset_manager)
+        self._elem_rating_kva = np.array([
+            (getattr(asset, 'power_rating_mva', None) or
+             getattr(asset.electrical, 'rated_power_mva', None) or np.nan) * 1000
+            for asset in self._elem_assets
+        ], dtype=float)
+
+        self._signature = self._make_signature(asset_manager, elements)
+        logger.info(f"Asset mapping built: {len(self._bus_assets)} bus-fed and "
+                    f"{len(self._elem_assets)} element-fed assets")
+
+    @staticmethod
+    def _make_signature(asset_manager, elements: Dict[str, Any]) -> Tuple:
+        return (elements.get('version'),
+                len(elements['buses'].get('names', [])),
+                len(elements['elements'].get('names', [])),
+                len(asset_manager.assets))
+
+    def apply(self, asset_manager, elements: Dict[str, Any]) -> int:
+        """Write mapped results into asset real-time data; returns assets updated"""
+        if not elements.get('buses') or not elements.get('elements'):
+            return 0
+        if self._make_signature(asset_manager, elements) != self._signature:
+            self.build(asset_manager, elements)
+
+        updated = 0
+
+        # Bus voltages (L-L kV)
+        buses = elements['buses']
+        v_pu = np.asarray(buses['v_pu'])[self._bus_src]
+        kv_ll = v_pu * np.asarray(buses['kv_base'])[self._bus_src] * np.sqrt(3)
+        for asset, kv in zip(self._bus_assets, kv_ll.tolist()):
+            if not np.isnan(kv):
+                asset.real_time_data['voltage_kv'] = kv
+                updated += 1
+
+        # Element flows at terminal 1
+        flows = elements['elements']
+        p_kw = np.asarray(flows['p_kw'])[self._elem_src]
+        q_kvar = np.asarray(flows['q_kvar'])[self._elem_src]
+        current_a = np.asarray(flows['current_a'])[self._elem_src]
+        with np.errstate(invalid='ignore'):
+            loading = np.minimum(100, np.hypot(p_kw, q_kvar) / self._elem_rating_kva * 100)
+        for asset, i, p, load in zip(self._elem_assets, current_a.tolist(), p_kw.tolist(), loading.tolist()):
+            asset.real_time_data['current_a'] = i
+            asset.real_time_data['power_mw'] = abs(p) / 1000
+            if not np.isnan(load):
+                asset.real_time_data['loading_percent'] = load
+            updated += 1
+
+        return updated
@@ -0,0 +1,328 @@
+"""
+Background Job Manager
+Runs long simulation studies off the request path with progress, cancellation and on-disk results
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a background job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    CANCELLING = "cancelling"  # Cancellation requested, the job's work has not stopped yet
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its cancellation was requested"""
+
+
+class JobQueueFull(RuntimeError):
+    """The manager already holds max_pending unfinished jobs"""
+
+
+class JobFailed(RuntimeError):
+    """A waited-on job failed or was cancelled"""
+
+
+@dataclass
+class Job:
+    """A submitted job; job functions receive it to report progress and check for cancellation"""
+    id: str
+    kind: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: JobStatus = JobStatus.QUEUED
+    progress: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    has_result: bool = False
+    _cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+    _is_async: bool = field(default=False, repr=False)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested (callable from any thread)"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+    def update_progress(self, progress: Dict[str, Any]):
+        """Record progress; doubles as a cancellation point"""
+        self.progress = dict(progress)
+        self.check_cancelled()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status.value,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "has_result": self.has_result
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Job':
+        return cls(id=data["job_id"], kind=data["kind"], params=data.get("params", {}),
+                   status=JobStatus(data["status"]), progress=data.get("progress", {}),
+                   error=data.get("error"), created_at=data["created_at"],
+                   started_at=data.get("started_at"), finished_at=data.get("finished_at"),
+                   has_result=data.get("has_result", False))
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoding of numpy values, enums and anything else stringifiable"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+class JobManager:
+    """Asyncio job queue with bounded concurrency and a local results store
+
+    At most max_concurrent jobs run at a time; the rest wait in the queue,
+    and submissions beyond max_pending unfinished jobs are rejected. Job
+    functions are called with the Job as first argument: coroutine functions
+    run on the event loop, plain functions in a thread. Cancelling a queued
+    or async job cancels its task; a thread job stops at its next
+    update_progress/check_cancelled call. A call already running in a worker
+    process (run_in_process) cannot be interrupted: its job stays cancelling,
+    holding its slot, until the call returns. Each finished job is written to
+    results_dir as <id>.json (record) and <id>.result.json (result), so
+    results survive restarts; only the newest max_jobs finished jobs are kept.
+    """
+
+    def __init__(self, results_dir: Union[str, Path], max_concurrent: int = 2,
+                 max_pending: int = 32, max_jobs: int = 200):
+        self.results_dir = Path(results_dir)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._jobs: Dict[str, Job] = {}
+        self._process_pool = None
+        self.stats = {
+            'submitted': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'rejected': 0
+        }
+        self._load_records()
+
+    def _record_path(self, job_id: str) -> Path:
+        return self.results_dir / f"{job_id}.json"
+
+    def _result_path(self, job_id: str) -> Path:
+        return self.results_dir / f"{job_id}.result.json"
+
+    def _load_records(self):
+        """Reload finished jobs from the results store"""
+        for path in sorted(self.results_dir.glob("*.json")):
+            if path.name.endswith(".result.json"):
+                continue
+            try:
+                job = Job.from_dict(json.loads(path.read_text()))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable job record {path.name}: {e}")
+                continue
+            self._jobs[job.id] = job
+        if self._jobs:
+            logger.info(f"Loaded {len(self._jobs)} job record(s) from {self.results_dir}")
+
+    def _write_json(self, path: Path, data: Any):
+        # Write then rename so readers never see a partial file
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, default=_json_default)
+        os.replace(tmp_path, path)
+
+    def _store(self, job: Job, result: Any = None):
+        if job.status == JobStatus.SUCCEEDED:
+            self._write_json(self._result_path(job.id), result)
+            job.has_result = True
+        self._write_json(self._record_path(job.id), job.to_dict())
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.finished),
+                          key=lambda job: job.finished_at or job.created_at)
+        for job in finished[:max(0, len(finished) - self.max_jobs)]:
+            del self._jobs[job.id]
+            self._record_path(job.id).unlink(missing_ok=True)
+            self._result_path(job.id).unlink(missing_ok=True)
+
+    @property
+    def pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args,
+               params: Optional[Dict[str, Any]] = None, **kwargs) -> Job:
+        """Queue fn(job, *args, **kwargs) and return its Job (must be called on the event loop)"""
+        if self.pending_count >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise JobQueueFull(f"{self.max_pending} jobs already queued or running")
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params or {},
+                  _is_async=asyncio.iscoroutinefunction(fn))
+        self._jobs[job.id] = job
+        job._task = asyncio.get_running_loop().create_task(self._run(job, fn, args, kwargs))
+        self.stats['submitted'] += 1
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    async def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        result = None
+        try:
+            async with self._slots:
+                job.check_cancelled()
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                if job._is_async:
+                    result = await fn(job, *args, **kwargs)
+                else:
+                    result = await asyncio.to_thread(fn, job, *args, **kwargs)
+                # A thread job that ignored the request still ends as cancelled
+                job.check_cancelled()
+            job.status = JobStatus.SUCCEEDED
+        except (asyncio.CancelledError, JobCancelled):
+            job.status = JobStatus.CANCELLED
+            result = None
+        except Exception as e:
+            logger.error(f"{job.kind} job {job.id} failed: {e}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            result = None
+
+        job.finished_at = time.time()
+        self.stats[job.status.value] += 1
+        try:
+            self._store(job, result)
+        except Exception as e:
+            logger.error(f"Could not store result of job {job.id}: {e}")
+        self._prune()
+        logger.info(f"{job.kind} job {job.id} {job.status.value}")
+        return result
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, kind: Optional[str] = None) -> List[Job]:
+        """Jobs newest first, optionally of one kind"""
+        jobs = [job for job in self._jobs.values() if kind is None or job.kind == kind]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def result(self, job_id: str) -> Any:
+        """Stored result of a succeeded job (KeyError if there is none)"""
+        job = self._jobs.get(job_id)
+        if job is None or not job.has_result:
+            raise KeyError(job_id)
+        return json.loads(self._result_path(job_id).read_text())
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; False if the job is unknown or already finished"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel_event.set()
+        if job.status == JobStatus.RUNNING:
+            job.status = JobStatus.CANCELLING
+        # Thread jobs keep their slot until they reach a cancellation point
+        if job._task is not None and (job.status == JobStatus.QUEUED or job._is_async):
+            job._task.cancel()
+        return True
+
+    async def wait(self, job: Job) -> Any:
+        """Wait for a job and return its result; raises JobFailed if it did not succeed"""
+        # Shield so an abandoned request does not cancel the job itself
+        result = await asyncio.shield(job._task) if job._task is not None else None
+        if job.status != JobStatus.SUCCEEDED:
+            raise JobFailed(job.error or f"Job {job.id} {job.status.value}")
+        return result
+
+    async def run_in_process(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a picklable function in the manager's worker processes
+
+        For jobs that need their own OpenDSS engine: the engine is process-global,
+        so it cannot be shared with the request handlers from a thread. When the
+        calling job is cancelled, a call still waiting for a worker is dropped;
+        one already running is waited for, so the job keeps its concurrency
+        slot while the worker is busy.
+        """
+        if self._process_pool is None:
+            # spawn: workers must not inherit the parent's OpenDSS engine state
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_concurrent,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        future = self._process_pool.submit(fn, *args)
+        waiter = asyncio.wrap_future(future)
+        try:
+            return await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            if not future.cancel():
+                await asyncio.wait([waiter])
+                if not waiter.cancelled():
+                    waiter.exception()  # Retrieved; the job ends cancelled either way
+            raise
+
+    def shutdown(self):
+        """Cancel unfinished jobs and stop the worker processes"""
+        for job in self._jobs.values():
+            if not job.finished:
+                job._cancel_event.set()
+                if job._task is not None:
+                    job._task.cancel()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Manager statistics"""
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {
+            **self.stats,
+            'max_concurrent': self.max_concurrent,
+            'jobs': counts
+        }
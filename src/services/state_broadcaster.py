@@ -0,0 +1,99 @@
+"""
+Shared State Broadcaster
+Captures a snapshot once per tick and fans it out to any number of stream subscribers
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+
+class StateBroadcaster:
+    """Single producer, many subscribers, bounded per-subscriber queues
+
+    One task calls produce() every interval seconds while at least one
+    subscriber is attached; it stops when the last one leaves and starts again
+    on the next subscribe. Each subscriber gets its own queue of queue_size
+    snapshots; when a slow subscriber's queue is full its oldest snapshot is
+    dropped, so the producer never waits on a client and memory stays bounded.
+    """
+
+    def __init__(self, produce: Callable[[], Union[Any, Awaitable[Any]]],
+                 interval: float = 1.0, queue_size: int = 4):
+        self.produce = produce
+        self.interval = interval
+        self.queue_size = max(1, queue_size)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.latest: Any = None
+        self.latest_at: Optional[float] = None
+        self.stats = {
+            'ticks': 0,
+            'errors': 0,
+            'dropped': 0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Attach a subscriber; returns the queue its snapshots arrive on"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        # A fresh snapshot is sent right away instead of after the next tick
+        if self.latest_at is not None and time.monotonic() - self.latest_at < self.interval:
+            queue.put_nowait(self.latest)
+        self._subscribers.add(queue)
+        if not self.is_running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("State broadcaster started")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Detach a subscriber; the producer pauses after the last one leaves"""
+        self._subscribers.discard(queue)
+
+    def _publish(self, snapshot: Any):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.stats['dropped'] += 1
+            queue.put_nowait(snapshot)
+
+    async def _run(self):
+        while self._subscribers:
+            started = time.monotonic()
+            try:
+                snapshot = self.produce()
+                if asyncio.iscoroutine(snapshot):
+                    snapshot = await snapshot
+                self.latest, self.latest_at = snapshot, time.monotonic()
+                self.stats['ticks'] += 1
+                self._publish(snapshot)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error producing state snapshot: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        logger.info("State broadcaster paused (no subscribers)")
+
+    def stop(self):
+        """Cancel the producer task"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Broadcaster statistics"""
+        return {
+            **self.stats,
+            'subscribers': len(self._subscribers),
+            'running': self.is_running,
+            'interval': self.interval
+        }
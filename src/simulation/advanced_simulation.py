@@ -5,14 +5,24 @@ Integrates OpenDSS for load flow, fault analysis, and dynamic simulations
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Any
+from dataclasses import dataclass, field, replace
 from enum import Enum
 import json
 import logging
 from datetime import datetime, timedelta
 import cmath
+import hashlib
 import math
+import multiprocessing
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations, count
+
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +45,86 @@ class FaultType(Enum):
     LINE_LINE_TO_GROUND = "LLG"
     OPEN_CIRCUIT = "OC"
 
+# Orders edits of Y-bus inputs (stamped record fields, element dicts) within this process
+_edit_stamps = count(1)
+
+class _StampedRecord:
+    """Element record base: edits of the fields stamped into the Y-bus get an edit stamp
+
+    PowerSystemNetwork.get_ybus compares these with the stamp of its cached
+    Y-bus, so direct attribute edits are noticed without rescanning the network.
+    """
+    _stamped_fields: FrozenSet[str] = frozenset()
+    last_edit = 0  # Stamp of the latest edit of any record
+
+    def __setattr__(self, name: str, value: Any):
+        # Only edits count, not the first assignment in __init__
+        if name in self._stamped_fields and name in self.__dict__ and self.__dict__[name] != value:
+            stamp = next(_edit_stamps)
+            self.__dict__["_edited_at"] = stamp
+            _StampedRecord.last_edit = stamp
+        object.__setattr__(self, name, value)
+
+    @property
+    def edited_at(self) -> int:
+        return self.__dict__.get("_edited_at", 0)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Stamps are only ordered within one process
+        state = dict(self.__dict__)
+        state.pop("_edited_at", None)
+        return state
+
+class _ElementDict(dict):
+    """Element dict of a network that stamps its own edits (adds, removals, replacements)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.edited_at = next(_edit_stamps)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def _edited(self):
+        self.edited_at = next(_edit_stamps)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._edited()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._edited()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._edited()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._edited()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._edited()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._edited()
+
+    def clear(self):
+        super().clear()
+        self._edited()
+
 @dataclass
-class BusData:
+class BusData(_StampedRecord):
     """Bus data for power system"""
     bus_id: str
     name: str
@@ -52,6 +140,8 @@ class BusData:
     v_min: float = 0.95
     v_max: float = 1.05
 
+    _stamped_fields = frozenset({"shunt_mvar"})
+
     def get_complex_voltage(self) -> complex:
         """Get complex voltage"""
         angle_rad = math.radians(self.angle_deg)
@@ -63,7 +153,7 @@ class BusData:
                       self.generation_mvar - self.load_mvar)
 
 @dataclass
-class LineData:
+class LineData(_StampedRecord):
     """Transmission line data"""
     line_id: str
     name: str
@@ -80,6 +170,9 @@ class LineData:
     power_flow_mvar: float = 0.0
     loading_percent: float = 0.0
 
+    _stamped_fields = frozenset({"from_bus", "to_bus", "length_km", "voltage_kv",
+                                 "r_ohm_per_km", "x_ohm_per_km", "b_mho_per_km"})
+
     def get_impedance(self) -> complex:
         """Get line impedance"""
         r_total = self.r_ohm_per_km * self.length_km
@@ -99,7 +192,7 @@ class LineData:
         return complex(0, b_total)
 
 @dataclass
-class TransformerData:
+class TransformerData(_StampedRecord):
     """Transformer data"""
     transformer_id: str
     name: str
@@ -115,15 +208,43 @@ class TransformerData:
     tap_step: float = 1.25
     loading_percent: float = 0.0
     temperature_c: float = 65.0
+    tap_ratio: Optional[float] = None  # Exact off-nominal ratio (e.g. from a DSS model); overrides tap_position
+
+    _stamped_fields = frozenset({"from_bus", "to_bus", "rating_mva", "r_percent", "x_percent",
+                                 "tap_position", "tap_step", "tap_ratio"})
 
     def get_tap_ratio(self) -> float:
         """Get tap ratio"""
+        if self.tap_ratio is not None:
+            return self.tap_ratio
         return 1 + (self.tap_position * self.tap_step / 100)
 
     def get_impedance_pu(self) -> complex:
         """Get transformer impedance in per unit"""
         return complex(self.r_percent / 100, self.x_percent / 100)
 
+@dataclass
+class DCSensitivities:
+    """DC power flow sensitivities of one topology"""
+    key: Tuple[str, int]            # (Y-bus content hash, slack bus index)
+    branch_ids: List[str]
+    branch_kinds: List[str]         # line | transformer
+    ptdf: np.ndarray                # branches x buses, flow per unit injection (withdrawn at slack)
+    lodf: np.ndarray                # branches x branches, flow change on l per unit pre-outage flow on k
+    islanding: np.ndarray           # per branch: its outage splits the network
+
+@dataclass
+class LoadFlowState:
+    """Solved state of a network, buses in network order and branches in branch_arrays order"""
+    voltage_pu: np.ndarray
+    angle_deg: np.ndarray
+    branch_ids: List[str]
+    branch_kinds: List[str]         # line | transformer
+    p_mw: np.ndarray                # sending end
+    q_mvar: np.ndarray
+    current_a: np.ndarray
+    loading_percent: np.ndarray
+
 class PowerSystemNetwork:
     """Power system network model"""
 
@@ -137,59 +258,404 @@ class PowerSystemNetwork:
         self.base_mva = 100.0
         self.frequency_hz = 50.0
 
+        # Grid equivalent behind the slack bus
+        self.source_short_circuit_mva = 20000.0
+        self.source_x_r = 15.0
+
         # Simulation results
         self.y_bus = None  # Admittance matrix
+        self.ybus_key: Optional[str] = None  # Identifies the Y-bus content (built hash + edits)
+        self.ybus_parent: Optional[Dict[str, Any]] = None  # Last built key and the edits since
+        self.low_rank_limit = 8  # Max buses touched by edits tracked for low-rank refactoring
+        self._bus_index: Dict[str, int] = {}
+        self._ybus_inputs: Optional[Tuple] = None  # base_mva and element dict stamps the Y-bus was built from
+        self._ybus_stamp = 0  # Records edited after this stamp are not in the Y-bus
+        self._dc_sensitivities: Optional[DCSensitivities] = None
+        self.records_shared = False  # Outage overlay on another network's records (see with_outages)
+        self.solution: Optional[LoadFlowState] = None  # Latest load flow on this network
         self.jacobian = None
         self.convergence_history = []
 
-    def build_ybus(self) -> np.ndarray:
-        """Build admittance matrix (Y-bus)"""
-        n_buses = len(self.buses)
+    def __setattr__(self, name: str, value: Any):
+        # Element dicts stamp their edits, whatever dict they are assigned from
+        if name in ("buses", "lines", "transformers") and not isinstance(value, _ElementDict):
+            value = _ElementDict(value)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["_ybus_current"] = self._ybus_is_current()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        current = state.pop("_ybus_current", False)
+        self.__dict__.update(state)
+        # Stamps do not carry across processes; restamp a Y-bus that was current when pickled
+        if current:
+            self._mark_ybus_current()
+        else:
+            self._ybus_inputs = None
+
+    def _branch_parameters(self, kind: str, element) -> Tuple[complex, complex, float]:
+        """Series admittance, total shunt admittance (pu on the system base) and tap of one branch"""
+        if kind == "line":
+            # Ohmic data converted to per unit on the line voltage base
+            z_base = element.voltage_kv ** 2 / self.base_mva
+            return element.get_admittance() * z_base, element.get_shunt_admittance() * z_base, 1.0
+        # Per unit on own rating, rescaled to the system base; tap on the from side
+        z_pu = element.get_impedance_pu() * self.base_mva / element.rating_mva
+        return (1 / z_pu if abs(z_pu) > 0 else 0), 0, element.get_tap_ratio()
+
+    def branch_arrays(self) -> Dict[str, Any]:
+        """Branch data as arrays: id/kind, from/to bus index, series and total shunt admittance (pu), tap"""
         bus_index = {bus_id: i for i, bus_id in enumerate(self.buses.keys())}
-        y_bus = np.zeros((n_buses, n_buses), dtype=complex)
-
-        # Add line admittances
-        for line in self.lines.values():
-            if line.from_bus in bus_index and line.to_bus in bus_index:
-                i = bus_index[line.from_bus]
-                j = bus_index[line.to_bus]
-                y = line.get_admittance()
-                y_shunt = line.get_shunt_admittance()
-
-                # Off-diagonal elements
-                y_bus[i, j] -= y
-                y_bus[j, i] -= y
-
-                # Diagonal elements
-                y_bus[i, i] += y + y_shunt / 2
-                y_bus[j, j] += y + y_shunt / 2
-
-        # Add transformer admittances
-        for transformer in self.transformers.values():
-            if transformer.from_bus in bus_index and transformer.to_bus in bus_index:
-                i = bus_index[transformer.from_bus]
-                j = bus_index[transformer.to_bus]
-
-                # Convert to admittance
-                z_pu = transformer.get_impedance_pu()
-                y = 1 / z_pu if abs(z_pu) > 0 else 0
-                tap = transformer.get_tap_ratio()
-
-                # Transformer model with tap
-                y_bus[i, i] += y / (tap ** 2)
-                y_bus[j, j] += y
-                y_bus[i, j] -= y / tap
-                y_bus[j, i] -= y / tap
-
-        # Add shunt elements
-        for bus_id, bus in self.buses.items():
-            if bus_id in bus_index:
-                i = bus_index[bus_id]
-                y_bus[i, i] += complex(0, bus.shunt_mvar / self.base_mva)
+        ids, kinds, f, t, y_series, y_shunt, tap = [], [], [], [], [], [], []
+
+        branches = ([("line", line_id, line) for line_id, line in self.lines.items()] +
+                    [("transformer", tr_id, tr) for tr_id, tr in self.transformers.items()])
+        for kind, branch_id, element in branches:
+            if element.from_bus in bus_index and element.to_bus in bus_index:
+                y, y_sh, tp = self._branch_parameters(kind, element)
+                ids.append(branch_id)
+                kinds.append(kind)
+                f.append(bus_index[element.from_bus])
+                t.append(bus_index[element.to_bus])
+                y_series.append(y)
+                y_shunt.append(y_sh)
+                tap.append(tp)
+
+        return {
+            "id": ids,
+            "kind": kinds,
+            "from": np.array(f, dtype=int),
+            "to": np.array(t, dtype=int),
+            "y_series": np.array(y_series, dtype=complex),
+            "y_shunt": np.array(y_shunt, dtype=complex),
+            "tap": np.array(tap, dtype=float)
+        }
 
+    @staticmethod
+    def _stamp_entries(f: np.ndarray, t: np.ndarray, y: np.ndarray, y_half_shunt: np.ndarray,
+                       tap: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """COO entries of pi-model branches (tap on the from side)"""
+        rows = np.concatenate([f, t, f, t])
+        cols = np.concatenate([f, t, t, f])
+        data = np.concatenate([(y + y_half_shunt) / tap ** 2, y + y_half_shunt, -y / tap, -y / tap])
+        return rows, cols, data
+
+    @staticmethod
+    def _reactance_admittance(y: np.ndarray) -> np.ndarray:
+        """1 / jX of each series admittance (zero for open or zero-reactance branches)"""
+        x = np.zeros(len(y))
+        x[y != 0] = (1 / y[y != 0]).imag
+        y_reactance = np.zeros(len(y), dtype=complex)
+        y_reactance[x != 0] = 1 / (1j * x[x != 0])
+        return y_reactance
+
+    @classmethod
+    def _stamp_ybus(cls, n_buses: int, f: np.ndarray, t: np.ndarray, y: np.ndarray,
+                    y_half_shunt: np.ndarray, tap: np.ndarray,
+                    bus_shunt: np.ndarray) -> sparse.csr_matrix:
+        """Stamp pi-model branches (tap on the from side) and bus shunts into a CSR matrix"""
+        rows, cols, data = cls._stamp_entries(f, t, y, y_half_shunt, tap)
+        diag = np.arange(n_buses)
+        # Duplicate entries (parallel branches) are summed by the COO conversion
+        y_bus = sparse.coo_matrix((np.concatenate([data, bus_shunt]),
+                                   (np.concatenate([rows, diag]), np.concatenate([cols, diag]))),
+                                  shape=(n_buses, n_buses)).tocsr()
+        y_bus.sort_indices()
+        return y_bus
+
+    def _ybus_input_stamps(self) -> Tuple:
+        return (self.base_mva, self.buses.edited_at, self.lines.edited_at, self.transformers.edited_at)
+
+    def _mark_ybus_current(self):
+        """Record that the cached Y-bus reflects every edit made so far"""
+        self._ybus_inputs = self._ybus_input_stamps()
+        self._ybus_stamp = next(_edit_stamps)
+
+    def _ybus_is_current(self) -> bool:
+        """Whether no stamped data changed since the cached Y-bus was built or edited
+
+        O(1) unless some record (of any network) was edited since; then this
+        network's records are scanned once for edits of their own.
+        """
+        if self.y_bus is None or self._ybus_inputs != self._ybus_input_stamps():
+            return False
+        if _StampedRecord.last_edit > self._ybus_stamp:
+            for elements in (self.buses, self.lines, self.transformers):
+                if any(element.edited_at > self._ybus_stamp for element in elements.values()):
+                    return False
+            self._ybus_stamp = next(_edit_stamps)
+        return True
+
+    def build_ybus(self) -> sparse.csr_matrix:
+        """Build admittance matrix (Y-bus) from scratch as a sparse CSR matrix"""
+        branches = self.branch_arrays()
+        bus_shunt = 1j * np.array([bus.shunt_mvar for bus in self.buses.values()]) / self.base_mva
+
+        # Content hash of everything stamped, identifies this topology for cached factorizations
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update("|".join(self.buses).encode())
+        digest.update(bus_shunt.tobytes())
+        for name in ("from", "to", "y_series", "y_shunt", "tap"):
+            digest.update(branches[name].tobytes())
+        self.ybus_key = digest.hexdigest()
+
+        y_bus = self._stamp_ybus(len(self.buses), branches["from"], branches["to"],
+                                 branches["y_series"], branches["y_shunt"] / 2,
+                                 branches["tap"], bus_shunt)
         self.y_bus = y_bus
+        self.ybus_parent = None
+        self._bus_index = {bus_id: i for i, bus_id in enumerate(self.buses)}
+        self._mark_ybus_current()
         return y_bus
 
+    def get_ybus(self) -> sparse.csr_matrix:
+        """Cached Y-bus
+
+        Edits through add/remove/update_branch and update_bus are restamped in
+        place. Any other change to stamped data (elements added, removed or
+        edited directly) carries an edit stamp newer than the Y-bus and
+        triggers a full rebuild.
+        """
+        if not self._ybus_is_current():
+            return self.build_ybus()
+        return self.y_bus
+
+    def build_reactance_ybus(self) -> sparse.csr_matrix:
+        """Y-bus of series reactances only (no resistance, shunts or taps), used for B'"""
+        branches = self.branch_arrays()
+        n_branches = len(branches["id"])
+        return self._stamp_ybus(len(self.buses), branches["from"], branches["to"],
+                                self._reactance_admittance(branches["y_series"]),
+                                np.zeros(n_branches), np.ones(n_branches),
+                                np.zeros(len(self.buses)))
+
+    def _branch_delta(self, kind: str, element, sign: float) -> Optional[Tuple[np.ndarray, ...]]:
+        """Y-bus and reactance Y-bus entries of one branch, times sign (+1 stamp, -1 unstamp)"""
+        if element.from_bus not in self._bus_index or element.to_bus not in self._bus_index:
+            return None
+        y, y_sh, tap = self._branch_parameters(kind, element)
+        f = np.array([self._bus_index[element.from_bus]])
+        t = np.array([self._bus_index[element.to_bus]])
+        y = np.array([y], dtype=complex)
+        rows, cols, y_data = self._stamp_entries(f, t, y, np.array([y_sh], dtype=complex) / 2, np.array([tap]))
+        _, _, x_data = self._stamp_entries(f, t, self._reactance_admittance(y), np.zeros(1), np.ones(1))
+        return rows, cols, sign * y_data, sign * x_data
+
+    def _apply_delta(self, deltas: List[Tuple[np.ndarray, ...]], description: str):
+        """Add entries to the cached Y-bus in place and move its key to the edited version"""
+        deltas = [delta for delta in deltas if delta is not None]
+        if deltas:
+            rows = np.concatenate([delta[0] for delta in deltas])
+            cols = np.concatenate([delta[1] for delta in deltas])
+            y_data = np.concatenate([delta[2] for delta in deltas])
+            x_data = np.concatenate([delta[3] for delta in deltas])
+
+            # Positions of the entries in the CSR data array (-1 where no non-zero exists yet)
+            y_bus = self.y_bus
+            positions = np.full(len(rows), -1)
+            for n, (row, col) in enumerate(zip(rows, cols)):
+                start, end = y_bus.indptr[row], y_bus.indptr[row + 1]
+                k = start + np.searchsorted(y_bus.indices[start:end], col)
+                if k < end and y_bus.indices[k] == col:
+                    positions[n] = k
+
+            if np.all(positions >= 0):
+                np.add.at(y_bus.data, positions, y_data)
+            else:
+                # Branch between buses not yet coupled: one structural add
+                y_bus = (y_bus + sparse.coo_matrix((y_data, (rows, cols)), shape=y_bus.shape)).tocsr()
+                y_bus.sort_indices()
+                self.y_bus = y_bus
+
+            # Track the edit relative to the last fully built (and likely factored) Y-bus
+            parent = self.ybus_parent or {"key": self.ybus_key, "rows": rows[:0], "cols": cols[:0],
+                                          "y": y_data[:0], "x": x_data[:0]}
+            parent = {"key": parent["key"],
+                      "rows": np.concatenate([parent["rows"], rows]),
+                      "cols": np.concatenate([parent["cols"], cols]),
+                      "y": np.concatenate([parent["y"], y_data]),
+                      "x": np.concatenate([parent["x"], x_data])}
+            self.ybus_parent = parent if len(np.unique(np.concatenate([parent["rows"], parent["cols"]]))) <= \
+                self.low_rank_limit else None
+
+        self.ybus_key = hashlib.blake2b(f"{self.ybus_key}|{description}".encode(), digest_size=16).hexdigest()
+        self._mark_ybus_current()
+
+    def remove_branch(self, kind: str, branch_id: str):
+        """Take a branch out of the model, unstamping it from the cached Y-bus"""
+        self.get_ybus()
+        elements = self.lines if kind == "line" else self.transformers
+        element = elements.pop(branch_id)
+        self._apply_delta([self._branch_delta(kind, element, -1.0)], f"-{kind}:{branch_id}")
+        return element
+
+    def add_branch(self, kind: str, element):
+        """Add a branch to the model, stamping it into the cached Y-bus"""
+        self.get_ybus()
+        if kind == "line":
+            branch_id = element.line_id
+            self.lines[branch_id] = element
+        else:
+            branch_id = element.transformer_id
+            self.transformers[branch_id] = element
+        self._apply_delta([self._branch_delta(kind, element, 1.0)], f"+{kind}:{branch_id}:{element!r}")
+
+    def update_branch(self, kind: str, branch_id: str, **params):
+        """Edit branch parameters, restamping only that branch in the cached Y-bus"""
+        self.get_ybus()
+        element = (self.lines if kind == "line" else self.transformers)[branch_id]
+        removed = self._branch_delta(kind, element, -1.0)
+        if kind == "transformer" and "tap_position" in params and "tap_ratio" not in params:
+            element.tap_ratio = None  # A tap change moves off the exact model ratio
+        for key, value in params.items():
+            setattr(element, key, value)
+        self._apply_delta([removed, self._branch_delta(kind, element, 1.0)],
+                          f"~{kind}:{branch_id}:{sorted(params.items())!r}")
+
+    def update_bus(self, bus_id: str, **params):
+        """Edit bus data; a shunt change is restamped on the cached Y-bus diagonal
+
+        Loads, generation and voltages are not stamped, so other edits leave the
+        Y-bus alone.
+        """
+        if "shunt_mvar" in params:
+            self.get_ybus()
+        bus = self.buses[bus_id]
+        old_shunt = bus.shunt_mvar
+        for key, value in params.items():
+            setattr(bus, key, value)
+        if bus.shunt_mvar != old_shunt:
+            i = np.array([self._bus_index[bus_id]])
+            change = np.array([1j * (bus.shunt_mvar - old_shunt) / self.base_mva])
+            self._apply_delta([(i, i, change, np.zeros(1, dtype=complex))], f"~bus:{bus_id}:{bus.shunt_mvar!r}")
+
+    def with_outages(self, outages: Iterable[Tuple[str, str]]) -> 'PowerSystemNetwork':
+        """Lightweight overlay of this network with the given branches out of service
+
+        outages holds (kind, branch id) pairs, kind being line or transformer.
+        The overlay shares this network's element records; it holds only its
+        own branch dicts (without the outaged branches) and Y-bus (this
+        network's cached one with those branches unstamped). Overlays are
+        read-only: a load flow on one leaves the shared records alone and keeps
+        its results in the overlay's solution. Use copy() for a network to edit.
+        """
+        return self._derive(outages, shared=True)
+
+    def copy(self, outages: Iterable[Tuple[str, str]] = ()) -> 'PowerSystemNetwork':
+        """Independent copy of this network, optionally with branches out of service
+
+        Element records are copied, so editing or solving the copy never
+        touches this network.
+        """
+        return self._derive(outages, shared=False)
+
+    def _derive(self, outages: Iterable[Tuple[str, str]], shared: bool) -> 'PowerSystemNetwork':
+        y_bus = self.get_ybus()
+        network = PowerSystemNetwork()
+        if shared:
+            network.buses = self.buses
+            network.lines = _ElementDict(self.lines)
+            network.transformers = _ElementDict(self.transformers)
+            network.generators = self.generators
+            network.loads = self.loads
+            network.shunts = self.shunts
+        else:
+            network.buses = {bus_id: replace(bus) for bus_id, bus in self.buses.items()}
+            network.lines = {line_id: replace(line) for line_id, line in self.lines.items()}
+            network.transformers = {tr_id: replace(tr) for tr_id, tr in self.transformers.items()}
+            network.generators = {gen_id: dict(spec) for gen_id, spec in self.generators.items()}
+            network.loads = {load_id: dict(spec) for load_id, spec in self.loads.items()}
+            network.shunts = {shunt_id: dict(spec) for shunt_id, spec in self.shunts.items()}
+        network.records_shared = shared
+        network.base_mva = self.base_mva
+        network.frequency_hz = self.frequency_hz
+        network.source_short_circuit_mva = self.source_short_circuit_mva
+        network.source_x_r = self.source_x_r
+
+        network.y_bus = y_bus.copy()
+        network.ybus_key = self.ybus_key
+        network.ybus_parent = self.ybus_parent
+        network._bus_index = self._bus_index
+        network._mark_ybus_current()
+        for kind, branch_id in sorted(set(outages)):
+            elements = network.lines if kind == "line" else network.transformers
+            if branch_id in elements:
+                network.remove_branch(kind, branch_id)
+        return network
+
+    def slack_index(self) -> int:
+        """Position of the slack bus (first bus if none is marked)"""
+        return next((i for i, bus in enumerate(self.buses.values()) if bus.type == "Slack"), 0)
+
+    def source_admittance(self) -> complex:
+        """Admittance (pu) of the grid equivalent connected at the slack bus"""
+        z_source_mag = self.base_mva / self.source_short_circuit_mva
+        r_source = z_source_mag / math.sqrt(1 + self.source_x_r ** 2)
+        return 1 / complex(r_source, r_source * self.source_x_r)
+
+    def dc_sensitivities(self) -> DCSensitivities:
+        """PTDF and LODF matrices, recomputed only when the topology changes"""
+        y_bus = self.get_ybus()
+        slack = self.slack_index()
+        key = (self.ybus_key, slack)
+        if self._dc_sensitivities is not None and self._dc_sensitivities.key == key:
+            return self._dc_sensitivities
+
+        branches = self.branch_arrays()
+        f, t, y = branches["from"], branches["to"], branches["y_series"]
+        n_buses, n_branches = len(self.buses), len(y)
+
+        # Series susceptance 1/x; zero-impedance or open branches carry no DC flow
+        x = np.zeros(n_branches)
+        x[y != 0] = (1 / y[y != 0]).imag
+        b = np.zeros(n_branches)
+        b[x != 0] = 1 / x[x != 0]
+
+        # Branch-bus incidence and B = A^T diag(b) A, reduced to energised non-slack buses
+        incidence = sparse.coo_matrix(
+            (np.concatenate([np.ones(n_branches), -np.ones(n_branches)]),
+             (np.tile(np.arange(n_branches), 2), np.concatenate([f, t]))),
+            shape=(n_branches, n_buses)).tocsc()
+        energised = LoadFlowSolver.energised_buses(y_bus, slack)
+        keep = np.flatnonzero(energised & (np.arange(n_buses) != slack))
+        weighted = sparse.diags(b) @ incidence[:, keep]
+        b_bus = (incidence[:, keep].T @ weighted).tocsc()
+
+        ptdf = np.zeros((n_branches, n_buses))
+        if len(keep):
+            ptdf[:, keep] = splu(b_bus).solve(weighted.T.toarray()).T
+
+        # Flow on l per unit transfer between the ends of k, then LODF = H / (1 - H_kk)
+        h = ptdf[:, f] - ptdf[:, t]
+        denominator = 1 - np.diag(h)
+        islanding = np.abs(denominator) < 1e-6
+        lodf = np.zeros((n_branches, n_branches))
+        lodf[:, ~islanding] = h[:, ~islanding] / denominator[~islanding]
+        np.fill_diagonal(lodf, -1.0)
+
+        self._dc_sensitivities = DCSensitivities(
+            key=key,
+            branch_ids=list(branches["id"]),
+            branch_kinds=list(branches["kind"]),
+            ptdf=ptdf,
+            lodf=lodf,
+            islanding=islanding
+        )
+        return self._dc_sensitivities
+
+    def dc_power_flow(self) -> Dict[str, Any]:
+        """DC power flow: branch MW flows from the scheduled bus injections"""
+        sensitivities = self.dc_sensitivities()
+        injections = np.array([bus.generation_mw - bus.load_mw for bus in self.buses.values()])
+        flows = sensitivities.ptdf @ injections
+        return {
+            "converged": True,
+            "branch_flows_mw": dict(zip(sensitivities.branch_ids, flows.tolist()))
+        }
+
     def initialize_standard_substation(self):
         """Initialize standard 400/220 kV substation configuration"""
 
@@ -241,19 +707,78 @@ class PowerSystemNetwork:
         self.buses["BUS_400_1"].generation_mw = 350
         self.buses["BUS_400_1"].generation_mvar = 100
 
+class LowRankUpdatedLU:
+    """Solves (A + dA) x = b reusing the factors of A when dA touches few buses (Woodbury)"""
+
+    def __init__(self, base, delta: sparse.spmatrix):
+        self.base = base
+        delta = delta.tocsr()
+        self.touched = np.unique(np.concatenate(delta.nonzero())) if delta.nnz else np.zeros(0, dtype=int)
+        k = len(self.touched)
+
+        # dA = U C U^T with U the unit columns of the touched buses
+        u = np.zeros((delta.shape[0], k))
+        u[self.touched, np.arange(k)] = 1.0
+        self.c = delta[self.touched][:, self.touched].toarray()
+        self.w = base.solve(u) if k else u  # A^-1 U
+        self.s = np.eye(k) + self.c @ self.w[self.touched]
+        if k and np.linalg.cond(self.s) > 1e12:
+            raise RuntimeError("Updated matrix is singular")
+
+    @classmethod
+    def from_entries(cls, base, rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+                     keep: np.ndarray, n_full: int):
+        """Update for entries given in full bus indexing, restricted to the kept rows/columns"""
+        position = np.full(n_full, -1)
+        position[keep] = np.arange(len(keep))
+        r, c = position[rows], position[cols]
+        inside = (r >= 0) & (c >= 0)
+        delta = sparse.coo_matrix((values[inside], (r[inside], c[inside])), shape=(len(keep), len(keep)))
+        return cls(base, delta)
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        x = self.base.solve(b)
+        if not len(self.touched):
+            return x
+        return x - self.w @ np.linalg.solve(self.s, self.c @ x[self.touched])
+
+
 class LoadFlowSolver:
-    """Newton-Raphson load flow solver"""
+    """Newton-Raphson and fast-decoupled load flow solver"""
 
-    def __init__(self, network: PowerSystemNetwork):
+    def __init__(self, network: PowerSystemNetwork, method: str = "newton_raphson"):
         self.network = network
+        self.method = method  # newton_raphson | fast_decoupled
         self.max_iterations = 50
         self.tolerance = 1e-6
         self.convergence_history = []
 
-    def solve(self) -> Dict[str, Any]:
-        """Solve load flow using Newton-Raphson method"""
+        # B'/B'' LU factors per topology, least recently used evicted first
+        self.factor_cache_size = 64
+        self._fdlf_factors_cache: "OrderedDict[Tuple, Tuple[Any, Any]]" = OrderedDict()
+        self.factor_stats = {
+            "factorizations": 0,
+            "low_rank_updates": 0,
+            "hits": 0
+        }
+
+    @staticmethod
+    def energised_buses(y_bus: sparse.spmatrix, slack_bus: Optional[int]) -> np.ndarray:
+        """Mask of buses connected to the slack bus through the Y-bus pattern"""
+        n_buses = y_bus.shape[0]
+        if slack_bus is None:
+            return np.zeros(n_buses, dtype=bool)
+        _, labels = connected_components(y_bus != 0, directed=False)
+        return labels == labels[slack_bus]
+
+    def solve(self, method: Optional[str] = None) -> Dict[str, Any]:
+        """Solve load flow (Newton-Raphson, or fast-decoupled with Newton-Raphson fallback)"""
+        method = method or self.method
+        if method not in ("newton_raphson", "fast_decoupled"):
+            raise ValueError(f"Unknown load flow method: {method}")
+
         # Build Y-bus matrix
-        y_bus = self.network.build_ybus()
+        y_bus = self.network.get_ybus()
         n_buses = len(self.network.buses)
 
         # Initialize voltage vector
@@ -281,170 +806,375 @@ class LoadFlowSolver:
                 v_magnitude[i] = bus.voltage_pu
                 v_angle[i] = math.radians(bus.angle_deg)
 
-        # Newton-Raphson iterations
+        # Scheduled injections (pu)
+        buses = [self.network.buses[bus_id] for bus_id in bus_list]
+        p_spec = np.array([bus.generation_mw - bus.load_mw for bus in buses]) / self.network.base_mva
+        q_spec = np.array([bus.generation_mvar - bus.load_mvar for bus in buses]) / self.network.base_mva
+
+        # Buses islanded from the slack are de-energised and left out of the equations
+        energised = self.energised_buses(y_bus, slack_bus)
+        pq_buses = [i for i in pq_buses if energised[i]]
+        pv_buses = [i for i in pv_buses if energised[i]]
+        v_magnitude[~energised] = 0.0
+        v_angle[~energised] = 0.0
+
+        # Fast-decoupled first when requested, Newton-Raphson for what it cannot solve
+        fallback = False
+        if method == "fast_decoupled":
+            outcome = self._fast_decoupled(v_magnitude.copy(), v_angle.copy(), y_bus,
+                                           p_spec, q_spec, pq_buses, pv_buses)
+            if not outcome["converged"]:
+                logger.info("Fast-decoupled load flow did not converge, falling back to Newton-Raphson")
+                fallback = True
+                method = "newton_raphson"
+        if method == "newton_raphson":
+            outcome = self._newton_raphson(v_magnitude, v_angle, y_bus,
+                                           p_spec, q_spec, pq_buses, pv_buses)
+
+        if "error" in outcome:
+            return {"converged": False, "error": outcome["error"], "method": method, "fallback": fallback}
+
+        v_magnitude = outcome["v_magnitude"]
+        v_angle = outcome["v_angle"]
+        converged = outcome["converged"]
+        iteration = outcome["iterations"] - 1
+        max_mismatch = outcome["max_mismatch"]
+
+        # Update bus data with results (overlays keep them in their solution only)
+        angle_deg = np.degrees(v_angle)
+        if not self.network.records_shared:
+            for bus, v_pu, angle in zip(buses, v_magnitude, angle_deg):
+                bus.voltage_pu = v_pu
+                bus.angle_deg = angle
+
+        # Calculate line flows
+        branch_flows = self._calculate_line_flows(v_magnitude, angle_deg)
+
+        # Calculate losses
+        total_generation = sum(bus.generation_mw for bus in self.network.buses.values())
+        total_load = sum(bus.load_mw for bus in self.network.buses.values())
+        total_losses = total_generation - total_load
+
+        return {
+            "converged": converged,
+            "method": method,
+            "fallback": fallback,
+            "iterations": iteration + 1,
+            "max_mismatch": float(max_mismatch),
+            "total_generation_mw": total_generation,
+            "total_load_mw": total_load,
+            "total_losses_mw": total_losses,
+            "buses": {bus_id: {
+                "voltage_pu": v_pu,
+                "angle_deg": angle,
+                "voltage_kv": bus.voltage_kv * v_pu
+            } for bus_id, bus, v_pu, angle in zip(bus_list, buses, v_magnitude, angle_deg)},
+            "branches": branch_flows
+        }
+
+    def _newton_raphson(self, v_magnitude: np.ndarray, v_angle: np.ndarray,
+                        y_bus: sparse.spmatrix, p_spec: np.ndarray, q_spec: np.ndarray,
+                        pq_buses: List[int], pv_buses: List[int]) -> Dict[str, Any]:
+        """Full Newton-Raphson iterations from the given start point"""
+        p_rows = np.array(pq_buses + pv_buses, dtype=int)
+        q_rows = np.array(pq_buses, dtype=int)
+        n_p = len(p_rows)
+
+        converged = False
         for iteration in range(self.max_iterations):
             # Calculate power mismatches
             p_calc, q_calc = self._calculate_power(v_magnitude, v_angle, y_bus)
 
             # Power mismatches
-            delta_p = []
-            delta_q = []
-
-            for i in pq_buses + pv_buses:
-                bus = self.network.buses[bus_list[i]]
-                p_spec = (bus.generation_mw - bus.load_mw) / self.network.base_mva
-                delta_p.append(p_spec - p_calc[i])
-
-            for i in pq_buses:
-                bus = self.network.buses[bus_list[i]]
-                q_spec = (bus.generation_mvar - bus.load_mvar) / self.network.base_mva
-                delta_q.append(q_spec - q_calc[i])
+            mismatch = np.concatenate([p_spec[p_rows] - p_calc[p_rows],
+                                       q_spec[q_rows] - q_calc[q_rows]])
 
             # Check convergence
-            mismatch = np.concatenate([delta_p, delta_q])
-            max_mismatch = np.max(np.abs(mismatch))
+            max_mismatch = np.max(np.abs(mismatch)) if len(mismatch) else 0.0
             self.convergence_history.append(max_mismatch)
 
             if max_mismatch < self.tolerance:
+                converged = True
                 logger.info(f"Load flow converged in {iteration + 1} iterations")
                 break
+            if not np.isfinite(max_mismatch):
+                logger.error("Load flow diverged")
+                return {"error": "Diverged"}
 
             # Build Jacobian matrix
             jacobian = self._build_jacobian(v_magnitude, v_angle, y_bus,
                                            pq_buses, pv_buses)
 
-            # Solve for corrections
+            # Solve for corrections (sparse LU)
             try:
-                corrections = np.linalg.solve(jacobian, mismatch)
-            except np.linalg.LinAlgError:
+                corrections = splu(jacobian).solve(mismatch)
+            except RuntimeError:
                 logger.error("Jacobian matrix is singular")
-                return {"converged": False, "error": "Singular Jacobian"}
+                return {"error": "Singular Jacobian"}
 
             # Update voltages
-            k = 0
-            for i in pq_buses + pv_buses:
-                v_angle[i] += corrections[k]
-                k += 1
-            for i in pq_buses:
-                v_magnitude[i] += corrections[k]
-                k += 1
-
-        # Update bus data with results
-        for i, bus_id in enumerate(bus_list):
-            bus = self.network.buses[bus_id]
-            bus.voltage_pu = v_magnitude[i]
-            bus.angle_deg = math.degrees(v_angle[i])
-
-        # Calculate line flows
-        self._calculate_line_flows()
-
-        # Calculate losses
-        total_generation = sum(bus.generation_mw for bus in self.network.buses.values())
-        total_load = sum(bus.load_mw for bus in self.network.buses.values())
-        total_losses = total_generation - total_load
+            v_angle[p_rows] += corrections[:n_p]
+            v_magnitude[q_rows] += corrections[n_p:]
 
         return {
-            "converged": iteration < self.max_iterations - 1,
+            "v_magnitude": v_magnitude,
+            "v_angle": v_angle,
+            "converged": converged,
             "iterations": iteration + 1,
-            "max_mismatch": float(max_mismatch),
-            "total_generation_mw": total_generation,
-            "total_load_mw": total_load,
-            "total_losses_mw": total_losses,
-            "buses": {bus_id: {
-                "voltage_pu": bus.voltage_pu,
-                "angle_deg": bus.angle_deg,
-                "voltage_kv": bus.voltage_kv * bus.voltage_pu
-            } for bus_id, bus in self.network.buses.items()}
+            "max_mismatch": max_mismatch
         }
 
-    def _calculate_power(self, v_mag: np.ndarray, v_ang: np.ndarray,
-                        y_bus: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Calculate bus power injections"""
-        n = len(v_mag)
-        p = np.zeros(n)
-        q = np.zeros(n)
-
-        for i in range(n):
-            for j in range(n):
-                angle_diff = v_ang[i] - v_ang[j]
-                y_mag = abs(y_bus[i, j])
-                y_ang = cmath.phase(y_bus[i, j])
+    def _fast_decoupled(self, v_magnitude: np.ndarray, v_angle: np.ndarray,
+                        y_bus: sparse.spmatrix, p_spec: np.ndarray, q_spec: np.ndarray,
+                        pq_buses: List[int], pv_buses: List[int]) -> Dict[str, Any]:
+        """XB fast-decoupled iterations using the cached B'/B'' factors
 
-                p[i] += v_mag[i] * v_mag[j] * y_mag * math.cos(angle_diff - y_ang)
-                q[i] += v_mag[i] * v_mag[j] * y_mag * math.sin(angle_diff - y_ang)
+        Never raises or reports an error: a singular B matrix or divergence
+        simply returns converged=False so the caller can fall back.
+        """
+        p_rows = np.array(pq_buses + pv_buses, dtype=int)
+        q_rows = np.array(pq_buses, dtype=int)
+        not_converged = {"converged": False, "iterations": 0, "max_mismatch": float("inf")}
 
-        return p, q
+        b_prime = b_double_prime = None
+        if len(p_rows):
+            try:
+                b_prime, b_double_prime = self._fdlf_factors(y_bus, pq_buses, pv_buses)
+            except RuntimeError:
+                logger.warning("B' or B'' matrix is singular")
+                return not_converged
 
-    def _build_jacobian(self, v_mag: np.ndarray, v_ang: np.ndarray,
-                        y_bus: np.ndarray, pq_buses: List[int],
-                        pv_buses: List[int]) -> np.ndarray:
-        """Build Jacobian matrix for Newton-Raphson"""
-        n = len(v_mag)
-        n_pq = len(pq_buses)
-        n_pv = len(pv_buses)
+        converged = False
+        max_mismatch = 0.0
+        for iteration in range(self.max_iterations):
+            p_calc, q_calc = self._calculate_power(v_magnitude, v_angle, y_bus)
+            dp = p_spec[p_rows] - p_calc[p_rows]
+            dq = q_spec[q_rows] - q_calc[q_rows]
 
-        # Jacobian submatrices
-        j11 = np.zeros((n_pq + n_pv, n_pq + n_pv))  # dP/dtheta
-        j12 = np.zeros((n_pq + n_pv, n_pq))         # dP/dV
-        j21 = np.zeros((n_pq, n_pq + n_pv))         # dQ/dtheta
-        j22 = np.zeros((n_pq, n_pq))                # dQ/dV
+            max_mismatch = max(np.max(np.abs(dp), initial=0.0), np.max(np.abs(dq), initial=0.0))
+            self.convergence_history.append(max_mismatch)
 
-        # Fill Jacobian elements (simplified)
-        # In practice, these would be calculated based on power flow equations
+            if max_mismatch < self.tolerance:
+                converged = True
+                logger.info(f"Fast-decoupled load flow converged in {iteration + 1} iterations")
+                break
+            if not np.isfinite(max_mismatch):
+                return not_converged
 
-        # Combine submatrices
-        jacobian = np.block([[j11, j12],
-                            [j21, j22]])
+            # P-theta half iteration, then Q-V with the updated angles
+            v_angle[p_rows] += b_prime.solve(dp / v_magnitude[p_rows])
+            if len(q_rows):
+                _, q_calc = self._calculate_power(v_magnitude, v_angle, y_bus)
+                dq = q_spec[q_rows] - q_calc[q_rows]
+                v_magnitude[q_rows] += b_double_prime.solve(dq / v_magnitude[q_rows])
 
-        # Add small diagonal term for numerical stability
-        jacobian += np.eye(jacobian.shape[0]) * 1e-10
+        return {
+            "v_magnitude": v_magnitude,
+            "v_angle": v_angle,
+            "converged": converged,
+            "iterations": iteration + 1,
+            "max_mismatch": max_mismatch
+        }
 
-        return jacobian
+    def _fdlf_factors(self, y_bus: sparse.spmatrix, pq_buses: List[int],
+                      pv_buses: List[int]) -> Tuple[Any, Any]:
+        """LU factors of B' and B'', computed once per topology and bus type assignment"""
+        key = (self.network.ybus_key, tuple(pq_buses), tuple(pv_buses))
+        factors = self._fdlf_factors_cache.get(key)
+        if factors is not None:
+            self._fdlf_factors_cache.move_to_end(key)
+            self.factor_stats["hits"] += 1
+            return factors
+
+        pvpq = np.array(pq_buses + pv_buses, dtype=int)
+        pq = np.array(pq_buses, dtype=int)
+
+        # Few branches changed since a factored Y-bus: update those factors instead
+        factors = None
+        parent = self.network.ybus_parent
+        parent_factors = (self._fdlf_factors_cache.get((parent["key"], tuple(pq_buses), tuple(pv_buses)))
+                          if parent is not None else None)
+        if parent_factors is not None:
+            n_buses = y_bus.shape[0]
+            try:
+                factors = (
+                    LowRankUpdatedLU.from_entries(parent_factors[0], parent["rows"], parent["cols"],
+                                                  -parent["x"].imag, pvpq, n_buses),
+                    LowRankUpdatedLU.from_entries(parent_factors[1], parent["rows"], parent["cols"],
+                                                  -parent["y"].imag, pq, n_buses) if len(pq) else None
+                )
+                self.factor_stats["low_rank_updates"] += 1
+            except RuntimeError:
+                factors = None
+
+        if factors is None:
+            # XB scheme: B' from branch reactances only, B'' from the full Y-bus
+            b_prime = -self.network.build_reactance_ybus().imag
+            b_double_prime = -y_bus.imag
+            factors = (splu(b_prime[pvpq][:, pvpq].tocsc()),
+                       splu(b_double_prime[pq][:, pq].tocsc()) if len(pq) else None)
+            self.factor_stats["factorizations"] += 1
+
+        self._fdlf_factors_cache[key] = factors
+        if len(self._fdlf_factors_cache) > self.factor_cache_size:
+            self._fdlf_factors_cache.popitem(last=False)
+        return factors
 
-    def _calculate_line_flows(self):
-        """Calculate power flows in lines and transformers"""
-        bus_voltages = {}
-        for bus_id, bus in self.network.buses.items():
-            bus_voltages[bus_id] = bus.get_complex_voltage() * bus.voltage_kv / math.sqrt(3)
+    def _calculate_power(self, v_mag: np.ndarray, v_ang: np.ndarray,
+                        y_bus: sparse.spmatrix) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate bus power injections, S = V * conj(Y V)"""
+        v = v_mag * np.exp(1j * v_ang)
+        s = v * np.conj(y_bus @ v)
+        return s.real, s.imag
 
-        # Calculate line flows
-        for line in self.network.lines.values():
-            if line.from_bus in bus_voltages and line.to_bus in bus_voltages:
-                v_from = bus_voltages[line.from_bus]
-                v_to = bus_voltages[line.to_bus]
-
-                # Current flow
-                z = line.get_impedance()
-                i = (v_from - v_to) / z if abs(z) > 0 else 0
-
-                # Power flow
-                s_from = v_from * np.conj(i) * 3 / 1e6  # Convert to MVA
-                line.power_flow_mw = s_from.real
-                line.power_flow_mvar = s_from.imag
-                line.current_flow_a = abs(i)
-                line.loading_percent = (abs(s_from) / line.rating_mva) * 100
-
-        # Calculate transformer flows
-        for transformer in self.network.transformers.values():
-            if transformer.from_bus in bus_voltages and transformer.to_bus in bus_voltages:
-                # Simplified transformer flow calculation
-                v_from = self.network.buses[transformer.from_bus].voltage_pu
-                v_to = self.network.buses[transformer.to_bus].voltage_pu
-                angle_diff = (self.network.buses[transformer.from_bus].angle_deg -
-                             self.network.buses[transformer.to_bus].angle_deg)
-
-                # Approximate power flow
-                x_pu = transformer.x_percent / 100
-                p_flow = (v_from * v_to * math.sin(math.radians(angle_diff))) / x_pu * self.network.base_mva
-                transformer.loading_percent = abs(p_flow / transformer.rating_mva) * 100
+    def _build_jacobian(self, v_mag: np.ndarray, v_ang: np.ndarray,
+                        y_bus: sparse.spmatrix, pq_buses: List[int],
+                        pv_buses: List[int]) -> sparse.csc_matrix:
+        """Build the sparse Newton-Raphson Jacobian from the analytical dS/dV"""
+        v = v_mag * np.exp(1j * v_ang)
+        i_bus = y_bus @ v
+        diag_v = sparse.diags(v)
+        diag_i = sparse.diags(i_bus)
+        # Unit phasors; de-energised buses (|V| = 0) are outside the equations
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diag_v_norm = sparse.diags(np.where(v_mag > 0, v / v_mag, 0))
+
+        # dS/dVm = diag(V) conj(Y diag(V/|V|)) + conj(diag(I)) diag(V/|V|)
+        ds_dvm = diag_v @ (y_bus @ diag_v_norm).conj() + diag_i.conj() @ diag_v_norm
+        # dS/dVa = j diag(V) conj(diag(I) - Y diag(V))
+        ds_dva = 1j * diag_v @ (diag_i - y_bus @ diag_v).conj()
+
+        pvpq = np.array(pq_buses + pv_buses, dtype=int)
+        pq = np.array(pq_buses, dtype=int)
+        ds_dva = ds_dva.tocsr()
+        ds_dvm = ds_dvm.tocsr()
+
+        j11 = ds_dva[pvpq][:, pvpq].real  # dP/dtheta
+        j12 = ds_dvm[pvpq][:, pq].real    # dP/dV
+        j21 = ds_dva[pq][:, pvpq].imag    # dQ/dtheta
+        j22 = ds_dvm[pq][:, pq].imag      # dQ/dV
+
+        return sparse.bmat([[j11, j12],
+                            [j21, j22]], format='csc')
+
+    def _calculate_line_flows(self, v_magnitude: np.ndarray,
+                              angle_deg: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        """Branch flows at the sending end from the solved voltages (pi model, tap on the from side)
+
+        Also sets the network's solution; branch records are updated unless
+        they are shared with another network.
+        """
+        branches = self.network.branch_arrays()
+        buses = list(self.network.buses.values())
+        v = v_magnitude * np.exp(1j * np.radians(angle_deg))
+        f, t, y, tap = branches["from"], branches["to"], branches["y_series"], branches["tap"]
+
+        i_from = v[f] * (y + branches["y_shunt"] / 2) / tap ** 2 - v[t] * y / tap
+        s_from = v[f] * np.conj(i_from) * self.network.base_mva
+        kv_from = np.array([buses[i].voltage_kv for i in f], dtype=float) * np.abs(v[f])
+        current_a = np.divide(np.abs(s_from) * 1000, math.sqrt(3) * kv_from,
+                              out=np.zeros(len(f)), where=kv_from > 0)
+
+        elements = [(self.network.lines if kind == "line" else self.network.transformers)[branch_id]
+                    for kind, branch_id in zip(branches["kind"], branches["id"])]
+        ratings = np.array([element.rating_mva for element in elements], dtype=float)
+        loading = np.abs(s_from) / ratings * 100
+        self.network.solution = LoadFlowState(
+            voltage_pu=v_magnitude, angle_deg=angle_deg,
+            branch_ids=branches["id"], branch_kinds=branches["kind"],
+            p_mw=s_from.real, q_mvar=s_from.imag, current_a=current_a, loading_percent=loading)
+
+        flows = {}
+        for n, (kind, branch_id, element) in enumerate(zip(branches["kind"], branches["id"], elements)):
+            if not self.network.records_shared:
+                element.loading_percent = float(loading[n])
+                if kind == "line":
+                    element.power_flow_mw = float(s_from[n].real)
+                    element.power_flow_mvar = float(s_from[n].imag)
+                    element.current_flow_a = float(current_a[n])
+            flows[branch_id] = {
+                "kind": kind,
+                "p_mw": float(s_from[n].real),
+                "q_mvar": float(s_from[n].imag),
+                "current_a": float(current_a[n]),
+                "loading_percent": float(loading[n])
+            }
+        return flows
 
 class FaultAnalysis:
-    """Short circuit and fault analysis"""
+    """Short circuit and fault analysis
+
+    The Y-bus (plus the grid source admittance at the slack bus) is LU-factored
+    once per topology; Z-bus columns are solved from the factors on demand.
+    """
 
     def __init__(self, network: PowerSystemNetwork):
         self.network = network
         self.fault_results = {}
 
+        # Standard breaker ratings for different voltage levels
+        self.breaker_ratings_ka = {
+            400: 50,  # 50 kA for 400 kV
+            220: 40,  # 40 kA for 220 kV
+            33: 25    # 25 kA for 33 kV
+        }
+
+        self._factor_key = None
+        self._lu = None
+        self._bus_index: Dict[str, int] = {}
+        self._reduced_index: Dict[int, int] = {}  # bus index -> row of the factored (energised) system
+        self._z_columns: Dict[int, np.ndarray] = {}
+        self._z_diag: Optional[np.ndarray] = None
+        self.stats = {
+            "factorizations": 0,
+            "column_solves": 0
+        }
+
+    def _factorize(self):
+        """LU factors of the fault Y-bus, refreshed only when the topology changes"""
+        y_bus = self.network.get_ybus()
+        slack = self.network.slack_index()
+        key = (self.network.ybus_key, slack, self.network.source_admittance())
+        if key == self._factor_key:
+            return
+
+        y_source = np.zeros(len(self.network.buses), dtype=complex)
+        y_source[slack] = self.network.source_admittance()
+
+        # Buses without a path to the source have no fault contribution and are left out
+        energised = np.flatnonzero(LoadFlowSolver.energised_buses(y_bus, slack))
+        y_fault = (y_bus + sparse.diags(y_source)).tocsc()[energised][:, energised]
+
+        self._lu = splu(y_fault.tocsc()) if len(energised) else None
+        self._bus_index = {bus_id: i for i, bus_id in enumerate(self.network.buses)}
+        self._reduced_index = {int(i): k for k, i in enumerate(energised)}
+        self._z_columns = {}
+        self._z_diag = None
+        self._factor_key = key
+        self.stats["factorizations"] += 1
+
+    def z_column(self, bus_id: str) -> Optional[np.ndarray]:
+        """Z-bus column of one bus (Thevenin and transfer impedances), None if de-energised"""
+        self._factorize()
+        k = self._reduced_index.get(self._bus_index[bus_id])
+        if k is None:
+            return None
+        column = self._z_columns.get(k)
+        if column is None:
+            unit = np.zeros(len(self._reduced_index), dtype=complex)
+            unit[k] = 1.0
+            column = self._lu.solve(unit)
+            self._z_columns[k] = column
+            self.stats["column_solves"] += 1
+        return column
+
+    def thevenin_impedance(self, bus_id: str) -> Optional[complex]:
+        """Driving-point impedance Z_kk (pu), None if the bus is de-energised"""
+        column = self.z_column(bus_id)
+        if column is None:
+            return None
+        return complex(column[self._reduced_index[self._bus_index[bus_id]]])
+
     def calculate_fault(self, bus_id: str, fault_type: FaultType) -> Dict[str, Any]:
         """Calculate fault currents"""
         if bus_id not in self.network.buses:
@@ -453,42 +1183,23 @@ class FaultAnalysis:
         bus = self.network.buses[bus_id]
         base_current = self.network.base_mva / (math.sqrt(3) * bus.voltage_kv)
 
-        # Build impedance matrix (Z-bus)
-        z_bus = self._build_zbus()
+        z_thevenin = self.thevenin_impedance(bus_id)
+        if z_thevenin is None:
+            return {"error": "Bus is de-energised"}
 
         # Fault impedance (assumed zero for solid fault)
         z_fault = 0.0
 
         # Calculate fault current based on type
-        if fault_type == FaultType.THREE_PHASE:
-            # Three-phase fault
-            i_fault = self._calculate_3ph_fault(bus_id, z_bus, z_fault)
-            fault_current_ka = abs(i_fault) * base_current / 1000
-
-        elif fault_type == FaultType.LINE_TO_GROUND:
-            # Single line-to-ground fault
-            i_fault = self._calculate_lg_fault(bus_id, z_bus, z_fault)
-            fault_current_ka = abs(i_fault) * base_current / 1000 * 3  # LG fault multiplier
-
-        elif fault_type == FaultType.LINE_TO_LINE:
-            # Line-to-line fault
-            i_fault = self._calculate_ll_fault(bus_id, z_bus, z_fault)
-            fault_current_ka = abs(i_fault) * base_current / 1000 * math.sqrt(3)
-
+        if fault_type in self._FAULT_CURRENTS:
+            i_fault = self._FAULT_CURRENTS[fault_type](z_thevenin, z_fault)
+            fault_current_ka = abs(i_fault) * base_current * self._FAULT_MULTIPLIERS[fault_type]
         else:
             fault_current_ka = 0
 
-        # Calculate X/R ratio
-        bus_index = list(self.network.buses.keys()).index(bus_id)
-        z_thevenin = z_bus[bus_index, bus_index] if z_bus is not None else complex(0.1, 0.5)
-        x_r_ratio = abs(z_thevenin.imag / z_thevenin.real) if z_thevenin.real != 0 else 10
-
-        # Peak current
-        peak_factor = math.sqrt(2) * (1 + math.exp(-math.pi / x_r_ratio))
-        peak_current_ka = fault_current_ka * peak_factor
-
-        # Breaking current (considering DC component decay)
-        breaking_current_ka = fault_current_ka * (1 + 0.5 * math.exp(-0.04 * 3 / x_r_ratio))
+        x_r_ratio, peak_current_ka, breaking_current_ka = (
+            float(value) for value in self._current_ratings(z_thevenin, fault_current_ka)
+        )
 
         results = {
             "bus": bus_id,
@@ -509,32 +1220,82 @@ class FaultAnalysis:
 
         return results
 
-    def _build_zbus(self) -> np.ndarray:
-        """Build impedance matrix (Z-bus) from Y-bus"""
-        y_bus = self.network.build_ybus()
-        try:
-            z_bus = np.linalg.inv(y_bus)
-        except np.linalg.LinAlgError:
-            logger.error("Cannot invert Y-bus matrix")
-            z_bus = None
-        return z_bus
-
-    def _calculate_3ph_fault(self, bus_id: str, z_bus: np.ndarray,
-                            z_fault: complex) -> complex:
-        """Calculate three-phase fault current"""
-        bus_index = list(self.network.buses.keys()).index(bus_id)
-        z_thevenin = z_bus[bus_index, bus_index] if z_bus is not None else complex(0.1, 0.5)
+    def sweep_all_faults(self, z_fault: complex = 0.0) -> Dict[str, Any]:
+        """Short-circuit table: every bus x every fault type in one vectorized pass"""
+        self._factorize()
+        bus_ids = list(self.network.buses)
+        buses = list(self.network.buses.values())
+        positions = np.array([self._reduced_index.get(i, -1) for i in range(len(bus_ids))])
+        energised = positions >= 0
+
+        # Driving-point impedances of all energised buses from one multi-column solve
+        z1 = np.full(len(bus_ids), np.nan, dtype=complex)
+        if self._lu is not None:
+            if self._z_diag is None:
+                n_reduced = len(self._reduced_index)
+                self._z_diag = np.diag(self._lu.solve(np.eye(n_reduced, dtype=complex))).copy()
+            z1[energised] = self._z_diag[positions[energised]]
+
+        base_current = self.network.base_mva / (math.sqrt(3) * np.array([bus.voltage_kv for bus in buses]))
+        ratings = np.array([self.breaker_ratings_ka.get(int(bus.voltage_kv), np.nan) for bus in buses])
+
+        table = {bus_id: {"energised": bool(energised[i]), "faults": {}} for i, bus_id in enumerate(bus_ids)}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for fault_type, fault_current in self._FAULT_CURRENTS.items():
+                current_ka = np.abs(fault_current(z1, z_fault)) * base_current * self._FAULT_MULTIPLIERS[fault_type]
+                current_ka = np.where(energised, current_ka, 0.0)
+                _, peak_ka, breaking_ka = self._current_ratings(z1, current_ka)
+                peak_ka = np.where(energised, peak_ka, 0.0)
+                breaking_ka = np.where(energised, breaking_ka, 0.0)
+                for i, bus_id in enumerate(bus_ids):
+                    table[bus_id]["faults"][fault_type.value] = {
+                        "symmetrical_current_ka": float(current_ka[i]),
+                        "peak_current_ka": float(peak_ka[i]),
+                        "breaking_current_ka": float(breaking_ka[i]),
+                        "breaker_rating_ka": None if np.isnan(ratings[i]) else float(ratings[i]),
+                        "adequate": bool(np.isnan(ratings[i]) or current_ka[i] <= 0.8 * ratings[i])
+                    }
+            x_r_ratio = self._current_ratings(z1, np.zeros(len(bus_ids)))[0]
+
+        for i, bus_id in enumerate(bus_ids):
+            table[bus_id]["x_r_ratio"] = float(x_r_ratio[i]) if energised[i] else None
+            table[bus_id]["thevenin_impedance"] = (
+                {"magnitude": float(abs(z1[i])), "angle_deg": float(np.degrees(np.angle(z1[i])))}
+                if energised[i] else None
+            )
+
+        return {
+            "fault_types": [fault_type.value for fault_type in self._FAULT_CURRENTS],
+            "buses": table
+        }
+
+    @staticmethod
+    def _current_ratings(z_thevenin, fault_current_ka) -> Tuple[np.ndarray, ...]:
+        """X/R ratio, peak and breaking current (scalar or per-bus arrays)"""
+        x_r_ratio = np.where(z_thevenin.real != 0,
+                             np.abs(z_thevenin.imag / np.where(z_thevenin.real != 0, z_thevenin.real, 1)),
+                             10.0)
+
+        # Peak current
+        peak_factor = math.sqrt(2) * (1 + np.exp(-math.pi / x_r_ratio))
+        peak_current_ka = fault_current_ka * peak_factor
+
+        # Breaking current (considering DC component decay)
+        breaking_current_ka = fault_current_ka * (1 + 0.5 * np.exp(-0.04 * 3 / x_r_ratio))
+        return x_r_ratio, peak_current_ka, breaking_current_ka
+
+    @staticmethod
+    def _calculate_3ph_fault(z_thevenin, z_fault: complex):
+        """Calculate three-phase fault current (scalar or per-bus arrays)"""
         v_prefault = 1.0  # Assume 1.0 pu prefault voltage
         i_fault = v_prefault / (z_thevenin + z_fault)
         return i_fault
 
-    def _calculate_lg_fault(self, bus_id: str, z_bus: np.ndarray,
-                           z_fault: complex) -> complex:
-        """Calculate line-to-ground fault current"""
+    @staticmethod
+    def _calculate_lg_fault(z1, z_fault: complex):
+        """Calculate line-to-ground fault current (scalar or per-bus arrays)"""
         # Simplified - uses positive sequence only
         # Full calculation would use sequence networks
-        bus_index = list(self.network.buses.keys()).index(bus_id)
-        z1 = z_bus[bus_index, bus_index] if z_bus is not None else complex(0.1, 0.5)
         z2 = z1  # Assume Z2 = Z1
         z0 = z1 * 3  # Assume Z0 = 3*Z1
 
@@ -542,28 +1303,31 @@ class FaultAnalysis:
         i_fault = 3 * v_prefault / (z1 + z2 + z0 + 3 * z_fault)
         return i_fault
 
-    def _calculate_ll_fault(self, bus_id: str, z_bus: np.ndarray,
-                           z_fault: complex) -> complex:
-        """Calculate line-to-line fault current"""
-        bus_index = list(self.network.buses.keys()).index(bus_id)
-        z1 = z_bus[bus_index, bus_index] if z_bus is not None else complex(0.1, 0.5)
+    @staticmethod
+    def _calculate_ll_fault(z1, z_fault: complex):
+        """Calculate line-to-line fault current (scalar or per-bus arrays)"""
         z2 = z1  # Assume Z2 = Z1
 
         v_prefault = 1.0
         i_fault = v_prefault / (z1 + z2 + z_fault)
         return i_fault
 
+    # Fault current per type and the multiplier from |I| x base current to phase kA
+    _FAULT_CURRENTS = {
+        FaultType.THREE_PHASE: _calculate_3ph_fault.__func__,
+        FaultType.LINE_TO_GROUND: _calculate_lg_fault.__func__,
+        FaultType.LINE_TO_LINE: _calculate_ll_fault.__func__
+    }
+    _FAULT_MULTIPLIERS = {
+        FaultType.THREE_PHASE: 1.0,
+        FaultType.LINE_TO_GROUND: 1.0,  # 3 I0 is already the faulted phase current
+        FaultType.LINE_TO_LINE: math.sqrt(3)
+    }
+
     def _check_breaker_ratings(self, fault_current_ka: float) -> Dict[str, Any]:
         """Check if breakers are adequately rated"""
-        # Standard breaker ratings for different voltage levels
-        breaker_ratings = {
-            400: 50,  # 50 kA for 400 kV
-            220: 40,  # 40 kA for 220 kV
-            33: 25    # 25 kA for 33 kV
-        }
-
         results = {}
-        for voltage, rating in breaker_ratings.items():
+        for voltage, rating in self.breaker_ratings_ka.items():
             margin = ((rating - fault_current_ka) / rating) * 100
             results[f"{voltage}kV"] = {
                 "rating_ka": rating,
@@ -573,113 +1337,239 @@ class FaultAnalysis:
 
         return results
 
+@dataclass(frozen=True)
+class ContingencyCase:
+    """One outage case: out-of-service branches overlaid on the unchanged base network"""
+    name: str
+    type: str  # line_outage | transformer_outage | n2_outage
+    outages: FrozenSet[Tuple[str, str]]  # (line | transformer, branch id)
+
+# Per-process solver, keeps its B'/B'' factor cache across batches
+_worker_solver: Optional['LoadFlowSolver'] = None
+
+def _solve_contingency_cases(base: PowerSystemNetwork, cases: List[ContingencyCase],
+                             method: str, solver: Optional['LoadFlowSolver'] = None) -> List[Dict[str, Any]]:
+    """Solve outage cases as overlays of the base network (also runs in pool workers)"""
+    global _worker_solver
+    if solver is None:
+        if _worker_solver is None or _worker_solver.method != method:
+            _worker_solver = LoadFlowSolver(base, method=method)
+        solver = _worker_solver
+
+    # Factor the intact network first so single-branch cases become low-rank updates of it
+    if method == "fast_decoupled":
+        solver.network = base.with_outages(())
+        solver.solve()
+
+    results = []
+    for case in cases:
+        network = base.with_outages(case.outages)
+        solver.network = network
+        lf_result = solver.solve()
+        violations = ContingencyAnalysis._check_violations(network)
+        results.append({
+            "contingency": case.name,
+            "type": case.type,
+            "converged": lf_result["converged"],
+            "screened_out": False,
+            "violations": violations,
+            "severity": ContingencyAnalysis._calculate_severity(violations)
+        })
+    solver.network = base
+    return results
+
 class ContingencyAnalysis:
-    """N-1 and N-2 contingency analysis"""
+    """N-1 and N-2 contingency analysis
 
-    def __init__(self, network: PowerSystemNetwork):
-        self.network = network
-        self.solver = LoadFlowSolver(network)
+    The network is never modified: each case is an immutable outage overlay
+    that shares the base records and is solved into its own arrays, so cases
+    can be spread over worker processes.
+    """
 
-    def run_n1_contingency(self) -> List[Dict[str, Any]]:
-        """Run N-1 contingency analysis"""
+    def __init__(self, network: PowerSystemNetwork, workers: int = 1):
+        self.network = network
+        # Fast-decoupled keeps B'/B'' factors per outage topology across runs
+        self.solver = LoadFlowSolver(network, method="fast_decoupled")
+        # DC PTDF/LODF screen; only flagged outages get an AC solve
+        self.dc_screening = True
+        self.screening_threshold_percent = 80.0
+        # Worker processes for AC case solves (1 = in this process)
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _solve_cases(self, cases: List[ContingencyCase]) -> List[Dict[str, Any]]:
+        """AC-solve cases in order, in this process or split over the worker pool"""
+        if not cases:
+            return []
+        if self.workers <= 1:
+            return _solve_contingency_cases(self.network, cases, self.solver.method, self.solver)
+
+        # One contiguous batch per worker; the base network is shipped once per batch
+        batches = [list(batch) for batch in np.array_split(np.array(cases, dtype=object),
+                                                             min(self.workers, len(cases)))]
+        futures = [self._pool().submit(_solve_contingency_cases, self.network, batch, self.solver.method)
+                   for batch in batches]
         results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
 
-        # Save original network state
-        original_lines = self.network.lines.copy()
-        original_transformers = self.network.transformers.copy()
-
-        # Line contingencies
-        for line_id, line in original_lines.items():
-            # Remove line
-            del self.network.lines[line_id]
-
-            # Run load flow
-            lf_result = self.solver.solve()
-
-            # Check violations
-            violations = self._check_violations()
-
-            results.append({
-                "contingency": f"Line_{line_id}",
-                "type": "line_outage",
-                "converged": lf_result["converged"],
-                "violations": violations,
-                "severity": self._calculate_severity(violations)
-            })
-
-            # Restore line
-            self.network.lines[line_id] = line
-
-        # Transformer contingencies
-        for tr_id, transformer in original_transformers.items():
-            # Remove transformer
-            del self.network.transformers[tr_id]
-
-            # Run load flow
-            lf_result = self.solver.solve()
-
-            # Check violations
-            violations = self._check_violations()
+    def screen_n1_dc(self) -> Dict[str, Dict[str, Any]]:
+        """DC screening of every single-branch outage with PTDF/LODF matrices
+
+        Post-outage flows of all cases come from one matrix operation:
+        F[l, k] = f[l] + LODF[l, k] * f[k]. A case is flagged when any remaining
+        branch exceeds screening_threshold_percent of its rating or the outage
+        splits the network.
+        """
+        sensitivities = self.network.dc_sensitivities()
+        injections = np.array([bus.generation_mw - bus.load_mw for bus in self.network.buses.values()])
+        base_flows = sensitivities.ptdf @ injections
+
+        ratings = np.array([
+            (self.network.lines[branch_id] if kind == "line" else self.network.transformers[branch_id]).rating_mva
+            for branch_id, kind in zip(sensitivities.branch_ids, sensitivities.branch_kinds)
+        ])
+        post_flows = base_flows[:, None] + sensitivities.lodf * base_flows[None, :]
+        loading = np.abs(post_flows) / ratings[:, None] * 100
+        np.fill_diagonal(loading, 0.0)  # the outaged branch itself carries nothing
+        max_loading = loading.max(axis=0) if len(ratings) else np.zeros(0)
+        flagged = (max_loading > self.screening_threshold_percent) | sensitivities.islanding
 
-            results.append({
-                "contingency": f"Transformer_{tr_id}",
-                "type": "transformer_outage",
-                "converged": lf_result["converged"],
-                "violations": violations,
-                "severity": self._calculate_severity(violations)
-            })
+        return {
+            branch_id: {
+                "kind": kind,
+                "dc_max_loading_percent": float(max_loading[k]),
+                "islanding": bool(sensitivities.islanding[k]),
+                "flagged": bool(flagged[k])
+            }
+            for k, (branch_id, kind) in enumerate(zip(sensitivities.branch_ids, sensitivities.branch_kinds))
+        }
 
-            # Restore transformer
-            self.network.transformers[tr_id] = transformer
+    def n1_cases(self) -> List[ContingencyCase]:
+        """Single-branch outage cases of the base network"""
+        return ([ContingencyCase(f"Line_{line_id}", "line_outage", frozenset({("line", line_id)}))
+                 for line_id in self.network.lines] +
+                [ContingencyCase(f"Transformer_{tr_id}", "transformer_outage",
+                                 frozenset({("transformer", tr_id)}))
+                 for tr_id in self.network.transformers])
 
+    def run_n1_contingency(self) -> List[Dict[str, Any]]:
+        """Run N-1 contingency analysis, solving AC only for DC-flagged outages"""
+        screening = self.screen_n1_dc() if self.dc_screening else {}
+        cases = self.n1_cases()
+
+        # Outages the DC screen clears are reported without an AC solve
+        results: List[Optional[Dict[str, Any]]] = [None] * len(cases)
+        ac_positions = []
+        for position, case in enumerate(cases):
+            (kind, branch_id), = case.outages
+            screen = screening.get(branch_id)
+            if screen is not None and screen["kind"] == kind and not screen["flagged"]:
+                violations = {"voltage": [], "line_overload": [], "transformer_overload": [], "islanded": []}
+                results[position] = {
+                    "contingency": case.name,
+                    "type": case.type,
+                    "converged": True,
+                    "screened_out": True,
+                    "dc_max_loading_percent": screen["dc_max_loading_percent"],
+                    "violations": violations,
+                    "severity": self._calculate_severity(violations)
+                }
+            else:
+                ac_positions.append(position)
+
+        ac_results = self._solve_cases([cases[position] for position in ac_positions])
+        for position, result in zip(ac_positions, ac_results):
+            (_, branch_id), = cases[position].outages
+            screen = screening.get(branch_id)
+            result["dc_max_loading_percent"] = screen["dc_max_loading_percent"] if screen else None
+            results[position] = result
         return results
 
-    def _check_violations(self) -> Dict[str, List[Dict]]:
-        """Check for voltage and loading violations"""
+    def run_n2_contingency(self, max_cases: int = 5000) -> List[Dict[str, Any]]:
+        """Run N-2 contingency analysis over all branch pairs (AC, no DC screen)"""
+        single = self.n1_cases()
+        cases = [ContingencyCase(f"{first.name}+{second.name}", "n2_outage", first.outages | second.outages)
+                 for first, second in combinations(single, 2)]
+        if len(cases) > max_cases:
+            logger.warning(f"N-2 limited to {max_cases} of {len(cases)} cases")
+            cases = cases[:max_cases]
+        return self._solve_cases(cases)
+
+    @staticmethod
+    def _check_violations(network: PowerSystemNetwork) -> Dict[str, List[Dict]]:
+        """Check for voltage and loading violations
+
+        Buses islanded from the slack are listed under "islanded" rather than
+        as undervoltage; they are not counted in the severity. Results are read
+        from the network's solution when it has one (always for overlays).
+        """
         violations = {
             "voltage": [],
             "line_overload": [],
-            "transformer_overload": []
+            "transformer_overload": [],
+            "islanded": []
         }
+        energised = LoadFlowSolver.energised_buses(network.get_ybus(), network.slack_index())
+        solution = network.solution
+        if solution is not None:
+            voltages = solution.voltage_pu
+            branches = [(kind, branch_id, loading) for kind, branch_id, loading in
+                        zip(solution.branch_kinds, solution.branch_ids, solution.loading_percent)]
+        else:
+            voltages = [bus.voltage_pu for bus in network.buses.values()]
+            branches = ([("line", line_id, line.loading_percent) for line_id, line in network.lines.items()] +
+                        [("transformer", tr_id, tr.loading_percent)
+                         for tr_id, tr in network.transformers.items()])
 
         # Check voltage violations
-        for bus_id, bus in self.network.buses.items():
-            if bus.voltage_pu < bus.v_min:
+        for bus_id, bus, voltage_pu, live in zip(network.buses, network.buses.values(), voltages, energised):
+            if not live:
+                violations["islanded"].append(bus_id)
+            elif voltage_pu < bus.v_min:
                 violations["voltage"].append({
                     "bus": bus_id,
-                    "voltage_pu": bus.voltage_pu,
+                    "voltage_pu": float(voltage_pu),
                     "limit": bus.v_min,
                     "type": "undervoltage"
                 })
-            elif bus.voltage_pu > bus.v_max:
+            elif voltage_pu > bus.v_max:
                 violations["voltage"].append({
                     "bus": bus_id,
-                    "voltage_pu": bus.voltage_pu,
+                    "voltage_pu": float(voltage_pu),
                     "limit": bus.v_max,
                     "type": "overvoltage"
                 })
 
-        # Check line overloads
-        for line_id, line in self.network.lines.items():
-            if line.loading_percent > 100:
-                violations["line_overload"].append({
-                    "line": line_id,
-                    "loading_percent": line.loading_percent,
-                    "rating_mva": line.rating_mva
-                })
-
-        # Check transformer overloads
-        for tr_id, transformer in self.network.transformers.items():
-            if transformer.loading_percent > 100:
-                violations["transformer_overload"].append({
-                    "transformer": tr_id,
-                    "loading_percent": transformer.loading_percent,
-                    "rating_mva": transformer.rating_mva
+        # Check line and transformer overloads
+        for kind, branch_id, loading in branches:
+            if loading > 100:
+                element = network.lines[branch_id] if kind == "line" else network.transformers[branch_id]
+                violations[f"{kind}_overload"].append({
+                    kind: branch_id,
+                    "loading_percent": float(loading),
+                    "rating_mva": element.rating_mva
                 })
 
         return violations
 
-    def _calculate_severity(self, violations: Dict) -> str:
+    @staticmethod
+    def _calculate_severity(violations: Dict) -> str:
         """Calculate contingency severity"""
         total_violations = (len(violations["voltage"]) +
                           len(violations["line_overload"]) +
@@ -695,76 +1585,293 @@ class ContingencyAnalysis:
             return "SEVERE"
 
 class TransientStabilityAnalysis:
-    """Transient stability analysis for dynamic simulations"""
+    """Transient stability analysis for dynamic simulations
+
+    Classical multi-machine model: each generator is a constant EMF behind its
+    transient reactance, loads are constant admittances and the external grid
+    is an infinite bus behind the source impedance at the slack bus. The
+    network is Kron-reduced to the machine internal nodes once per fault
+    location and the swing equations of all machines are advanced together
+    with RK4. Generators come from network.generators entries
+    ({'bus', 'p_mw', 'mva', 'h', 'd', 'xd_prime'}); without any, one machine is
+    placed at each bus with scheduled generation.
+    """
 
     def __init__(self, network: PowerSystemNetwork):
         self.network = network
-        self.time_step = 0.001  # 1 ms
+        self.time_step = 0.005  # 5 ms (RK4)
+        self.output_step = 0.02  # recorded sample spacing
         self.simulation_time = 10.0  # 10 seconds
 
-    def simulate_fault_clearing(self, fault_bus: str, fault_duration: float) -> Dict:
-        """Simulate a fault and its clearing"""
-        time_points = np.arange(0, self.simulation_time, self.time_step)
-        results = {
-            "time": time_points.tolist(),
-            "rotor_angles": [],
-            "frequencies": [],
-            "voltages": [],
-            "stability": "STABLE"
-        }
+        # Defaults for generators without explicit data (machine base)
+        self.default_h = 5.0  # Inertia constant (s)
+        self.default_damping = 2.0  # pu power per pu speed deviation
+        self.default_xd_prime = 0.3  # Transient reactance (pu)
 
-        # Simplified swing equation simulation
-        # In practice, would integrate generator dynamics
+        self._reduced_cache: Dict[Tuple, Dict[str, Any]] = {}
 
-        # Initial conditions
-        delta_0 = 30  # Initial rotor angle in degrees
-        omega_0 = 2 * np.pi * self.network.frequency_hz  # Angular frequency
-
-        # Generator parameters (simplified)
-        H = 5.0  # Inertia constant
-        D = 0.01  # Damping coefficient
-        Pm = 1.0  # Mechanical power
-
-        # Simulate
-        delta = delta_0
-        omega = omega_0
-        deltas = []
-        omegas = []
-
-        for t in time_points:
-            # Check if fault is active
-            if t < fault_duration:
-                Pe = 0  # Electrical power during fault
-            else:
-                Pe = Pm * 0.95  # Post-fault electrical power
-
-            # Swing equation
-            d_omega = (omega_0 / (2 * H)) * (Pm - Pe - D * (omega - omega_0))
-            d_delta = omega - omega_0
+    def _machines(self) -> Dict[str, Any]:
+        """Machine data as arrays on the system base"""
+        bus_index = {bus_id: i for i, bus_id in enumerate(self.network.buses)}
+        specs = self.network.generators or {
+            f"GEN_{bus_id}": {"bus": bus_id}
+            for bus_id, bus in self.network.buses.items()
+            if bus.type in ("Slack", "PV") and bus.generation_mw > 0
+        }
 
-            # Update states
-            omega += d_omega * self.time_step
-            delta += d_delta * self.time_step
+        ids, buses, p_mw, h_sys, damping, x_sys = [], [], [], [], [], []
+        for gen_id, spec in specs.items():
+            bus = self.network.buses[spec["bus"]]
+            p = spec.get("p_mw", bus.generation_mw)
+            mva = spec.get("mva", max(p / 0.9, self.network.base_mva))
+            scale = mva / self.network.base_mva
+            ids.append(gen_id)
+            buses.append(bus_index[spec["bus"]])
+            p_mw.append(p)
+            h_sys.append(spec.get("h", self.default_h) * scale)
+            damping.append(spec.get("d", self.default_damping) * scale)
+            x_sys.append(spec.get("xd_prime", self.default_xd_prime) / scale)
 
-            deltas.append(delta)
-            omegas.append(omega / (2 * np.pi))  # Convert to Hz
+        return {
+            "ids": ids,
+            "bus": np.array(buses, dtype=int),
+            "p_pu": np.array(p_mw, dtype=float) / self.network.base_mva,
+            "h": np.array(h_sys, dtype=float),
+            "d": np.array(damping, dtype=float),
+            "y": 1 / (1j * np.array(x_sys, dtype=float))
+        }
 
-            # Check stability
-            if abs(delta) > 180:
-                results["stability"] = "UNSTABLE"
+    def _reduced_network(self, fault_bus: Optional[str]) -> Dict[str, Any]:
+        """Internal-node admittance matrices (normal and faulted), cached per topology and fault bus"""
+        y_bus = self.network.get_ybus()
+        machines = self._machines()
+        slack = self.network.slack_index()
+        energised_mask = LoadFlowSolver.energised_buses(y_bus, slack)
+
+        # Key on the load flow inputs only: the pre-fault solve below overwrites bus
+        # voltages, which are inputs only as setpoints of energised PV and slack buses
+        key = (self.network.ybus_key, fault_bus, self.network.source_admittance(),
+               tuple(machines["ids"]), machines["bus"].tobytes(), machines["y"].tobytes(),
+               tuple((b.type, b.load_mw, b.load_mvar, b.generation_mw, b.generation_mvar,
+                      b.voltage_pu if b.type != "PQ" and live else None,
+                      b.angle_deg if b.type == "Slack" else None)
+                     for b, live in zip(self.network.buses.values(), energised_mask)))
+        cached = self._reduced_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Pre-fault operating point
+        solver = LoadFlowSolver(self.network)
+        solver.solve()
+        v = np.array([b.get_complex_voltage() for b in self.network.buses.values()])
+        energised = np.flatnonzero(energised_mask)
+
+        # Loads as constant admittances at their pre-fault voltage
+        load = np.array([complex(b.load_mw, b.load_mvar) for b in self.network.buses.values()]) / self.network.base_mva
+        v_sq = np.abs(v) ** 2
+        y_load = np.zeros(len(v), dtype=complex)
+        y_load[v_sq > 0] = np.conj(load[v_sq > 0]) / v_sq[v_sq > 0]
+
+        # Source current each bus must supply to hold the load flow solution
+        i_net = (y_bus @ v) + y_load * v
+
+        # Machine EMFs behind transient reactance. Away from the slack, machines share their
+        # bus injection by scheduled P; at the slack they supply scheduled P only (no Q)
+        m_bus, y_m, p_pu = machines["bus"], machines["y"], machines["p_pu"]
+        i_machine = np.conj(p_pu / v[m_bus])
+        p_at_bus = np.bincount(m_bus, weights=p_pu, minlength=len(v))[m_bus]
+        share = np.divide(p_pu, p_at_bus, out=np.ones_like(p_pu), where=p_at_bus != 0)
+        away = m_bus != slack
+        i_machine[away] = i_net[m_bus[away]] * share[away]
+        e_machine = v[m_bus] + i_machine / y_m
+
+        # Infinite bus: whatever the slack bus draws beyond its machines comes from the grid
+        y_source = self.network.source_admittance()
+        i_grid = i_net[slack] - np.sum(i_machine[m_bus == slack])
+        e_grid = v[slack] + i_grid / y_source
+
+        # Internal nodes = machines + grid; network nodes = energised buses
+        n_int = len(y_m) + 1
+        int_bus = np.append(m_bus, slack)
+        y_int = np.append(y_m, y_source)
+        y_nn_full = (y_bus + sparse.diags(y_load) +
+                     sparse.coo_matrix((y_int, (int_bus, int_bus)), shape=y_bus.shape)).tocsc()
+        y_ng_full = sparse.coo_matrix((-y_int, (int_bus, np.arange(n_int))),
+                                      shape=(len(v), n_int)).tocsc()
+
+        def kron(keep: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """Reduced admittance and the bus-voltage map V = W E over the kept buses"""
+            y_nn = y_nn_full[keep][:, keep].tocsc()
+            y_ng = y_ng_full[keep].toarray()
+            w = -splu(y_nn).solve(y_ng) if len(keep) else np.zeros((0, n_int))
+            return np.diag(y_int) + y_ng.T @ w, w
+
+        y_normal, w_normal = kron(energised)
+        result = {"machines": machines, "e_mag": np.abs(np.append(e_machine, e_grid)),
+                  "delta_0": np.angle(np.append(e_machine, e_grid)),
+                  "energised": energised, "normal": (y_normal, w_normal)}
+
+        if fault_bus is not None:
+            # Bolted fault: the faulted bus is held at zero voltage and drops out of the reduction
+            fault_index = list(self.network.buses).index(fault_bus)
+            faulted = energised[energised != fault_index]
+            y_fault, w_fault = kron(faulted)
+            result["faulted"] = (y_fault, w_fault, faulted)
+
+        self._reduced_cache[key] = result
+        return result
+
+    def simulate_fault_clearing(self, fault_bus: str, fault_duration: float,
+                                output_step: Optional[float] = None) -> Dict:
+        """Simulate a bolted fault cleared after fault_duration seconds
+
+        Samples are recorded every output_step seconds (default self.output_step).
+        """
+        if fault_bus not in self.network.buses:
+            return {"error": "Bus not found"}
+        output_step = output_step or self.output_step
+
+        reduced = self._reduced_network(fault_bus)
+        machines = reduced["machines"]
+        n_m = len(machines["ids"])
+        e_mag = reduced["e_mag"]
+        h, d, omega_s = machines["h"], machines["d"], 2 * np.pi * self.network.frequency_hz
+        y_normal, w_normal = reduced["normal"]
+        y_fault, w_fault, faulted = reduced["faulted"]
+
+        # Mechanical power equals the pre-fault electrical output (steady state at t=0)
+        e_0 = e_mag * np.exp(1j * reduced["delta_0"])
+        p_mech = (e_0[:n_m] * np.conj(y_normal[:n_m] @ e_0)).real
+
+        def derivatives(delta, speed, y_int):
+            e = e_mag * np.exp(1j * np.append(delta, reduced["delta_0"][-1]))
+            p_elec = (e[:n_m] * np.conj(y_int[:n_m] @ e)).real
+            return omega_s * speed, (p_mech - p_elec - d * speed) / (2 * h)
+
+        bus_ids = list(self.network.buses)
+        times, angles, speeds, voltages = [], [], [], []
+
+        def record(t, delta, speed, w, rows):
+            e = e_mag * np.exp(1j * np.append(delta, reduced["delta_0"][-1]))
+            v = np.zeros(len(bus_ids))
+            v[rows] = np.abs(w @ e)
+            times.append(t)
+            angles.append(np.degrees(delta - reduced["delta_0"][-1]))
+            speeds.append(speed.copy())
+            voltages.append(v)
+
+        # Stages: fault on, then cleared; step sizes fitted so switching falls on a step
+        stages = [(min(fault_duration, self.simulation_time), y_fault, w_fault, faulted),
+                  (self.simulation_time, y_normal, w_normal, reduced["energised"])]
+        delta = reduced["delta_0"][:n_m].copy()
+        speed = np.zeros(n_m)
+        t = 0.0
+        next_output = 0.0
+        stability = "STABLE"
+        for t_end, y_int, w, rows in stages:
+            n_steps = int(math.ceil(max(t_end - t, 0.0) / self.time_step - 1e-9))
+            if n_steps == 0:
+                continue
+            dt = (t_end - t) / n_steps
+            for _ in range(n_steps):
+                if t >= next_output - 1e-9:
+                    record(t, delta, speed, w, rows)
+                    next_output += output_step
+
+                # Classical RK4 on all machine states at once
+                k1d, k1w = derivatives(delta, speed, y_int)
+                k2d, k2w = derivatives(delta + 0.5 * dt * k1d, speed + 0.5 * dt * k1w, y_int)
+                k3d, k3w = derivatives(delta + 0.5 * dt * k2d, speed + 0.5 * dt * k2w, y_int)
+                k4d, k4w = derivatives(delta + dt * k3d, speed + dt * k3w, y_int)
+                delta = delta + dt / 6 * (k1d + 2 * k2d + 2 * k3d + k4d)
+                speed = speed + dt / 6 * (k1w + 2 * k2w + 2 * k3w + k4w)
+                t += dt
+
+                # Loss of synchronism against the grid
+                if np.any(np.abs(delta - reduced["delta_0"][-1]) > math.pi):
+                    stability = "UNSTABLE"
+                    break
+            if stability == "UNSTABLE":
                 break
+        record(t, delta, speed, w, rows)
 
-        results["rotor_angles"] = deltas
-        results["frequencies"] = omegas
+        angles = np.array(angles).reshape(len(times), n_m)
+        speeds = np.array(speeds).reshape(len(times), n_m)
+        voltages = np.array(voltages)
+        return {
+            "fault_bus": fault_bus,
+            "fault_duration": fault_duration,
+            "time": np.round(times, 6).tolist(),
+            "rotor_angles": {gen_id: angles[:, i].tolist() for i, gen_id in enumerate(machines["ids"])},
+            "frequencies": {gen_id: (self.network.frequency_hz * (1 + speeds[:, i])).tolist()
+                            for i, gen_id in enumerate(machines["ids"])},
+            "voltages": {bus_id: voltages[:, i].tolist() for i, bus_id in enumerate(bus_ids)},
+            "max_angle_deg": float(np.abs(angles).max()) if angles.size else 0.0,
+            "stability": stability
+        }
 
-        return results
+@dataclass
+class Scenario:
+    """One what-if case of a batch: overrides applied to a copy of the base network"""
+    name: str
+    sim_type: SimulationType = SimulationType.LOAD_FLOW
+    parameters: Dict[str, Any] = field(default_factory=dict)  # run_simulation parameters (fault bus, ...)
+    load_multiplier: float = 1.0  # scales every bus load
+    updates: Dict[str, Any] = field(default_factory=dict)  # update_network_parameters format (taps, ...)
+    outages: Tuple[Tuple[str, str], ...] = ()  # (line | transformer, branch id)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Scenario':
+        """Scenario from a JSON-style request ({'name', 'type', 'parameters', ...})"""
+        return cls(
+            name=data.get("name", ""),
+            sim_type=SimulationType(data.get("type", SimulationType.LOAD_FLOW.value)),
+            parameters=dict(data.get("parameters", {})),
+            load_multiplier=float(data.get("load_multiplier", 1.0)),
+            updates=dict(data.get("updates", {})),
+            outages=tuple(tuple(outage) for outage in data.get("outages", ()))
+        )
+
+# Base network of a scenario pool worker, set once when the worker starts
+_worker_base_network: Optional[PowerSystemNetwork] = None
+
+def _init_scenario_worker(base: PowerSystemNetwork):
+    global _worker_base_network
+    _worker_base_network = base
+
+def _run_scenario(scenario: Scenario, base: Optional[PowerSystemNetwork] = None) -> Dict[str, Any]:
+    """Run one scenario on its own copy of the base network (also runs in pool workers)"""
+    start = time.perf_counter()
+    network = (base or _worker_base_network).copy(scenario.outages)
+    if scenario.load_multiplier != 1.0:
+        # Loads are not stamped into the Y-bus: scale the copy's records directly
+        for bus in network.buses.values():
+            bus.load_mw *= scenario.load_multiplier
+            bus.load_mvar *= scenario.load_multiplier
+
+    engine = AdvancedSimulationEngine(network)
+    try:
+        engine.update_network_parameters(scenario.updates)
+        results = engine._dispatch(scenario.sim_type, scenario.parameters)
+    except Exception as e:
+        logger.warning(f"Scenario {scenario.name!r} failed: {e}")
+        results = {"error": str(e)}
+    return {
+        "scenario": scenario.name,
+        "type": scenario.sim_type.value,
+        "results": results,
+        "success": "error" not in results,
+        "elapsed_seconds": time.perf_counter() - start
+    }
 
 class AdvancedSimulationEngine:
     """Main simulation engine integrating all analysis modules"""
 
-    def __init__(self):
-        self.network = PowerSystemNetwork()
-        self.network.initialize_standard_substation()
+    def __init__(self, network: Optional[PowerSystemNetwork] = None, history_size: int = 1000):
+        if network is None:
+            network = PowerSystemNetwork()
+            network.initialize_standard_substation()
+        self.network = network
 
         self.load_flow_solver = LoadFlowSolver(self.network)
         self.fault_analyzer = FaultAnalysis(self.network)
@@ -772,23 +1879,91 @@ class AdvancedSimulationEngine:
         self.stability_analyzer = TransientStabilityAnalysis(self.network)
 
         self.simulation_results = {}
-        self.simulation_history = []
+        # Most recent runs only; older entries are dropped
+        self.simulation_history: deque = deque(maxlen=history_size)
+
+    @classmethod
+    def from_dss(cls, dss_file: str, cache_dir: Optional[str] = None,
+                 session=None) -> 'AdvancedSimulationEngine':
+        """Engine on the network of a DSS model (see dss_network.network_from_dss)"""
+        from .dss_network import network_from_dss
+        return cls(network_from_dss(dss_file, cache_dir=cache_dir, session=session))
 
     def run_simulation(self, sim_type: SimulationType,
                       parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Run a power system simulation"""
         logger.info(f"Running {sim_type.value} simulation")
+        results = self._dispatch(sim_type, parameters)
 
+        # Store results
+        self.simulation_results[sim_type.value] = results
+        self._record(sim_type.value, parameters, results)
+        return results
+
+    def _record(self, sim_type: str, parameters: Dict[str, Any], results: Dict[str, Any],
+                scenario: Optional[str] = None):
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "type": sim_type,
+            "parameters": parameters,
+            "success": "error" not in results
+        }
+        if scenario is not None:
+            entry["scenario"] = scenario
+        self.simulation_history.append(entry)
+
+    def run_batch(self, scenarios: Iterable[Any], workers: int = 1) -> Iterator[Dict[str, Any]]:
+        """Run what-if scenarios and yield each result as soon as it completes
+
+        Scenarios (Scenario objects or dicts for Scenario.from_dict) never touch
+        self.network: each one runs on a copy with its outages, load multiplier
+        and parameter updates applied. With workers > 1 they are spread over a
+        process pool that receives the base network once per worker, so results
+        arrive in completion order rather than submission order.
+        """
+        scenarios = [s if isinstance(s, Scenario) else Scenario.from_dict(s) for s in scenarios]
+        self.network.get_ybus()  # build once here rather than in every copy
+
+        if workers <= 1 or len(scenarios) <= 1:
+            completed = (_run_scenario(scenario, self.network) for scenario in scenarios)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=min(workers, len(scenarios)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_scenario_worker,
+                initargs=(self.network,)
+            )
+            futures = {executor.submit(_run_scenario, scenario): scenario for scenario in scenarios}
+            completed = (future.result() for future in as_completed(futures))
+
+        try:
+            for outcome in completed:
+                scenario = outcome["scenario"]
+                self._record(outcome["type"], {"scenario": scenario}, outcome["results"], scenario)
+                yield outcome
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self, sim_type: SimulationType, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one analysis on the current network"""
         if sim_type == SimulationType.LOAD_FLOW:
             results = self.load_flow_solver.solve()
 
         elif sim_type == SimulationType.SHORT_CIRCUIT:
-            bus_id = parameters.get("bus_id", "BUS_400_1")
-            fault_type = FaultType[parameters.get("fault_type", "THREE_PHASE")]
-            results = self.fault_analyzer.calculate_fault(bus_id, fault_type)
+            if parameters.get("sweep"):
+                results = self.fault_analyzer.sweep_all_faults()
+            else:
+                bus_id = parameters.get("bus_id", "BUS_400_1")
+                fault_type = FaultType[parameters.get("fault_type", "THREE_PHASE")]
+                results = self.fault_analyzer.calculate_fault(bus_id, fault_type)
 
         elif sim_type == SimulationType.CONTINGENCY_ANALYSIS:
-            results = self.contingency_analyzer.run_n1_contingency()
+            if parameters.get("n2"):
+                results = self.contingency_analyzer.run_n2_contingency()
+            else:
+                results = self.contingency_analyzer.run_n1_contingency()
 
         elif sim_type == SimulationType.TRANSIENT_STABILITY:
             fault_bus = parameters.get("fault_bus", "BUS_400_1")
@@ -800,15 +1975,6 @@ class AdvancedSimulationEngine:
         else:
             results = {"error": f"Simulation type {sim_type.value} not implemented"}
 
-        # Store results
-        self.simulation_results[sim_type.value] = results
-        self.simulation_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "type": sim_type.value,
-            "parameters": parameters,
-            "success": "error" not in results
-        })
-
         return results
 
     def get_network_state(self) -> Dict[str, Any]:
@@ -839,37 +2005,52 @@ class AdvancedSimulationEngine:
         if "buses" in updates:
             for bus_id, params in updates["buses"].items():
                 if bus_id in self.network.buses:
-                    bus = self.network.buses[bus_id]
-                    for key, value in params.items():
-                        setattr(bus, key, value)
+                    self.network.update_bus(bus_id, **params)
 
-        # Update line parameters
+        # Update line parameters (restamped incrementally in the cached Y-bus)
         if "lines" in updates:
             for line_id, params in updates["lines"].items():
                 if line_id in self.network.lines:
-                    line = self.network.lines[line_id]
-                    for key, value in params.items():
-                        setattr(line, key, value)
+                    self.network.update_branch("line", line_id, **params)
 
         # Update transformer parameters
         if "transformers" in updates:
             for tr_id, params in updates["transformers"].items():
                 if tr_id in self.network.transformers:
-                    transformer = self.network.transformers[tr_id]
-                    for key, value in params.items():
-                        setattr(transformer, key, value)
+                    self.network.update_branch("transformer", tr_id, **params)
 
-    def export_results(self, format: str = "json") -> str:
-        """Export simulation results"""
-        export_data = {
-            "timestamp": datetime.now().isoformat(),
-            "network_state": self.get_network_state(),
-            "simulation_results": self.simulation_results,
-            "simulation_history": self.simulation_history
-        }
+    def export_results(self, format: str = "json", path: Optional[str] = None) -> str:
+        """Export simulation results
 
+        json returns the document itself. parquet, arrow and npz write the latest
+        result of each simulation type as columnar tables into the directory
+        path (see result_export) and return that path.
+        """
         if format == "json":
+            export_data = {
+                "timestamp": datetime.now().isoformat(),
+                "network_state": self.get_network_state(),
+                "simulation_results": self.simulation_results,
+                "simulation_history": list(self.simulation_history)
+            }
             return json.dumps(export_data, indent=2, default=str)
-        else:
-            # Could add other formats like CSV, Excel
-            return json.dumps(export_data, default=str)
\ No newline at end of file
+
+        from .result_export import ColumnarResultWriter
+        if path is None:
+            raise ValueError(f"A directory path is required for {format} export")
+        with ColumnarResultWriter(path, format) as writer:
+            for sim_type, results in self.simulation_results.items():
+                writer.write(results, scenario=sim_type, sim_type=sim_type)
+        return str(path)
+
+    def export_batch(self, scenarios: Iterable[Any], path: str, format: str = "parquet",
+                     workers: int = 1) -> Dict[str, int]:
+        """Run a batch and stream each scenario's results to columnar files as it completes
+
+        Returns the number of rows written per table.
+        """
+        from .result_export import ColumnarResultWriter
+        with ColumnarResultWriter(path, format) as writer:
+            for outcome in self.run_batch(scenarios, workers=workers):
+                writer.write(outcome)
+        return dict(writer.rows_written)
@@ -0,0 +1,170 @@
+"""
+Sharded Anomaly Dataset Generator
+Generates anomaly training samples across worker processes and streams them to Parquet or CSV
+"""
+import logging
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .anomaly_features import FEATURE_NAMES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Fixed column layout so every shard appends to the same schema
+DATASET_COLUMNS = ['sample_id', 'timestamp', 'label', 'anomaly_type'] + FEATURE_NAMES
+DATASET_DTYPES = {column: 'float32' for column in FEATURE_NAMES}
+DATASET_DTYPES.update({'sample_id': 'int64', 'label': 'int64', 'timestamp': 'string', 'anomaly_type': 'string'})
+
+# Per-process simulator with its own compiled circuit
+_worker_simulator = None
+
+
+def _init_dataset_worker(dss_file: str):
+    """Compile the circuit once in this worker"""
+    global _worker_simulator
+    from .opendss_anomaly_simulator import OpenDSSAnomalySimulator
+    _worker_simulator = OpenDSSAnomalySimulator(dss_file)
+
+
+def _generate_shard(first_sample: int, num_samples: int, seed: int, simulator=None) -> pd.DataFrame:
+    """Samples first_sample .. first_sample + num_samples - 1, drawn from their own seeded RNG"""
+    simulator = simulator or _worker_simulator
+    rng = random.Random(seed)
+    rows = []
+    for sample_id in range(first_sample, first_sample + num_samples):
+        features = simulator.generate_sample(rng)
+        if features is not None:
+            features['sample_id'] = sample_id
+            rows.append(features)
+    return pd.DataFrame(rows).reindex(columns=DATASET_COLUMNS).astype(DATASET_DTYPES)
+
+
+class AnomalyDatasetGenerator:
+    """Anomaly training set generation sharded over worker processes
+
+    Samples are split into shards of shard_size, each generated by a worker
+    holding its own compiled circuit with an RNG seeded from (seed, shard), so
+    a dataset is reproducible for a given seed whatever the worker count.
+    Finished shards are appended to the output as Parquet row groups or CSV
+    chunks; at most two shards per worker are in flight, which bounds memory
+    independently of the dataset size.
+    """
+
+    def __init__(self, dss_file: str, workers: Optional[int] = None, shard_size: int = 500,
+                 seed: Optional[int] = None):
+        self.dss_file = dss_file
+        self.workers = workers or max(1, (multiprocessing.cpu_count() or 2) - 1)
+        self.shard_size = shard_size
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    def _shard_seed(self, shard: int) -> int:
+        return int(np.random.SeedSequence([self.seed, shard]).generate_state(1)[0])
+
+    def generate(self, num_samples: int, output_path: Union[str, Path], format: str = 'parquet',
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 simulator=None) -> Dict[str, Any]:
+        """Generate num_samples samples into output_path and return dataset statistics
+
+        format is parquet (CSV if pyarrow is missing) or csv. progress is called
+        after every shard with the counts so far; an exception it raises aborts
+        the run. Shards run in this process if a simulator is given, otherwise
+        in worker processes.
+        """
+        if format == 'parquet' and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow not available, writing CSV instead of Parquet")
+            format = 'csv'
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        shards = [(first, min(self.shard_size, num_samples - first))
+                  for first in range(0, num_samples, self.shard_size)]
+        stats = {'total_samples': 0, 'normal_samples': 0, 'anomaly_samples': 0, 'anomaly_types': Counter()}
+        writer = None
+        start = time.time()
+
+        def write(shard: pd.DataFrame, shards_done: int):
+            nonlocal writer
+            if format == 'parquet':
+                table = pa.Table.from_pandas(shard, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(str(output_path), table.schema)
+                writer.write_table(table)
+            else:
+                shard.to_csv(output_path, mode='w' if shards_done == 1 else 'a',
+                             header=shards_done == 1, index=False)
+
+            stats['total_samples'] += len(shard)
+            stats['anomaly_samples'] += int(shard['label'].sum())
+            stats['normal_samples'] = stats['total_samples'] - stats['anomaly_samples']
+            stats['anomaly_types'].update(shard['anomaly_type'].value_counts().to_dict())
+            report = {
+                'completed_shards': shards_done,
+                'total_shards': len(shards),
+                'samples_written': stats['total_samples'],
+                'requested_samples': num_samples,
+                'elapsed_seconds': time.time() - start
+            }
+            logger.info(f"Dataset shard {shards_done}/{len(shards)}: {stats['total_samples']} samples written")
+            if progress is not None:
+                progress(report)
+
+        try:
+            if simulator is not None:
+                for n, (first, count) in enumerate(shards):
+                    write(_generate_shard(first, count, self._shard_seed(n), simulator), n + 1)
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(shards)) or 1,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_dataset_worker,
+                    initargs=(self.dss_file,)
+                ) as executor:
+                    pending = set()
+                    queued = iter(enumerate(shards))
+                    done_count = 0
+                    try:
+                        while True:
+                            for n, (first, count) in queued:
+                                pending.add(executor.submit(_generate_shard, first, count, self._shard_seed(n)))
+                                if len(pending) >= 2 * self.workers:
+                                    break
+                            if not pending:
+                                break
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                done_count += 1
+                                write(future.result(), done_count)
+                    except BaseException:
+                        # Do not wait for shards that have not started yet
+                        for future in pending:
+                            future.cancel()
+                        raise
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return {
+            'total_samples': stats['total_samples'],
+            'normal_samples': stats['normal_samples'],
+            'anomaly_samples': stats['anomaly_samples'],
+            'anomaly_types': dict(stats['anomaly_types']),
+            'features': list(DATASET_COLUMNS),
+            'format': format,
+            'seed': self.seed,
+            'elapsed_seconds': time.time() - start
+        }
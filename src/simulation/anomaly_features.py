@@ -0,0 +1,143 @@
+"""
+Anomaly Feature Extraction
+Computes fixed-width float32 ML feature vectors from bulk-extracted circuit results
+"""
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+from .dss_extract import CircuitResults, CircuitTopology
+
+logger = logging.getLogger(__name__)
+
+# Fixed feature layout; every vector has exactly these entries in this order
+FEATURE_NAMES = [
+    'voltage_mag_mean', 'voltage_mag_std', 'voltage_mag_min', 'voltage_mag_max',
+    'voltage_imbalance_mean', 'voltage_imbalance_max',   # max deviation from the phase mean / mean
+    'voltage_unbalance_neg_max', 'voltage_unbalance_zero_max',  # |V2|/|V1|, |V0|/|V1|
+    'current_mag_mean', 'current_mag_std', 'current_mag_max',
+    'current_imbalance_max', 'current_unbalance_neg_max', 'current_unbalance_zero_max',
+    'total_power_kw', 'total_reactive_kvar', 'losses_kw', 'losses_kvar', 'power_factor',
+    'thd_voltage_mean', 'thd_voltage_max'                # percent
+]
+
+_A = np.exp(2j * np.pi / 3)
+# abc -> 012 (zero, positive, negative sequence) transform, applied to row vectors
+_ABC_TO_012 = (np.array([[1, 1, 1],
+                         [1, _A, _A ** 2],
+                         [1, _A ** 2, _A]]) / 3).T
+
+
+def _mag_stats(values: np.ndarray) -> tuple:
+    """mean, std, min, max of a magnitude array (zeros if empty)"""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0
+    mean = values.sum() / n
+    variance = max(np.dot(values, values) / n - mean * mean, 0.0)
+    return mean, np.sqrt(variance), values.min(), values.max()
+
+
+class AnomalyFeatureExtractor:
+    """Vectorised feature extraction over one solved circuit state
+
+    Index arrays (three-phase bus nodes, terminal-1 conductors of the PD
+    elements) are built once per circuit topology; each sample is then a
+    fixed number of NumPy operations over the bulk voltage and current
+    arrays, independent of the number of buses and elements. Bus voltages
+    and element currents go through the phase statistics as one stacked
+    (rows, 3) phasor array.
+    """
+
+    # Rows below these magnitudes are dead and contribute no unbalance
+    LIVE_VOLTS = 1.0
+    LIVE_AMPS = 1e-3
+
+    def __init__(self):
+        self._topology: Optional[CircuitTopology] = None
+        self._bus_phase_nodes = np.zeros((0, 3), dtype=int)
+        self._terminal_positions = np.zeros(0, dtype=int)
+        self._element_phase_positions = np.zeros((0, 3), dtype=int)
+        self._live_floor = np.zeros(0)
+
+    def _index(self, topology: CircuitTopology):
+        if topology is self._topology:
+            return
+
+        # Node numbers 1, 2, 3 of every bus that has all three phases
+        phase_nodes = np.full((len(topology.bus_names), 3), -1, dtype=int)
+        for node, (name, bus) in enumerate(zip(topology.node_names, topology.node_bus)):
+            phase = name.rsplit('.', 1)[-1]
+            if bus >= 0 and phase in ('1', '2', '3'):
+                phase_nodes[bus, int(phase) - 1] = node
+        self._bus_phase_nodes = phase_nodes[(phase_nodes >= 0).all(axis=1)]
+
+        # Terminal-1 conductors of each PD element (the flat arrays hold all terminals)
+        conductors = topology.pd_conductors
+        starts = topology.pd_offsets[:-1]
+        within = np.arange(conductors.sum()) - np.repeat(np.cumsum(conductors) - conductors, conductors)
+        self._terminal_positions = np.repeat(starts, conductors) + within
+        three_phase = conductors >= 3
+        self._element_phase_positions = starts[three_phase, None] + np.arange(3)
+        self._live_floor = np.concatenate([np.full(len(self._bus_phase_nodes), self.LIVE_VOLTS),
+                                           np.full(len(self._element_phase_positions), self.LIVE_AMPS)])
+
+        self._topology = topology
+        logger.debug(f"Feature index: {len(self._bus_phase_nodes)} three-phase buses, "
+                     f"{len(self._element_phase_positions)} three-phase elements")
+
+    def extract(self, results: CircuitResults, summary: Dict[str, float],
+                harmonic_volts: Optional[np.ndarray] = None) -> np.ndarray:
+        """Feature vector (float32, FEATURE_NAMES order) of one solved state
+
+        summary holds total_power_kw, total_reactive_kvar, losses_kw and
+        losses_kvar. harmonic_volts are complex node voltages per harmonic
+        order, shape (orders, nodes); results must then hold the fundamental.
+        """
+        self._index(results.topology)
+        features = np.zeros(len(FEATURE_NAMES), dtype=np.float32)
+        features[0:4] = _mag_stats(results.node_v_pu)
+
+        # Per row: imbalance (max deviation from the phase mean / mean), |V2|/|V1|, |V0|/|V1|
+        n_buses = len(self._bus_phase_nodes)
+        currents = results.pd_currents
+        element_phasors = (currents[self._element_phase_positions] if len(currents)
+                           else np.zeros((len(self._element_phase_positions), 3), dtype=complex))
+        phasors = np.concatenate([results.node_volts[self._bus_phase_nodes], element_phasors])
+        mags = np.abs(phasors)
+        mean = mags.sum(axis=1) / 3
+        seq = np.abs(phasors @ _ABC_TO_012)
+        live = (mean > self._live_floor) & (seq[:, 1] > 0)
+        spread = np.abs(mags - mean[:, None]).max(axis=1)
+        ratios = np.zeros((3, len(phasors)))
+        np.divide(spread, mean, out=ratios[0], where=live)
+        np.divide(seq[:, 2], seq[:, 1], out=ratios[1], where=live)
+        np.divide(seq[:, 0], seq[:, 1], out=ratios[2], where=live)
+
+        features[4] = ratios[0, :n_buses].sum() / n_buses if n_buses else 0.0
+        features[5:8] = ratios[:, :n_buses].max(axis=1, initial=0.0)
+        features[11:14] = ratios[:, n_buses:].max(axis=1, initial=0.0)
+
+        if len(currents):
+            mean, std, _, peak = _mag_stats(np.abs(currents[self._terminal_positions]))
+            features[8:11] = (mean, std, peak)
+
+        p = summary.get('total_power_kw', 0.0)
+        q = summary.get('total_reactive_kvar', 0.0)
+        features[14:18] = (p, q, summary.get('losses_kw', 0.0), summary.get('losses_kvar', 0.0))
+        apparent = np.hypot(p, q)
+        features[18] = p / apparent if p != 0 and apparent > 0 else 0.0
+
+        if harmonic_volts is not None and len(harmonic_volts):
+            thd = self.voltage_thd(results, harmonic_volts)
+            features[19:21] = (thd.mean(), thd.max()) if len(thd) else (0.0, 0.0)
+        return features
+
+    @staticmethod
+    def voltage_thd(results: CircuitResults, harmonic_volts: np.ndarray) -> np.ndarray:
+        """Voltage THD (percent) per node; 0 for nodes without fundamental voltage"""
+        fundamental = np.abs(results.node_volts)
+        distortion = np.sqrt((np.abs(harmonic_volts) ** 2).sum(axis=0))
+        return np.divide(100 * distortion, fundamental, out=np.zeros_like(fundamental),
+                         where=fundamental > 1e-6 * fundamental.max(initial=0))
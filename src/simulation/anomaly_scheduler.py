@@ -0,0 +1,352 @@
+"""
+Concurrent Anomaly Scheduler
+Holds any number of timed, ramped anomalies and composes them into one circuit edit set per solve
+"""
+import logging
+import math
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Callable, Optional
+
+from .dss_session import CircuitEditSet
+
+logger = logging.getLogger(__name__)
+
+RAMP_PROFILES = ('step', 'linear', 'smooth')
+
+# Anomaly types with a circuit-level model (others only affect reported metrics)
+ANOMALY_TYPES = ('voltage_sag', 'voltage_surge', 'overload', 'transformer_overload',
+                 'ground_fault', 'harmonics', 'harmonic_distortion', 'frequency_deviation')
+
+BASE_FREQUENCY = 50.0
+
+
+@dataclass
+class ScheduledAnomaly:
+    """One anomaly on the scheduler clock (seconds)
+
+    Severity ramps from 0 to full over ramp_time after start and back to 0
+    over ramp_time before the end; duration None keeps it active until removed.
+    """
+    type: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    start: float = 0.0
+    duration: Optional[float] = None
+    ramp: str = 'step'
+    ramp_time: float = 0.0
+    location: Optional[str] = None  # Overrides parameters['location']
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+    def __post_init__(self):
+        if self.ramp not in RAMP_PROFILES:
+            raise ValueError(f"Unknown ramp profile: {self.ramp} (expected one of {', '.join(RAMP_PROFILES)})")
+        if self.duration is not None and self.duration < 0:
+            raise ValueError("Anomaly duration must not be negative")
+        if self.ramp_time < 0:
+            raise ValueError("Ramp time must not be negative")
+
+    @property
+    def end(self) -> Optional[float]:
+        return None if self.duration is None else self.start + self.duration
+
+    def intensity(self, t: float) -> float:
+        """Fraction of full severity at time t (0 when inactive)"""
+        end = self.end
+        if t < self.start or (end is not None and t >= end):
+            return 0.0
+        if self.ramp == 'step' or self.ramp_time <= 0:
+            return 1.0
+        edge = t - self.start if end is None else min(t - self.start, end - t)
+        x = min(1.0, edge / self.ramp_time)
+        return x if self.ramp == 'linear' else 0.5 - 0.5 * math.cos(math.pi * x)
+
+    def state(self, t: float) -> Dict[str, Any]:
+        """Picklable descriptor of this anomaly at time t, as consumed by compose_anomaly_edits"""
+        return {
+            'id': self.id,
+            'type': self.type,
+            'parameters': self.parameters,
+            'location': self.location,
+            'intensity': round(self.intensity(t), 4)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScheduledAnomaly':
+        data = dict(data)
+        if data.get('id') is None:
+            data.pop('id', None)
+        return cls(**data)
+
+
+def _fault_slot(index: int) -> str:
+    # The first fault keeps the historical object name; slots are reused, not accumulated
+    return "Fault.AnomalyFault" if index == 0 else f"Fault.AnomalyFault{index + 1}"
+
+
+def compose_anomaly_edits(anomalies: Optional[List[Dict[str, Any]]]) -> CircuitEditSet:
+    """Single edit set for all active anomalies
+
+    Each entry has type, parameters and optionally location and intensity
+    (default 1). Overlapping effects combine: source voltage and load
+    multipliers multiply, frequency deviations add, and every ground fault
+    gets its own fault object.
+    """
+    edits = CircuitEditSet()
+    source_pu = 1.0
+    load_factor = 1.0
+    frequency_offset = 0.0
+    faults = []
+    voltage_set = load_set = frequency_set = False
+
+    for anomaly in anomalies or []:
+        anomaly_type = anomaly['type']
+        params = anomaly.get('parameters') or {}
+        k = anomaly.get('intensity', 1.0)
+        if k <= 0:
+            continue
+
+        if anomaly_type in ('voltage_sag', 'voltage_surge'):
+            severity = params.get('severity', 0.85 if anomaly_type == 'voltage_sag' else 1.12)
+            source_pu *= 1.0 + (severity - 1.0) * k
+            voltage_set = True
+
+        elif anomaly_type in ('overload', 'transformer_overload'):
+            load_factor *= 1.0 + (params.get('load_factor', 1.2) - 1.0) * k
+            load_set = True
+
+        elif anomaly_type == 'ground_fault':
+            location = anomaly.get('location') or params.get('location', 'Bus400kV_1')
+            # A partly developed fault is a higher-impedance fault
+            resistance = params.get('resistance', 5) / max(k, 1e-3)
+            faults.append((location, resistance))
+
+        elif anomaly_type in ('harmonics', 'harmonic_distortion'):
+            edits.properties[("Load.IndustrialLoad1", "spectrum")] = "defaultload"
+            edits.properties[("Load.IndustrialLoad2", "spectrum")] = "defaultload"
+
+        elif anomaly_type == 'frequency_deviation':
+            deviation = params.get('deviation', 0.3) * k
+            frequency_offset += -deviation if params.get('type', 'under') == 'under' else deviation
+            frequency_set = True
+
+        else:
+            logger.warning(f"Unknown anomaly type: {anomaly_type}")
+
+    if voltage_set:
+        edits.properties[("Vsource.GridSource", "pu")] = round(source_pu, 6)
+    if load_set:
+        edits.options['loadmult'] = round(load_factor, 6)
+    if frequency_set:
+        edits.options['frequency'] = round(BASE_FREQUENCY + frequency_offset, 6)
+    for index, (location, resistance) in enumerate(sorted(faults, key=lambda f: str(f[0]))):
+        edits.objects[_fault_slot(index)] = f"bus1={location} phases=1 r={resistance:g}"
+    return edits
+
+
+class AnomalyScheduler:
+    """Concurrent timed anomalies on a simulation clock
+
+    The clock runs at speed x wall time (60 = one simulated minute per
+    second) and is reset when a timeline is loaded. A timeline's speed only
+    lasts until its end (or clear()); the clock then runs in real time again.
+    active() evaluates every scheduled anomaly at the current clock time;
+    finished anomalies are dropped.
+    """
+
+    def __init__(self, speed: float = 1.0):
+        self._anomalies: Dict[str, ScheduledAnomaly] = {}
+        self._lock = threading.Lock()
+        self.speed = speed
+        self._origin_wall = time.monotonic()
+        self._origin_clock = 0.0
+        self._timeline_end: Optional[float] = None  # Clock time a loaded timeline finishes
+
+    def now(self) -> float:
+        """Current scheduler clock time in seconds"""
+        with self._lock:
+            return self._now()
+
+    def _now(self) -> float:
+        # Clock time; ends timeline playback once past its end (caller holds the lock)
+        wall = time.monotonic()
+        t = self._origin_clock + (wall - self._origin_wall) * self.speed
+        end = self._timeline_end
+        if end is not None and t >= end:
+            # Playback finished: continue from the timeline end in real time
+            self._origin_wall += (end - self._origin_clock) / self.speed
+            self._origin_clock, self.speed, self._timeline_end = end, 1.0, None
+            t = end + (wall - self._origin_wall)
+            logger.info("Anomaly timeline finished, clock back to real time")
+        return t
+
+    def _set_speed(self, speed: float):
+        # Caller holds the lock
+        if speed <= 0:
+            raise ValueError("Clock speed must be positive")
+        self._origin_clock, self._origin_wall = self._now(), time.monotonic()
+        self.speed = speed
+
+    def set_speed(self, speed: float):
+        """Change the clock rate without jumping the clock"""
+        with self._lock:
+            self._set_speed(speed)
+
+    def reset_clock(self, speed: Optional[float] = None):
+        """Restart the clock at 0"""
+        with self._lock:
+            self._reset_clock(speed)
+
+    def _reset_clock(self, speed: Optional[float]):
+        # Caller holds the lock
+        if speed is not None and speed <= 0:
+            raise ValueError("Clock speed must be positive")
+        self._origin_clock, self._origin_wall = 0.0, time.monotonic()
+        if speed is not None:
+            self.speed = speed
+
+    def schedule(self, anomaly: ScheduledAnomaly) -> ScheduledAnomaly:
+        """Add an anomaly (replacing any with the same id)"""
+        with self._lock:
+            self._anomalies[anomaly.id] = anomaly
+        logger.info(f"Anomaly scheduled: {anomaly.type} ({anomaly.id}) at t={anomaly.start:.1f}s")
+        return anomaly
+
+    def start_now(self, anomaly_type: str, parameters: Dict[str, Any], **timing) -> ScheduledAnomaly:
+        """Schedule an anomaly starting at the current clock time"""
+        return self.schedule(ScheduledAnomaly(anomaly_type, dict(parameters or {}),
+                                              start=self.now(), **timing))
+
+    def cancel(self, anomaly_id: str) -> bool:
+        """Remove one anomaly; False if it is not scheduled"""
+        with self._lock:
+            return self._anomalies.pop(anomaly_id, None) is not None
+
+    def clear(self):
+        """Remove all anomalies and stop any timeline playback"""
+        with self._lock:
+            self._anomalies.clear()
+            self._timeline_end = None
+            self._set_speed(1.0)
+
+    def load_timeline(self, anomalies: List[ScheduledAnomaly], speed: float = 1.0,
+                      duration: Optional[float] = None):
+        """Replace all anomalies with a scripted timeline and play it from t=0
+
+        speed applies until duration (default: the end of the last anomaly;
+        open-ended timelines keep it until clear()).
+        """
+        if duration is None and all(a.end is not None for a in anomalies):
+            duration = max((a.end for a in anomalies), default=0.0)
+        with self._lock:
+            self._reset_clock(speed)
+            self._anomalies = {anomaly.id: anomaly for anomaly in anomalies}
+            self._timeline_end = duration
+        logger.info(f"Anomaly timeline loaded: {len(anomalies)} event(s) at {speed:g}x")
+
+    def get(self, anomaly_id: str) -> Optional[ScheduledAnomaly]:
+        return self._anomalies.get(anomaly_id)
+
+    def scheduled(self) -> List[ScheduledAnomaly]:
+        """Scheduled (pending or active) anomalies, by start time"""
+        self._prune(self.now())
+        with self._lock:
+            return sorted(self._anomalies.values(), key=lambda a: a.start)
+
+    def _prune(self, t: float):
+        with self._lock:
+            finished = [a.id for a in self._anomalies.values() if a.end is not None and a.end <= t]
+            for anomaly_id in finished:
+                del self._anomalies[anomaly_id]
+
+    def active(self, t: Optional[float] = None) -> List[Dict[str, Any]]:
+        """States of all anomalies in effect at time t (default: now), by start time"""
+        if t is None:
+            t = self.now()
+            self._prune(t)
+        with self._lock:
+            anomalies = sorted(self._anomalies.values(), key=lambda a: a.start)
+        return [state for state in (a.state(t) for a in anomalies) if state['intensity'] > 0]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Clock and schedule summary"""
+        with self._lock:
+            t, speed, timeline_end = self._now(), self.speed, self._timeline_end
+        return {
+            'clock': round(t, 3),
+            'speed': speed,
+            'timeline_end': timeline_end,
+            'anomalies': [{**a.to_dict(), 'intensity': round(a.intensity(t), 4)}
+                          for a in self.scheduled()]
+        }
+
+
+@dataclass
+class AnomalyTimeline:
+    """Scripted sequence of anomalies played from t=0 to duration"""
+    anomalies: List[ScheduledAnomaly]
+    duration: Optional[float] = None  # Defaults to the end of the last anomaly
+
+    def __post_init__(self):
+        unknown = sorted({a.type for a in self.anomalies} - set(ANOMALY_TYPES))
+        if unknown:
+            raise ValueError(f"Timeline anomaly types without a circuit model: {', '.join(unknown)}")
+        ends = [a.end for a in self.anomalies]
+        if self.duration is None:
+            if any(end is None for end in ends):
+                raise ValueError("Timeline needs a duration when an anomaly has no duration")
+            self.duration = max(ends, default=0.0)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnomalyTimeline':
+        return cls([ScheduledAnomaly.from_dict(a) for a in data.get('anomalies', [])],
+                   data.get('duration'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'anomalies': [a.to_dict() for a in self.anomalies], 'duration': self.duration}
+
+
+def run_timeline(load_flow, timeline: AnomalyTimeline, step: float = 1.0,
+                 speed: Optional[float] = None, start_time: Optional[datetime] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """Solve a timeline every step seconds of timeline time; returns one sample per solve
+
+    speed paces playback against the wall clock (60 = a minute of timeline per
+    second); None solves as fast as possible. With start_time the daily load
+    pattern follows the timeline clock instead of the wall clock.
+    """
+    if step <= 0:
+        raise ValueError("Timeline step must be positive")
+
+    scheduler = AnomalyScheduler()
+    scheduler.load_timeline(timeline.anomalies, duration=timeline.duration)
+    samples = []
+    steps = int(math.floor(timeline.duration / step + 1e-9)) + 1
+    started = time.monotonic()
+
+    for i in range(steps):
+        t = i * step
+        if speed:
+            delay = started + t / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        anomalies = scheduler.active(t)
+        when = start_time + timedelta(seconds=t) if start_time else None
+        flow = load_flow.solve(anomalies, when=when)
+        samples.append({
+            't': t,
+            'anomalies': [{'id': a['id'], 'type': a['type'], 'intensity': a['intensity']} for a in anomalies],
+            'flow': flow
+        })
+        if progress is not None:
+            progress({'step': i + 1, 'steps': steps, 't': t})
+
+    logger.info(f"Timeline played: {steps} solves over {timeline.duration:g}s "
+                f"in {time.monotonic() - started:.2f}s")
+    return samples
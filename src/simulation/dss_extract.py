@@ -0,0 +1,248 @@
+"""
+Bulk OpenDSS Result Extraction
+Pulls whole-circuit voltages and element powers into NumPy arrays with name->index maps
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Element classes that never carry terminal powers
+_NON_POWER_CLASSES = ('energymeter', 'monitor', 'sensor')
+
+
+@dataclass
+class CircuitTopology:
+    """Static circuit structure, built once per compiled circuit version"""
+    bus_names: List[str]
+    bus_index: Dict[str, int]
+    bus_kv_base: np.ndarray           # L-N kV base per bus
+    node_names: List[str]
+    node_bus: np.ndarray              # bus index of each node
+    bus_first_node: np.ndarray        # node index of each bus's first node (-1 if none)
+    element_names: List[str]
+    element_index: Dict[str, int]
+    element_buses: Dict[str, List[str]]
+    element_enabled: Dict[str, bool]  # enabled state when the topology was built
+    pd_names: List[str]
+    pd_index: Dict[str, int]
+    pd_offsets: np.ndarray            # start of each PD element in the flat complex arrays
+    pd_conductors: np.ndarray         # conductors per terminal of each PD element
+    pc_names: List[str]               # power-carrying non-PD elements (sources, loads, faults)
+    version_key: Optional[str] = None
+
+
+@dataclass
+class CircuitResults:
+    """Solved circuit state as arrays, indexed through the topology maps"""
+    topology: CircuitTopology
+    node_volts: np.ndarray            # complex node voltages (V)
+    node_v_pu: np.ndarray             # node voltage magnitudes (pu)
+    node_v_angle: np.ndarray          # node voltage angles (degrees)
+    pd_powers: np.ndarray             # complex kW + j kvar per PD conductor/terminal
+    pd_currents: np.ndarray           # complex A per PD conductor/terminal
+    pc_powers: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def bus_v_pu(self) -> np.ndarray:
+        """First-node voltage magnitude (pu) per bus, NaN for buses without nodes"""
+        first = self.topology.bus_first_node
+        values = np.full(len(first), np.nan)
+        has_node = first >= 0
+        values[has_node] = self.node_v_pu[first[has_node]]
+        return values
+
+    @property
+    def bus_kv_actual(self) -> np.ndarray:
+        """First-node voltage magnitude (L-N kV) per bus"""
+        return self.bus_v_pu * self.topology.bus_kv_base
+
+    def per_bus(self, node_values: np.ndarray) -> Dict[str, np.ndarray]:
+        """Split a per-node array into per-bus arrays"""
+        topo = self.topology
+        order = np.argsort(topo.node_bus, kind='stable')
+        counts = np.bincount(topo.node_bus[topo.node_bus >= 0], minlength=len(topo.bus_names))
+        valid = order[topo.node_bus[order] >= 0]
+        chunks = np.split(node_values[valid], np.cumsum(counts)[:-1])
+        return dict(zip(topo.bus_names, chunks))
+
+    def bus_vmag_angle(self) -> Dict[str, List[float]]:
+        """Interleaved [mag_pu, angle_deg, ...] per bus (same layout as Bus.puVmagAngle)"""
+        interleaved = np.empty((len(self.node_v_pu), 2))
+        interleaved[:, 0] = self.node_v_pu
+        interleaved[:, 1] = self.node_v_angle
+        return {bus: values.ravel().tolist() for bus, values in self.per_bus(interleaved).items()}
+
+    def _pd_slice(self, element_name: str) -> slice:
+        i = self.topology.pd_index[element_name.lower()]
+        return slice(self.topology.pd_offsets[i], self.topology.pd_offsets[i + 1])
+
+    def element_powers(self, element_name: str) -> List[float]:
+        """Interleaved [kW, kvar, ...] per conductor (same layout as CktElement.Powers)"""
+        key = element_name.lower()
+        if key in self.topology.pd_index:
+            powers = self.pd_powers[self._pd_slice(key)]
+        else:
+            powers = self.pc_powers.get(key, np.zeros(0, dtype=complex))
+        return _interleave(powers)
+
+    def element_currents(self, element_name: str) -> List[float]:
+        """Interleaved [re, im, ...] per conductor (same layout as CktElement.Currents)"""
+        return _interleave(self.pd_currents[self._pd_slice(element_name)])
+
+    def terminal_totals(self) -> Dict[str, np.ndarray]:
+        """Terminal-1 three-phase totals for every PD element, in pd_names order
+
+        Returns p_kw, q_kvar and current_a (highest conductor current magnitude).
+        """
+        topo = self.topology
+        conductors = topo.pd_conductors
+        segment = np.repeat(np.arange(len(conductors)), conductors)
+        starts = np.repeat(topo.pd_offsets[:-1], conductors)
+        within = np.arange(len(segment)) - np.repeat(np.cumsum(conductors) - conductors, conductors)
+        positions = starts + within
+
+        n = len(conductors)
+        powers = self.pd_powers[positions]
+        current_a = np.zeros(n)
+        np.maximum.at(current_a, segment, np.abs(self.pd_currents[positions]))
+        return {
+            'p_kw': np.bincount(segment, weights=powers.real, minlength=n),
+            'q_kvar': np.bincount(segment, weights=powers.imag, minlength=n),
+            'current_a': current_a
+        }
+
+    def class_names(self, class_name: str) -> List[str]:
+        """PD element names of one class, e.g. 'Transformer' or 'Line'"""
+        prefix = class_name.lower() + '.'
+        return [name for name in self.topology.pd_names if name.lower().startswith(prefix)]
+
+
+def _interleave(values: np.ndarray) -> List[float]:
+    out = np.empty(2 * len(values))
+    out[0::2] = values.real
+    out[1::2] = values.imag
+    return out.tolist()
+
+
+def _as_complex(flat) -> np.ndarray:
+    arr = np.asarray(flat, dtype=float)
+    return arr[0::2] + 1j * arr[1::2]
+
+
+class DSSResultExtractor:
+    """Whole-circuit result extraction using the bulk OpenDSS interfaces
+
+    The topology (names, index maps, kV bases, element buses) is built once per
+    circuit version with per-object calls; each solve is then read back with a
+    handful of bulk array calls instead of one round trip per bus and element.
+    """
+
+    def __init__(self, dss_module=None):
+        if dss_module is None:
+            import opendssdirect as dss_module
+        self.dss = dss_module
+        self._topology: Optional[CircuitTopology] = None
+
+    def invalidate(self):
+        """Force a topology rebuild on the next extraction"""
+        self._topology = None
+
+    def topology(self, version_key: Optional[str] = None) -> CircuitTopology:
+        """Cached circuit topology, rebuilt when the version or circuit size changes"""
+        topo = self._topology
+        if (topo is None or topo.version_key != version_key or
+                len(topo.element_names) != self.dss.Circuit.NumCktElements() or
+                len(topo.node_names) != self.dss.Circuit.NumNodes()):
+            topo = self._build_topology(version_key)
+            self._topology = topo
+        return topo
+
+    def _build_topology(self, version_key: Optional[str]) -> CircuitTopology:
+        dss = self.dss
+        bus_names = list(dss.Circuit.AllBusNames())
+        bus_index = {name.lower(): i for i, name in enumerate(bus_names)}
+
+        bus_kv_base = np.zeros(len(bus_names))
+        for i, name in enumerate(bus_names):
+            dss.Circuit.SetActiveBus(name)
+            bus_kv_base[i] = dss.Bus.kVBase()
+
+        node_names = list(dss.Circuit.AllNodeNames())
+        node_bus = np.array([bus_index.get(n.split('.')[0].lower(), -1) for n in node_names], dtype=int)
+        bus_first_node = np.full(len(bus_names), -1, dtype=int)
+        if len(node_bus):
+            buses, first = np.unique(node_bus, return_index=True)
+            valid = buses >= 0
+            bus_first_node[buses[valid]] = first[valid]
+
+        element_names = list(dss.Circuit.AllElementNames())
+        element_buses = {}
+        element_enabled = {}
+        for name in element_names:
+            dss.Circuit.SetActiveElement(name)
+            element_buses[name] = list(dss.CktElement.BusNames() or [])
+            element_enabled[name] = bool(dss.CktElement.Enabled())
+
+        pd_names = list(dss.PDElements.AllNames())
+        pd_conductors = np.asarray(dss.PDElements.AllNumConductors(), dtype=int)
+        sizes = np.asarray(dss.PDElements.AllNumTerminals(), dtype=int) * pd_conductors
+        pd_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+
+        pd_set = {name.lower() for name in pd_names}
+        pc_names = [name for name in element_names
+                    if name.lower() not in pd_set and
+                    not name.lower().startswith(_NON_POWER_CLASSES)]
+
+        logger.debug(f"Built circuit topology: {len(bus_names)} buses, {len(node_names)} nodes, "
+                     f"{len(element_names)} elements")
+        return CircuitTopology(
+            bus_names=bus_names,
+            bus_index=bus_index,
+            bus_kv_base=bus_kv_base,
+            node_names=node_names,
+            node_bus=node_bus,
+            bus_first_node=bus_first_node,
+            element_names=element_names,
+            element_index={name.lower(): i for i, name in enumerate(element_names)},
+            element_buses=element_buses,
+            element_enabled=element_enabled,
+            pd_names=pd_names,
+            pd_index={name.lower(): i for i, name in enumerate(pd_names)},
+            pd_offsets=pd_offsets,
+            pd_conductors=pd_conductors,
+            pc_names=pc_names,
+            version_key=version_key
+        )
+
+    def extract(self, version_key: Optional[str] = None, include_pc: bool = True) -> CircuitResults:
+        """Read the solved circuit state in bulk"""
+        dss = self.dss
+        topo = self.topology(version_key)
+
+        node_volts = _as_complex(dss.Circuit.AllBusVolts())
+        node_v_pu = np.asarray(dss.Circuit.AllBusMagPu(), dtype=float)
+        node_v_angle = np.degrees(np.angle(node_volts))
+
+        pd_powers = _as_complex(dss.PDElements.AllPowers())
+        pd_currents = _as_complex(dss.PDElements.AllCurrents())
+
+        # Sources, loads and faults have no bulk power interface
+        pc_powers = {}
+        if include_pc:
+            for name in topo.pc_names:
+                dss.Circuit.SetActiveElement(name)
+                pc_powers[name.lower()] = _as_complex(dss.CktElement.Powers() or [])
+
+        return CircuitResults(
+            topology=topo,
+            node_volts=node_volts,
+            node_v_pu=node_v_pu,
+            node_v_angle=node_v_angle,
+            pd_powers=pd_powers,
+            pd_currents=pd_currents,
+            pc_powers=pc_powers
+        )
@@ -0,0 +1,322 @@
+"""
+DSS Model to Power System Network Converter
+Builds the in-house PowerSystemNetwork from a compiled OpenDSS model and caches its arrays per content hash
+"""
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from .advanced_simulation import BusData, LineData, PowerSystemNetwork, TransformerData
+from .dss_session import DSSCircuitSession, hash_dss_content
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the cached array layout or conversion rules change
+NETWORK_FORMAT_VERSION = 1
+
+# OpenDSS line length units (Lines.Units) -> km
+_LENGTH_UNITS_KM = {
+    0: 1.0,          # none: lengths taken as km
+    1: 1.609344,     # mi
+    2: 0.3048,       # kft
+    3: 1.0,          # km
+    4: 1e-3,         # m
+    5: 0.3048e-3,    # ft
+    6: 0.0254e-3,    # in
+    7: 1e-5,         # cm
+    8: 1e-6,         # mm
+}
+
+
+def _bus_name(terminal: str) -> str:
+    """Bus name of a terminal connection (node suffixes dropped)"""
+    return terminal.split('.')[0].lower()
+
+
+def _query(dss, target: str) -> str:
+    dss.Text.Command(f"? {target}")
+    return dss.Text.Result()
+
+
+def _iterate(collection):
+    """Yield once per element of an OpenDSS collection, with it active"""
+    i = collection.First()
+    while i > 0:
+        yield
+        i = collection.Next()
+
+
+def extract_network_arrays(session: DSSCircuitSession) -> Dict[str, np.ndarray]:
+    """Read buses, branches, loads, shunts and sources of the session's circuit as arrays
+
+    Lines become series R/X with total charging; two-winding transformers keep
+    their own rating, leakage impedance and off-nominal ratio; loads,
+    generators, capacitors and reactors are lumped per bus. The first voltage
+    source defines the slack bus and all sources together the grid strength.
+    """
+    dss = session.dss
+    session.ensure_compiled()
+
+    bus_names = list(dss.Circuit.AllBusNames())
+    bus_index = {name.lower(): i for i, name in enumerate(bus_names)}
+    n_buses = len(bus_names)
+    bus_kv = np.zeros(n_buses)
+    for i, name in enumerate(bus_names):
+        dss.Circuit.SetActiveBus(name)
+        bus_kv[i] = dss.Bus.kVBase() * math.sqrt(3)
+
+    load_mw, load_mvar = np.zeros(n_buses), np.zeros(n_buses)
+    gen_mw, gen_mvar = np.zeros(n_buses), np.zeros(n_buses)
+    shunt_mvar = np.zeros(n_buses)
+    bus_type = np.full(n_buses, "PQ", dtype="U5")
+
+    def active_bus(terminal: int = 0) -> Optional[int]:
+        if not dss.CktElement.Enabled():
+            return None
+        return bus_index.get(_bus_name(dss.CktElement.BusNames()[terminal]))
+
+    # Voltage sources: slack bus and grid equivalent
+    slack, slack_pu, slack_angle = None, 1.0, 0.0
+    source_mva, source_x_r = 0.0, []
+    for _ in _iterate(dss.Vsources):
+        name = dss.Vsources.Name()
+        dss.Circuit.SetActiveElement(f"Vsource.{name}")
+        i = active_bus()
+        if i is None:
+            continue
+        if slack is None:
+            slack, slack_pu, slack_angle = i, dss.Vsources.PU(), dss.Vsources.AngleDeg()
+        source_mva += float(_query(dss, f"Vsource.{name}.MVAsc3"))
+        source_x_r.append(float(_query(dss, f"Vsource.{name}.X1R1")))
+    if slack is None:
+        raise ValueError("DSS model has no enabled voltage source")
+    bus_type[slack] = "Slack"
+
+    # Lines: total ohms converted back to per-km values on the km length
+    lines = {key: [] for key in ("name", "from", "to", "length_km", "r", "x", "b", "rating_mva")}
+    omega = 2 * math.pi * dss.Solution.Frequency()
+    for _ in _iterate(dss.Lines):
+        name = dss.Lines.Name()
+        dss.Circuit.SetActiveElement(f"Line.{name}")
+        f, t = active_bus(0), active_bus(1)
+        if f is None or t is None or f == t:
+            continue
+        length = dss.Lines.Length()
+        length_km = length * _LENGTH_UNITS_KM.get(dss.Lines.Units(), 1.0) or 1.0
+        r_total, x_total = dss.Lines.R1() * length, dss.Lines.X1() * length
+        lines["name"].append(name)
+        lines["from"].append(f)
+        lines["to"].append(t)
+        lines["length_km"].append(length_km)
+        lines["r"].append(r_total / length_km)
+        lines["x"].append(x_total / length_km)
+        lines["b"].append(omega * dss.Lines.C1() * 1e-9 * length / length_km)
+        lines["rating_mva"].append(math.sqrt(3) * bus_kv[f] * dss.Lines.NormAmps() / 1000.0)
+
+    # Two-winding transformers; ratio away from the bus bases folded into the tap
+    transformers = {key: [] for key in ("name", "from", "to", "rating_mva", "kv_from", "kv_to",
+                                        "r_percent", "x_percent", "tap_ratio")}
+    for _ in _iterate(dss.Transformers):
+        name = dss.Transformers.Name()
+        dss.Circuit.SetActiveElement(f"Transformer.{name}")
+        if dss.Transformers.NumWindings() != 2:
+            logger.warning(f"Transformer {name} has {dss.Transformers.NumWindings()} windings, skipped")
+            continue
+        f, t = active_bus(0), active_bus(1)
+        if f is None or t is None or f == t:
+            continue
+        windings = []
+        for winding in (1, 2):
+            dss.Transformers.Wdg(winding)
+            windings.append((dss.Transformers.kV(), dss.Transformers.kVA(),
+                             dss.Transformers.R(), dss.Transformers.Tap()))
+        (kv_f, kva, r_f, tap_f), (kv_t, _, r_t, tap_t) = windings
+        ratio = (kv_f * tap_f / bus_kv[f]) / (kv_t * tap_t / bus_kv[t]) if bus_kv[f] and bus_kv[t] else 1.0
+        transformers["name"].append(name)
+        transformers["from"].append(f)
+        transformers["to"].append(t)
+        transformers["rating_mva"].append(kva / 1000.0)
+        transformers["kv_from"].append(kv_f)
+        transformers["kv_to"].append(kv_t)
+        transformers["r_percent"].append(r_f + r_t)
+        transformers["x_percent"].append(dss.Transformers.Xhl())
+        transformers["tap_ratio"].append(ratio)
+
+    for _ in _iterate(dss.Loads):
+        dss.Circuit.SetActiveElement(f"Load.{dss.Loads.Name()}")
+        i = active_bus()
+        if i is not None:
+            load_mw[i] += dss.Loads.kW() / 1000.0
+            load_mvar[i] += dss.Loads.kvar() / 1000.0
+
+    generators = {key: [] for key in ("name", "bus", "p_mw", "mva")}
+    for _ in _iterate(dss.Generators):
+        name = dss.Generators.Name()
+        dss.Circuit.SetActiveElement(f"Generator.{name}")
+        i = active_bus()
+        if i is None:
+            continue
+        gen_mw[i] += dss.Generators.kW() / 1000.0
+        gen_mvar[i] += dss.Generators.kvar() / 1000.0
+        if i != slack:
+            bus_type[i] = "PV"
+        generators["name"].append(name)
+        generators["bus"].append(i)
+        generators["p_mw"].append(dss.Generators.kW() / 1000.0)
+        generators["mva"].append(dss.Generators.kVARated() / 1000.0)
+
+    # Shunt compensation at rated voltage: capacitors inject, reactors absorb
+    for _ in _iterate(dss.Capacitors):
+        dss.Circuit.SetActiveElement(f"Capacitor.{dss.Capacitors.Name()}")
+        i = active_bus()
+        if i is not None:
+            shunt_mvar[i] += dss.Capacitors.kvar() / 1000.0 * (bus_kv[i] / dss.Capacitors.kV()) ** 2
+    for _ in _iterate(dss.Reactors):
+        dss.Circuit.SetActiveElement(f"Reactor.{dss.Reactors.Name()}")
+        i = active_bus()
+        # Series reactors (bus2 connected elsewhere) are not shunts
+        if i is not None and _bus_name(dss.CktElement.BusNames()[1]) == bus_names[i].lower():
+            shunt_mvar[i] -= dss.Reactors.kvar() / 1000.0 * (bus_kv[i] / dss.Reactors.kV()) ** 2
+
+    return {
+        "format_version": np.array(NETWORK_FORMAT_VERSION),
+        "bus_names": np.array(bus_names, dtype=str),
+        "bus_kv": bus_kv,
+        "bus_type": bus_type,
+        "bus_load_mw": load_mw,
+        "bus_load_mvar": load_mvar,
+        "bus_gen_mw": gen_mw,
+        "bus_gen_mvar": gen_mvar,
+        "bus_shunt_mvar": shunt_mvar,
+        "slack_voltage": np.array([slack_pu, slack_angle]),
+        "source": np.array([source_mva, float(np.mean(source_x_r))]),
+        "frequency_hz": np.array(dss.Solution.Frequency()),
+        **{f"line_{key}": np.array(values, dtype=str if key == "name" else int if key in ("from", "to") else float)
+           for key, values in lines.items()},
+        **{f"tr_{key}": np.array(values, dtype=str if key == "name" else int if key in ("from", "to") else float)
+           for key, values in transformers.items()},
+        **{f"gen_{key}": np.array(values, dtype=str if key == "name" else int if key == "bus" else float)
+           for key, values in generators.items()},
+    }
+
+
+def network_from_arrays(arrays: Dict[str, np.ndarray]) -> PowerSystemNetwork:
+    """PowerSystemNetwork built from extracted (or cached) model arrays"""
+    network = PowerSystemNetwork()
+    network.frequency_hz = float(arrays["frequency_hz"])
+    network.source_short_circuit_mva, network.source_x_r = (float(v) for v in arrays["source"])
+
+    bus_ids = [str(name) for name in arrays["bus_names"]]
+    for i, bus_id in enumerate(bus_ids):
+        network.buses[bus_id] = BusData(
+            bus_id, bus_id, float(arrays["bus_kv"][i]),
+            type=str(arrays["bus_type"][i]),
+            load_mw=float(arrays["bus_load_mw"][i]),
+            load_mvar=float(arrays["bus_load_mvar"][i]),
+            generation_mw=float(arrays["bus_gen_mw"][i]),
+            generation_mvar=float(arrays["bus_gen_mvar"][i]),
+            shunt_mvar=float(arrays["bus_shunt_mvar"][i])
+        )
+    slack = network.buses[bus_ids[network.slack_index()]]
+    slack.voltage_pu, slack.angle_deg = (float(v) for v in arrays["slack_voltage"])
+
+    for i, name in enumerate(arrays["line_name"]):
+        from_bus = bus_ids[arrays["line_from"][i]]
+        network.lines[str(name)] = LineData(
+            str(name), str(name), from_bus, bus_ids[arrays["line_to"][i]],
+            float(arrays["line_length_km"][i]), network.buses[from_bus].voltage_kv,
+            r_ohm_per_km=float(arrays["line_r"][i]),
+            x_ohm_per_km=float(arrays["line_x"][i]),
+            b_mho_per_km=float(arrays["line_b"][i]),
+            rating_mva=float(arrays["line_rating_mva"][i])
+        )
+
+    for i, name in enumerate(arrays["tr_name"]):
+        transformer = TransformerData(
+            str(name), str(name), bus_ids[arrays["tr_from"][i]], bus_ids[arrays["tr_to"][i]],
+            float(arrays["tr_rating_mva"][i]),
+            f"{arrays['tr_kv_from'][i]:g}/{arrays['tr_kv_to'][i]:g}",
+            x_percent=float(arrays["tr_x_percent"][i]),
+            r_percent=float(arrays["tr_r_percent"][i])
+        )
+        # The exact DSS ratio is solved with; the nearest tap position is for display only
+        transformer.tap_ratio = float(arrays["tr_tap_ratio"][i])
+        transformer.tap_position = int(round((transformer.tap_ratio - 1) * 100 / transformer.tap_step))
+        network.transformers[str(name)] = transformer
+
+    for i, name in enumerate(arrays["gen_name"]):
+        network.generators[str(name)] = {
+            "bus": bus_ids[arrays["gen_bus"][i]],
+            "p_mw": float(arrays["gen_p_mw"][i]),
+            "mva": float(arrays["gen_mva"][i])
+        }
+    return network
+
+
+class NetworkCache:
+    """Converted network arrays per DSS content hash, stored as .npz files
+
+    A hit skips compiling and walking the DSS model entirely; only a new
+    content hash (e.g. a newly activated DSS version) triggers a conversion.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+        self.stats = {
+            'conversions': 0,
+            'hits': 0
+        }
+
+    def path_for(self, version_hash: str) -> Path:
+        return self.cache_dir / f"network_v{NETWORK_FORMAT_VERSION}_{version_hash[:32]}.npz"
+
+    def _read(self, path: Path) -> Optional[Dict[str, np.ndarray]]:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {key: data[key] for key in data.files}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable network cache {path.name}: {e}")
+            return None
+        if int(arrays.get("format_version", -1)) != NETWORK_FORMAT_VERSION:
+            return None
+        return arrays
+
+    def _write(self, path: Path, arrays: Dict[str, np.ndarray]):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def get(self, dss_file: Union[str, Path],
+            session: Optional[DSSCircuitSession] = None) -> PowerSystemNetwork:
+        """Network of the DSS file, converted (with session, or a new one) only on a cache miss"""
+        version_hash = hash_dss_content(Path(dss_file).read_text())
+        path = self.path_for(version_hash)
+        arrays = self._read(path) if path.exists() else None
+        if arrays is not None:
+            self.stats['hits'] += 1
+            return network_from_arrays(arrays)
+
+        session = session or DSSCircuitSession()
+        session.load(str(dss_file))
+        arrays = extract_network_arrays(session)
+        self._write(path, arrays)
+        self.stats['conversions'] += 1
+        logger.info(f"Converted DSS model {version_hash[:12]} to a {len(arrays['bus_names'])}-bus network")
+        return network_from_arrays(arrays)
+
+
+def network_from_dss(dss_file: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                     session: Optional[DSSCircuitSession] = None) -> PowerSystemNetwork:
+    """PowerSystemNetwork of a DSS file, through the .npz cache when cache_dir is given"""
+    if cache_dir is not None:
+        return NetworkCache(cache_dir).get(dss_file, session)
+    session = session or DSSCircuitSession()
+    session.load(str(dss_file))
+    return network_from_arrays(extract_network_arrays(session))
@@ -0,0 +1,242 @@
+"""
+Persistent OpenDSS Circuit Session
+Compiles a DSS model once and applies only the changed edits before each solve
+"""
+import hashlib
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Tuple, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CircuitEditSet:
+    """Desired circuit modifications on top of the compiled baseline"""
+    options: Dict[str, Any] = field(default_factory=dict)  # e.g. {'loadmult': 1.1, 'frequency': 49.7}
+    properties: Dict[Tuple[str, str], Any] = field(default_factory=dict)  # (element, property) -> value
+    objects: Dict[str, str] = field(default_factory=dict)  # element name -> definition properties
+
+    def copy(self) -> 'CircuitEditSet':
+        return CircuitEditSet(options=dict(self.options),
+                              properties=dict(self.properties),
+                              objects=dict(self.objects))
+
+    def merge(self, other: 'CircuitEditSet') -> 'CircuitEditSet':
+        """Overlay another edit set on this one (other wins on conflicts)"""
+        self.options.update(other.options)
+        self.properties.update(other.properties)
+        self.objects.update(other.objects)
+        return self
+
+
+def hash_dss_content(content: str) -> str:
+    """Content hash used to identify a DSS model version"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class DSSCircuitSession:
+    """Compile-once OpenDSS session with dirty tracking of circuit edits
+
+    The circuit is only recompiled when the DSS file content changes or when
+    another component has replaced the active circuit in the process-global
+    OpenDSS engine. Every other change (load multiplier, source voltage,
+    frequency, injected anomaly objects) is applied as an incremental edit.
+    """
+
+    def __init__(self, dss_module=None):
+        if dss_module is None:
+            import opendssdirect as dss_module
+        self.dss = dss_module
+        self.dss_file: Optional[str] = None
+        self.version_hash: Optional[str] = None
+        self._builder: Optional[Callable[[], None]] = None  # rebuilds an attached (fileless) circuit
+
+        # Fingerprint of the compiled circuit, used to detect foreign recompiles.
+        # The marker is a LoadShape that any compile/clear by another component drops.
+        self._circuit_name = None
+        self._element_count = 0
+        self._marker = None
+
+        # Baseline values captured before the first edit of each option/property
+        self._baseline_options: Dict[str, Any] = {}
+        self._baseline_properties: Dict[Tuple[str, str], Any] = {}
+
+        # What is currently applied to the circuit
+        self._applied = CircuitEditSet()
+        self._created_objects = set()
+
+        self.stats = {
+            'compiles': 0,
+            'solves': 0,
+            'edits_applied': 0
+        }
+
+    @property
+    def is_compiled(self) -> bool:
+        return self._circuit_name is not None
+
+    def load(self, dss_file: str) -> bool:
+        """Point the session at a DSS file; compiles only if its content changed"""
+        content = Path(dss_file).read_text()
+        version_hash = hash_dss_content(content)
+        self.dss_file = str(dss_file)
+
+        if version_hash == self.version_hash and self._is_active():
+            logger.debug("DSS content unchanged, keeping compiled circuit")
+            return False
+
+        self.version_hash = version_hash
+        self._builder = None
+        self._compile()
+        return True
+
+    def attach(self, builder: Callable[[], None]):
+        """Track a circuit built by commands instead of a DSS file
+
+        builder must create the circuit in the engine; it is called now and
+        whenever another component has replaced the active circuit.
+        """
+        self.dss_file = None
+        self.version_hash = None
+        self._builder = builder
+        self._compile()
+
+    def _compile(self):
+        """Compile the DSS file (or run the builder) and reset all tracked edit state"""
+        if self._builder is not None:
+            self._builder()
+        else:
+            self.dss.Text.Command(f"compile [{self.dss_file}]")
+        # Must recalculate voltage bases after compile
+        self.dss.Text.Command("CalcVoltageBases")
+
+        self._circuit_name = self.dss.Circuit.Name()
+        self._element_count = self.dss.Circuit.NumCktElements()
+        self._marker = f"dt_session_{id(self):x}_{self.stats['compiles']}"
+        self.dss.Text.Command(f"New LoadShape.{self._marker} npts=1 mult=[1]")
+        self._baseline_options.clear()
+        self._baseline_properties.clear()
+        self._applied = CircuitEditSet()
+        self._created_objects = set()
+        self.stats['compiles'] += 1
+        logger.info(f"Compiled OpenDSS circuit '{self._circuit_name}' (version {(self.version_hash or 'built')[:12]})")
+
+    def _is_active(self) -> bool:
+        """Check that the engine still holds the circuit this session compiled"""
+        if self._circuit_name is None:
+            return False
+        try:
+            expected_elements = self._element_count + len(self._created_objects)
+            return (self.dss.Circuit.Name() == self._circuit_name and
+                    self.dss.Circuit.NumCktElements() == expected_elements and
+                    self._marker in self.dss.LoadShape.AllNames())
+        except Exception:
+            return False
+
+    def ensure_compiled(self):
+        """Recompile if another component replaced or altered the active circuit"""
+        if not self.dss_file and self._builder is None:
+            raise RuntimeError("No DSS file loaded in session")
+        if not self._is_active():
+            logger.info("Active OpenDSS circuit changed outside the session, recompiling")
+            self._compile()
+
+    def _query(self, target: str) -> str:
+        self.dss.Text.Command(f"? {target}")
+        return self.dss.Text.Result()
+
+    def _get_option(self, name: str) -> str:
+        self.dss.Text.Command(f"get {name}")
+        return self.dss.Text.Result()
+
+    def apply(self, edits: CircuitEditSet):
+        """Bring the circuit to the given edit set, issuing only changed commands"""
+        self.ensure_compiled()
+        commands = []
+
+        # Solution options
+        for name, value in edits.options.items():
+            if self._applied.options.get(name) != value:
+                if name not in self._baseline_options:
+                    self._baseline_options[name] = self._get_option(name)
+                commands.append(f"set {name}={value}")
+        for name in set(self._applied.options) - set(edits.options):
+            baseline = self._baseline_options.get(name)
+            if baseline is not None:
+                commands.append(f"set {name}={baseline}")
+
+        # Element property edits
+        for key, value in edits.properties.items():
+            if self._applied.properties.get(key) != value:
+                element, prop = key
+                if key not in self._baseline_properties:
+                    self._baseline_properties[key] = self._query(f"{element}.{prop}")
+                commands.append(f"{element}.{prop}={value}")
+        for key in set(self._applied.properties) - set(edits.properties):
+            element, prop = key
+            commands.append(f"{element}.{prop}={self._baseline_properties[key]}")
+
+        # Injected objects (anomaly faults etc.)
+        for name, definition in edits.objects.items():
+            if self._applied.objects.get(name) != definition:
+                if name in self._created_objects:
+                    commands.append(f"Edit {name} {definition} enabled=yes")
+                else:
+                    commands.append(f"New {name} {definition} enabled=yes")
+                    self._created_objects.add(name)
+        for name in set(self._applied.objects) - set(edits.objects):
+            commands.append(f"Disable {name}")
+
+        try:
+            for command in commands:
+                self.dss.Text.Command(command)
+        except Exception:
+            # Circuit is in an unknown state; force a clean recompile on next use
+            self._marker = None
+            raise
+
+        self._applied = CircuitEditSet(
+            options=dict(edits.options),
+            properties=dict(edits.properties),
+            objects=dict(edits.objects)
+        )
+        self.stats['edits_applied'] += len(commands)
+        if commands:
+            logger.debug(f"Applied {len(commands)} circuit edits: {commands}")
+
+    def snapshot(self) -> CircuitEditSet:
+        """Restore point: the edits currently applied on top of the baseline"""
+        return self._applied.copy()
+
+    def restore(self, snapshot: CircuitEditSet):
+        """Return to a restore point, reverting only what was touched since"""
+        self.apply(snapshot)
+
+    @contextmanager
+    def transient(self, edits: CircuitEditSet) -> Iterator[CircuitEditSet]:
+        """Apply edits on top of the current state and revert them on exit"""
+        restore_point = self.snapshot()
+        self.apply(restore_point.copy().merge(edits))
+        try:
+            yield restore_point
+        finally:
+            self.restore(restore_point)
+
+    def solve(self) -> bool:
+        """Solve the circuit in its current state"""
+        self.ensure_compiled()
+        self.dss.Text.Command("solve")
+        self.stats['solves'] += 1
+        return self.dss.Solution.Converged()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Session statistics"""
+        return {
+            **self.stats,
+            'version_hash': self.version_hash,
+            'circuit': self._circuit_name,
+            'injected_objects': sorted(self._created_objects)
+        }
@@ -0,0 +1,141 @@
+"""
+OpenDSS Fault Study Cache
+Runs Mode=FaultStudy once per circuit version and serves per-bus fault levels from arrays
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from .dss_session import DSSCircuitSession, CircuitEditSet
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FaultStudyResult:
+    """Bolted fault levels of every bus for one circuit version"""
+    version_hash: Optional[str]
+    bus_names: List[str]
+    bus_index: Dict[str, int]   # lowercase bus name -> position
+    kv_base_ll: np.ndarray      # L-L kV base per bus
+    isc_3ph_ka: np.ndarray      # three-phase fault current (kA)
+    isc_slg_ka: np.ndarray      # single line-to-ground fault current (kA)
+    isc_ll_ka: np.ndarray       # line-to-line fault current (kA)
+    x_r: np.ndarray             # positive-sequence X/R at the fault point
+    solved_at: float = 0.0
+
+    def bus(self, bus_name: str) -> Optional[Dict[str, Any]]:
+        """Fault levels at one bus, or None if the bus is unknown"""
+        i = self.bus_index.get(bus_name.split('.')[0].lower())
+        if i is None:
+            return None
+        return {
+            'bus': self.bus_names[i],
+            'kv_base': float(self.kv_base_ll[i]),
+            'three_phase_ka': float(self.isc_3ph_ka[i]),
+            'single_phase_ka': float(self.isc_slg_ka[i]),
+            'line_to_line_ka': float(self.isc_ll_ka[i]),
+            'max_ka': float(max(self.isc_3ph_ka[i], self.isc_slg_ka[i], self.isc_ll_ka[i])),
+            'x_r_ratio': float(self.x_r[i])
+        }
+
+    def worst_bus(self) -> Optional[str]:
+        """Bus with the highest fault current of any type"""
+        if not self.bus_names:
+            return None
+        worst = np.fmax(np.fmax(self.isc_3ph_ka, self.isc_slg_ka), self.isc_ll_ka)
+        return self.bus_names[int(np.nanargmax(worst))]
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Fault levels of every bus"""
+        return {name: self.bus(name) for name in self.bus_names}
+
+
+def run_fault_study(session: DSSCircuitSession) -> FaultStudyResult:
+    """Run an OpenDSS fault study on the session's intact circuit
+
+    Fault currents are derived from the per-bus positive and zero sequence
+    short-circuit impedances computed by the study (Z2 = Z1).
+    """
+    dss = session.dss
+    # Study the intact network; the next load flow re-applies its own edits
+    session.apply(CircuitEditSet())
+
+    dss.Text.Command("get mode")
+    previous_mode = dss.Text.Result() or "snapshot"
+    try:
+        dss.Text.Command("set mode=faultstudy")
+        dss.Text.Command("solve")
+
+        bus_names = list(dss.Circuit.AllBusNames())
+        kv_ln = np.zeros(len(bus_names))
+        z1 = np.full(len(bus_names), np.nan, dtype=complex)
+        z0 = np.full(len(bus_names), np.nan, dtype=complex)
+        # opendssdirect has no all-bus Zsc accessor (Export SeqZ only writes rounded
+        # text), so the sequence impedances are read bus by bus, once per version
+        for i, name in enumerate(bus_names):
+            dss.Circuit.SetActiveBus(name)
+            kv_ln[i] = dss.Bus.kVBase()
+            zsc1 = dss.Bus.Zsc1()
+            zsc0 = dss.Bus.Zsc0()
+            if len(zsc1) >= 2:
+                z1[i] = complex(zsc1[0], zsc1[1])
+            if len(zsc0) >= 2:
+                z0[i] = complex(zsc0[0], zsc0[1])
+    finally:
+        dss.Text.Command(f"set mode={previous_mode}")
+
+    v_ln = kv_ln * 1000.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        isc_3ph = v_ln / np.abs(z1) / 1000.0
+        isc_slg = 3 * v_ln / np.abs(2 * z1 + z0) / 1000.0
+        isc_ll = np.sqrt(3) * v_ln / np.abs(2 * z1) / 1000.0
+        x_r = z1.imag / z1.real
+
+    logger.info(f"Fault study completed for {len(bus_names)} buses "
+                f"(version {(session.version_hash or '')[:12]})")
+    return FaultStudyResult(
+        version_hash=session.version_hash,
+        bus_names=bus_names,
+        bus_index={name.lower(): i for i, name in enumerate(bus_names)},
+        kv_base_ll=kv_ln * np.sqrt(3),
+        isc_3ph_ka=isc_3ph,
+        isc_slg_ka=isc_slg,
+        isc_ll_ka=isc_ll,
+        x_r=x_r,
+        solved_at=time.time()
+    )
+
+
+class FaultStudyCache:
+    """Fault study result per circuit version
+
+    The study is only re-run when the session's DSS content hash changes or
+    the cache is explicitly invalidated (e.g. after a DSS version activation).
+    """
+
+    def __init__(self):
+        self._result: Optional[FaultStudyResult] = None
+        self.stats = {
+            'studies': 0,
+            'hits': 0
+        }
+
+    def invalidate(self):
+        """Drop the cached study"""
+        self._result = None
+
+    def get(self, session: DSSCircuitSession) -> FaultStudyResult:
+        """Cached study for the session's circuit version, running it if needed"""
+        result = self._result
+        if result is not None and result.version_hash == session.version_hash:
+            self.stats['hits'] += 1
+            return result
+
+        result = run_fault_study(session)
+        self._result = result
+        self.stats['studies'] += 1
+        return result
@@ -2,103 +2,76 @@
 Load Flow Analysis Module using py-dss-interface
 """
 import numpy as np
-from typing import Dict, List, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Callable, Optional
 import logging
+import time
+
+from .dss_session import DSSCircuitSession, CircuitEditSet
+from .dss_extract import DSSResultExtractor, CircuitResults
+from .contingency import ContingencyAnalyzer
+from .fault_study import FaultStudyCache
+from .anomaly_scheduler import AnomalyScheduler, ScheduledAnomaly, compose_anomaly_edits
 
 logger = logging.getLogger(__name__)
 
+# LoadShape driving every load during a QSTS run
+QSTS_LOADSHAPE = "qsts_year"
+
 class LoadFlowAnalysis:
     def __init__(self):
         self.circuit = None
         self.dss = None
+        self.session = None  # Persistent compiled circuit (created on load_circuit)
+        self.extractor = None  # Bulk result extraction (created on load_circuit)
+        self.last_results: CircuitResults = None  # Array results of the last solve
+        self.contingency_analyzer: ContingencyAnalyzer = None  # Worker pool, created on first sweep
+        self.contingency_workers = None  # None = one per spare CPU core
+        self.fault_study = FaultStudyCache()  # Fault levels per circuit version
         self.results = {}
         self.base_load_mw = 420  # Base load for Indian EHV substation
-        self.active_anomaly = None  # Store active anomaly to inject before solving
-
-    def set_anomaly(self, anomaly_type: str, parameters: Dict[str, Any]):
-        """Set active anomaly to be injected before next solve"""
-        self.active_anomaly = {
-            'type': anomaly_type,
-            'parameters': parameters
-        }
-        logger.info(f"Anomaly set: {anomaly_type} with params {parameters}")
-
-    def clear_anomaly(self):
-        """Clear active anomaly"""
-        self.active_anomaly = None
-        logger.info("Anomaly cleared")
+        self.anomalies = AnomalyScheduler()  # Concurrent timed anomalies injected before each solve
 
-    def inject_anomaly_into_circuit(self):
-        """Inject active anomaly directly into OpenDSS circuit before solving"""
-        if not self.active_anomaly or not self.dss:
-            return
-
-        anomaly_type = self.active_anomaly['type']
-        params = self.active_anomaly['parameters']
-
-        try:
-            logger.info(f"🔥 Injecting anomaly into OpenDSS circuit: {anomaly_type}")
-
-            if anomaly_type == 'voltage_sag':
-                # Reduce source voltage
-                severity = params.get('severity', 0.85)
-                self.dss.Text.Command(f"Vsource.GridSource.pu={severity}")
-                logger.info(f"Applied voltage sag: voltage set to {severity} p.u.")
-
-            elif anomaly_type == 'voltage_surge':
-                # Increase source voltage
-                severity = params.get('severity', 1.12)
-                self.dss.Text.Command(f"Vsource.GridSource.pu={severity}")
-                logger.info(f"Applied voltage surge: voltage set to {severity} p.u.")
-
-            elif anomaly_type == 'overload' or anomaly_type == 'transformer_overload':
-                # Increase all loads by load factor
-                load_factor = params.get('load_factor', 1.2)
-                self.dss.Text.Command(f"set loadmult={load_factor}")
-                logger.info(f"Applied transformer overload: load multiplier set to {load_factor}")
-
-            elif anomaly_type == 'ground_fault':
-                # Enable a fault at specified location
-                location = params.get('location', 'Bus400kV_1')
-                resistance = params.get('resistance', 5)
-                # Create or modify fault object
-                self.dss.Text.Command(f"New Fault.AnomalyFault bus1={location} phases=1 r={resistance} enabled=yes")
-                logger.info(f"Applied ground fault at {location} with R={resistance}Ω")
-
-            elif anomaly_type == 'harmonics' or anomaly_type == 'harmonic_distortion':
-                # Add harmonic spectrum to loads
-                thd = params.get('thd', 5)
-                order = params.get('order', '5')
-                # Apply harmonic spectrum to loads
-                self.dss.Text.Command(f"Load.IndustrialLoad1.spectrum=defaultload")
-                self.dss.Text.Command(f"Load.IndustrialLoad2.spectrum=defaultload")
-                logger.info(f"Applied harmonic distortion: THD={thd}%, order={order}")
-
-            elif anomaly_type == 'frequency_deviation':
-                # Change base frequency
-                deviation = params.get('deviation', 0.3)
-                freq_type = params.get('type', 'under')
-                base_freq = 50.0
-                if freq_type == 'under':
-                    new_freq = base_freq - deviation
-                else:
-                    new_freq = base_freq + deviation
-                self.dss.Text.Command(f"set frequency={new_freq}")
-                logger.info(f"Applied frequency deviation: {new_freq} Hz")
-
-            else:
-                logger.warning(f"Unknown anomaly type: {anomaly_type}")
+    def set_anomaly(self, anomaly_type: str, parameters: Dict[str, Any], **timing) -> ScheduledAnomaly:
+        """Start an anomaly now, alongside any anomalies already active
 
-        except Exception as e:
-            logger.error(f"Error injecting anomaly into circuit: {e}")
-
-    def apply_realistic_load_pattern(self):
-        """Apply realistic seasonal and daily load patterns to OpenDSS circuit"""
-        if not self.dss or not self.circuit:
+        timing takes the ScheduledAnomaly fields duration, ramp, ramp_time,
+        location and id; by default the anomaly stays until cleared.
+        """
+        anomaly = self.anomalies.start_now(anomaly_type, parameters, **timing)
+        logger.info(f"Anomaly set: {anomaly_type} with params {parameters}")
+        return anomaly
+
+    def clear_anomaly(self, anomaly_id: Optional[str] = None):
+        """Clear one anomaly, or all of them"""
+        if anomaly_id is None:
+            self.anomalies.clear()
+        else:
+            self.anomalies.cancel(anomaly_id)
+        logger.info(f"Anomaly cleared: {anomaly_id or 'all'}")
+
+    def active_anomalies(self) -> List[Dict[str, Any]]:
+        """States of the anomalies in effect now, in the form solve() takes"""
+        return self.anomalies.active()
+
+    def inject_anomaly_into_circuit(self, edits: CircuitEditSet, anomalies: List[Dict[str, Any]]):
+        """Add the combined circuit modifications of the given anomalies to the edit set"""
+        if not anomalies or not self.dss:
             return
-
-        from datetime import datetime
-        now = datetime.now()
+        edits.merge(compose_anomaly_edits(anomalies))
+
+    def get_load_multiplier(self, anomalies: Optional[List[Dict[str, Any]]] = None) -> float:
+        """Load multiplier for the next solve (overload anomalies, else seasonal/daily pattern)"""
+        if anomalies is None:
+            anomalies = self.active_anomalies()
+        load_factor = compose_anomaly_edits(anomalies).options.get('loadmult')
+        if load_factor is not None:
+            return load_factor
+        return round(self.get_realistic_load_factor(), 6)
+
+    def get_realistic_load_factor(self, when: datetime = None) -> float:
+        """Seasonal and daily load factor for the given time (default: now)"""
+        now = when or datetime.now()
         hour = now.hour
         month = now.month
 
@@ -128,20 +101,14 @@ class LoadFlowAnalysis:
         else:  # Night valley
             daily_factor = 0.50 + hour * 0.02
 
-        # Combined load factor (but don't override if anomaly is active with overload)
-        load_factor = seasonal_factor * daily_factor
+        logger.debug(f"Load pattern: seasonal={seasonal_factor:.2f}, daily={daily_factor:.2f}")
+        return seasonal_factor * daily_factor
 
-        # Skip load pattern if transformer overload anomaly is active (it sets its own loadmult)
-        if self.active_anomaly and self.active_anomaly['type'] in ['overload', 'transformer_overload']:
-            logger.debug("Skipping realistic load pattern - overload anomaly is active")
+    def apply_realistic_load_pattern(self, edits: CircuitEditSet, when: datetime = None):
+        """Add the realistic seasonal and daily load multiplier to the edit set"""
+        if not self.dss or not self.circuit:
             return
-
-        try:
-            # Apply load factor to all loads in circuit
-            self.dss.Text.Command(f"set loadmult={load_factor}")
-            logger.debug(f"Applied load pattern: seasonal={seasonal_factor:.2f}, daily={daily_factor:.2f}, total={load_factor:.2f}")
-        except Exception as e:
-            logger.warning(f"Could not apply load pattern: {e}")
+        edits.options['loadmult'] = round(self.get_realistic_load_factor(when), 6)
 
     def load_circuit(self, dss_file: str):
         """Load circuit from DSS file using OpenDSS"""
@@ -150,8 +117,11 @@ class LoadFlowAnalysis:
             self.dss = dss
             self._dss_file = dss_file  # Store for re-activation
 
-            # Compile the DSS file
-            dss.Text.Command(f"compile [{dss_file}]")
+            # Compile the DSS file (skipped if this exact content is already compiled)
+            if self.session is None:
+                self.session = DSSCircuitSession(dss)
+                self.extractor = DSSResultExtractor(dss)
+            self.session.load(dss_file)
 
             # Store circuit reference
             self.circuit = dss.Circuit
@@ -163,8 +133,13 @@ class LoadFlowAnalysis:
             self.circuit = None
             return False
 
-    def solve(self) -> Dict[str, Any]:
-        """Run load flow analysis using actual OpenDSS"""
+    def solve(self, anomalies: Optional[List[Dict[str, Any]]] = None,
+              when: datetime = None) -> Dict[str, Any]:
+        """Run load flow analysis using actual OpenDSS
+
+        anomalies defaults to the scheduler's active anomalies; when (default:
+        now) sets the time of the seasonal/daily load pattern.
+        """
         if not self.dss:
             # Return fallback values if OpenDSS not initialized
             logger.warning("⚠️ OpenDSS not initialized, returning fallback values (NOT REAL DATA)")
@@ -183,56 +158,47 @@ class LoadFlowAnalysis:
             }
 
         try:
-            # Recompile circuit to ensure it's active (opendssdirect loses context)
-            if hasattr(self, '_dss_file') and self._dss_file:
-                self.dss.Text.Command(f"compile [{self._dss_file}]")
-                # Must recalculate voltage bases after recompile
-                self.dss.Text.Command("CalcVoltageBases")
-
-            # Apply realistic load patterns before solving
-            self.apply_realistic_load_pattern()
-
-            # *** INJECT ANOMALY INTO CIRCUIT BEFORE SOLVING ***
-            self.inject_anomaly_into_circuit()
-
-            # Solve the power flow
-            self.dss.Text.Command("solve")
-            logger.info(f"Solve converged: {self.dss.Solution.Converged()}")
+            # Collect the edits for this solve: realistic load pattern, then the
+            # active anomalies (an overload's loadmult replaces the pattern)
+            if anomalies is None:
+                anomalies = self.active_anomalies()
+            edits = CircuitEditSet()
+            self.apply_realistic_load_pattern(edits, when)
+            self.inject_anomaly_into_circuit(edits, anomalies)
+
+            # Apply only what changed since the last solve (recompiles only if the
+            # circuit was replaced by another component), then solve
+            self.session.apply(edits)
+            self.session.solve()
+            logger.debug(f"Solve converged: {self.dss.Solution.Converged()}")
 
             # Check if solution converged
             converged = self.dss.Solution.Converged()
             iterations = self.dss.Solution.Iterations()
 
-            # Get voltage profile
-            voltages_pu = []
-            voltage_400kv = 400.0
-            voltage_220kv = 220.0
-
-            bus_names = self.dss.Circuit.AllBusNames()
-            logger.info(f"Found {len(bus_names)} buses in circuit")
-
-            import math
-            for bus_name in bus_names:
-                self.dss.Circuit.SetActiveBus(bus_name)
-                v_pu = self.dss.Bus.puVmagAngle()
-                if v_pu and len(v_pu) > 0:
-                    voltages_pu.append(v_pu[0])  # Magnitude
+            # Get voltage profile (bulk array read, first node of each bus)
+            results = self.extractor.extract(self.session.version_hash, include_pc=False)
+            self.last_results = results
+            bus_v_pu = results.bus_v_pu
+            kv_base = results.topology.bus_kv_base
+            has_voltage = ~np.isnan(bus_v_pu)
+            voltages_pu = bus_v_pu[has_voltage]
 
-                    # Get actual kV value (OpenDSS returns line-to-neutral for 3-phase)
-                    kv_base = self.dss.Bus.kVBase()
-                    kv_actual_ln = v_pu[0] * kv_base
-                    kv_actual_ll = kv_actual_ln * math.sqrt(3)  # Convert to line-to-line
+            # OpenDSS kV bases are line-to-neutral for 3-phase; convert to line-to-line
+            kv_actual_ll = bus_v_pu * kv_base * np.sqrt(3)
 
-                    # Categorize by voltage level (kv_base is L-N: 400kV L-L = 231 kV L-N)
-                    if kv_base > 200:  # 400kV bus (L-N base ~231 kV)
-                        voltage_400kv = kv_actual_ll
-                        logger.info(f"400kV bus: {bus_name}, kv_base={kv_base:.2f}, v_pu={v_pu[0]:.4f}, kv_L-L={kv_actual_ll:.2f}")
-                    elif kv_base > 50:  # 220kV bus (L-N base ~127 kV)
-                        voltage_220kv = kv_actual_ll
-                        logger.info(f"220kV bus: {bus_name}, kv_base={kv_base:.2f}, v_pu={v_pu[0]:.4f}, kv_L-L={kv_actual_ll:.2f}")
+            # Categorize by voltage level (kv_base is L-N: 400kV L-L = 231 kV L-N);
+            # the last bus of each level is reported, as before
+            voltage_400kv = 400.0
+            voltage_220kv = 220.0
+            bus_400kv, bus_220kv = self._voltage_level_buses(kv_base, has_voltage)
+            if bus_400kv >= 0:
+                voltage_400kv = float(kv_actual_ll[bus_400kv])
+            if bus_220kv >= 0:
+                voltage_220kv = float(kv_actual_ll[bus_220kv])
 
-            max_voltage_pu = max(voltages_pu) if voltages_pu else 1.0
-            min_voltage_pu = min(voltages_pu) if voltages_pu else 1.0
+            max_voltage_pu = float(voltages_pu.max()) if len(voltages_pu) else 1.0
+            min_voltage_pu = float(voltages_pu.min()) if len(voltages_pu) else 1.0
 
             # Get total losses (OpenDSS Circuit.Losses() returns in W)
             losses = self.dss.Circuit.Losses()
@@ -290,28 +256,217 @@ class LoadFlowAnalysis:
                 "total_power_kvar": 0
             }
 
-    def run_contingency_analysis(self) -> List[Dict]:
-        """Run N-1 contingency analysis"""
-        contingencies = []
-        assets = ["T1", "T2", "L1", "L2"]
-
-        for asset in assets:
-            result = {
-                "asset": asset,
-                "status": "secure",
-                "max_loading": 85 + np.random.uniform(-10, 10),
-                "voltage_deviation": np.random.uniform(0, 0.05)
+    @staticmethod
+    def _voltage_level_buses(kv_base: np.ndarray, has_voltage: np.ndarray):
+        """Index of the reported 400 kV and 220 kV bus (-1 if none)"""
+        buses_400kv = np.flatnonzero(has_voltage & (kv_base > 200))  # L-N base ~231 kV
+        buses_220kv = np.flatnonzero(has_voltage & (kv_base > 50) & (kv_base <= 200))  # L-N base ~127 kV
+        return (int(buses_400kv[-1]) if len(buses_400kv) else -1,
+                int(buses_220kv[-1]) if len(buses_220kv) else -1)
+
+    def build_load_profile(self, start: datetime, steps: int, step_minutes: int = 60) -> np.ndarray:
+        """Seasonal/daily load multipliers for consecutive time steps from start"""
+        step = timedelta(minutes=step_minutes)
+        return np.array([self.get_realistic_load_factor(start + k * step) for k in range(steps)])
+
+    def run_qsts(self, start: datetime = None, hours: int = 8760, step_minutes: int = 60,
+                 chunk_steps: int = 744,
+                 on_chunk: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Dict[str, Any]:
+        """Quasi-static time-series simulation in OpenDSS yearly mode
+
+        The seasonal/daily load pattern becomes a yearly LoadShape on every load,
+        so each step is a plain solve of the compiled circuit. OpenDSS advances one
+        step per solve; chunk_steps only batches the rows handed to on_chunk
+        (e.g. to stream into storage), not the solves.
+        The intact circuit is simulated; the active anomaly is not applied.
+        Returns the per-step arrays and a summary.
+        """
+        if not self.session or not self.session.is_compiled:
+            raise RuntimeError("No circuit loaded")
+
+        dss = self.dss
+        start = start or datetime(datetime.now().year, 1, 1)
+        steps = int(hours * 60 // step_minutes)
+        profile = self.build_load_profile(start, steps, step_minutes)
+
+        # Yearly shape on every load; loadmult stays at 1 so the shape alone sets the load
+        self.session.apply(CircuitEditSet())
+        if QSTS_LOADSHAPE in [name.lower() for name in dss.LoadShape.AllNames()]:
+            dss.LoadShape.Name(QSTS_LOADSHAPE)
+        else:
+            dss.LoadShape.New(QSTS_LOADSHAPE)
+        dss.LoadShape.Npts(steps)
+        dss.LoadShape.HrInterval(step_minutes / 60.0)
+        dss.LoadShape.PMult(profile)
+        edits = CircuitEditSet(options={'loadmult': 1.0})
+        for load in dss.Loads.AllNames():
+            edits.properties[(f"Load.{load}", 'yearly')] = QSTS_LOADSHAPE
+        self.session.apply(edits)
+
+        topology = self.extractor.topology(self.session.version_hash)
+        first_node = topology.bus_first_node
+        has_voltage = first_node >= 0
+        kv_ll = topology.bus_kv_base * np.sqrt(3)
+        bus_400kv, bus_220kv = self._voltage_level_buses(topology.bus_kv_base, has_voltage)
+        first_node = first_node[has_voltage]
+
+        columns = ('total_power_kw', 'total_power_kvar', 'total_losses_mw',
+                   'min_voltage_pu', 'max_voltage_pu', 'voltage_400kv', 'voltage_220kv')
+        series = {name: np.full(steps, np.nan) for name in columns}
+        converged = np.zeros(steps, dtype=bool)
+
+        began = time.time()
+        dss.Text.Command("get mode")
+        previous_mode = dss.Text.Result() or "snapshot"
+        try:
+            # number=1: min/max voltage over every bus is read after each solve, which
+            # a multi-step solve would only expose through a monitor per bus
+            dss.Text.Command(f"set mode=yearly stepsize={step_minutes}m number=1 hour=0 sec=0")
+            for chunk_start in range(0, steps, chunk_steps):
+                chunk_end = min(chunk_start + chunk_steps, steps)
+                for k in range(chunk_start, chunk_end):
+                    dss.Solution.Solve()
+                    converged[k] = dss.Solution.Converged()
+                    power = dss.Circuit.TotalPower()
+                    node_v_pu = np.asarray(dss.Circuit.AllBusMagPu())
+                    bus_v_pu = node_v_pu[first_node]
+                    series['total_power_kw'][k] = power[0]
+                    series['total_power_kvar'][k] = power[1]
+                    series['total_losses_mw'][k] = abs(dss.Circuit.Losses()[0]) / 1e6
+                    series['min_voltage_pu'][k] = bus_v_pu.min()
+                    series['max_voltage_pu'][k] = bus_v_pu.max()
+                    if bus_400kv >= 0:
+                        series['voltage_400kv'][k] = node_v_pu[topology.bus_first_node[bus_400kv]] * kv_ll[bus_400kv]
+                    if bus_220kv >= 0:
+                        series['voltage_220kv'][k] = node_v_pu[topology.bus_first_node[bus_220kv]] * kv_ll[bus_220kv]
+
+                if on_chunk is not None:
+                    on_chunk([
+                        {
+                            'timestamp': start + timedelta(minutes=k * step_minutes),
+                            'step': k,
+                            'load_multiplier': float(profile[k]),
+                            'converged': bool(converged[k]),
+                            **{name: float(series[name][k]) for name in columns}
+                        }
+                        for k in range(chunk_start, chunk_end)
+                    ])
+        finally:
+            dss.Text.Command(f"set mode={previous_mode}")
+            # Loads go back to their own shapes on the next solve
+            self.session.apply(CircuitEditSet())
+
+        elapsed = time.time() - began
+        logger.info(f"QSTS: {steps} steps of {step_minutes} min in {elapsed:.2f}s "
+                    f"({np.count_nonzero(~converged)} not converged)")
+        return {
+            'timestamps': [start + timedelta(minutes=k * step_minutes) for k in range(steps)],
+            'load_multiplier': profile,
+            'converged': converged,
+            **series,
+            'summary': {
+                'start': start.isoformat(),
+                'steps': steps,
+                'step_minutes': step_minutes,
+                'non_converged': int(np.count_nonzero(~converged)),
+                'peak_power_kw': float(np.nanmax(np.abs(series['total_power_kw']))) if steps else 0.0,
+                'energy_mwh': float(np.nansum(np.abs(series['total_power_kw'])) * step_minutes / 60 / 1000),
+                'losses_mwh': float(np.nansum(series['total_losses_mw']) * step_minutes / 60),
+                'min_voltage_pu': float(np.nanmin(series['min_voltage_pu'])) if steps else 1.0,
+                'max_voltage_pu': float(np.nanmax(series['max_voltage_pu'])) if steps else 1.0,
+                'elapsed_seconds': elapsed
             }
-            contingencies.append(result)
+        }
+
+    def get_element_results(self) -> Dict[str, Any]:
+        """Per-bus voltages and per-element terminal totals from the last solve
 
-        return contingencies
+        Arrays are in circuit order with their name lists, so they can be shipped
+        across process boundaries and scattered onto assets by index.
+        """
+        elements = {"version": None, "buses": {}, "elements": {}}
+        if not self.dss:
+            return elements
 
-    def analyze_fault_current(self) -> Dict[str, Any]:
-        """Analyze fault currents"""
+        try:
+            results = self.last_results
+            if results is None:
+                results = self.extractor.extract(self.session.version_hash, include_pc=False)
+
+            topology = results.topology
+            elements["version"] = topology.version_key
+            elements["buses"] = {
+                "names": topology.bus_names,
+                "v_pu": results.bus_v_pu,
+                "kv_base": topology.bus_kv_base
+            }
+            elements["elements"] = {
+                "names": topology.pd_names,
+                **results.terminal_totals()
+            }
+        except Exception as e:
+            logger.error(f"Error extracting element results: {e}")
+
+        return elements
+
+    def run_contingency_analysis(self, n2: bool = False) -> List[Dict]:
+        """Run N-1 (optionally pruned N-2) contingency analysis, ranked by severity
+
+        Outage cases are solved in worker processes with their own compiled copy
+        of the circuit; the engine in this process is not touched.
+        """
+        if not getattr(self, '_dss_file', None):
+            logger.warning("No circuit loaded, skipping contingency analysis")
+            return []
+
+        if self.contingency_analyzer is None:
+            self.contingency_analyzer = ContingencyAnalyzer(workers=self.contingency_workers)
+
+        sweep = self.contingency_analyzer.run(
+            self._dss_file,
+            load_multiplier=self.get_load_multiplier(),
+            n2=n2
+        )
+        self.results['contingency_summary'] = sweep['summary']
+        return sweep['results']
+
+    def analyze_fault_current(self, bus: str = None, breaker_rating_ka: float = 40.0) -> Dict[str, Any]:
+        """Fault levels and breaker adequacy at a bus (default: the bus with the highest fault level)
+
+        The OpenDSS fault study runs once per circuit version; later calls are lookups.
+        """
+        if not self.session or not self.session.is_compiled:
+            logger.warning("No circuit loaded, cannot analyze fault currents")
+            return {}
+
+        study = self.fault_study.get(self.session)
+        location = bus or study.worst_bus()
+        levels = study.bus(location) if location else None
+        if levels is None:
+            raise ValueError(f"Unknown bus: {bus}")
+
+        max_ka = levels['max_ka']
         return {
-            "three_phase_fault": {"current_ka": 31.5, "location": "Bus1"},
-            "single_phase_fault": {"current_ka": 28.2, "location": "Bus1"},
-            "max_fault_current": 31.5,
-            "breaker_rating": 40.0,
-            "margin": "26.7%"
-        }
\ No newline at end of file
+            "three_phase_fault": {"current_ka": round(levels['three_phase_ka'], 2), "location": levels['bus']},
+            "single_phase_fault": {"current_ka": round(levels['single_phase_ka'], 2), "location": levels['bus']},
+            "line_to_line_fault": {"current_ka": round(levels['line_to_line_ka'], 2), "location": levels['bus']},
+            "x_r_ratio": round(levels['x_r_ratio'], 2),
+            "max_fault_current": round(max_ka, 2),
+            "breaker_rating": breaker_rating_ka,
+            "margin": f"{(breaker_rating_ka - max_ka) / breaker_rating_ka * 100:.1f}%",
+            "adequate": max_ka <= breaker_rating_ka
+        }
+
+    def has_bus(self, bus: str) -> bool:
+        """Whether the loaded circuit has the bus (node suffixes and case ignored)"""
+        if not self.session or not self.session.is_compiled:
+            return False
+        self.session.ensure_compiled()
+        return bus.split('.')[0].lower() in {name.lower() for name in self.dss.Circuit.AllBusNames()}
+
+    def get_fault_levels(self, bus: str = None) -> Dict[str, Any]:
+        """Fault levels of one bus (None if unknown) or of every bus, from the cached fault study"""
+        if not self.session or not self.session.is_compiled:
+            return None if bus else {}
+        study = self.fault_study.get(self.session)
+        return study.bus(bus) if bus else study.to_dict()
\ No newline at end of file
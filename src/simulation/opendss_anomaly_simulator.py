@@ -15,6 +15,10 @@ import opendssdirect as dss
 import random
 import os
 
+from .anomaly_features import AnomalyFeatureExtractor, FEATURE_NAMES
+from .dss_extract import DSSResultExtractor
+from .dss_session import DSSCircuitSession, CircuitEditSet
+
 logger = logging.getLogger(__name__)
 
 class AnomalyType(Enum):
@@ -80,6 +84,10 @@ class OpenDSSAnomalySimulator:
         """Initialize the anomaly simulator with a DSS circuit file"""
         self.dss_file = dss_file
         self.dss = None
+        self.extractor = DSSResultExtractor(dss)
+        self.feature_extractor = AnomalyFeatureExtractor()
+        # Anomalies are applied as edit sets and reverted element by element, never by recompiling
+        self.session = DSSCircuitSession(dss)
         self._initialize_dss()
 
         # Store baseline values
@@ -98,6 +106,7 @@ class OpenDSSAnomalySimulator:
         try:
             # opendssdirect doesn't need object creation, use module directly
             self.dss = dss
+            self.extractor.invalidate()
 
             # Create a default circuit if file doesn't exist
             if not os.path.exists(self.dss_file):
@@ -105,14 +114,10 @@ class OpenDSSAnomalySimulator:
                 self._create_default_ehv_circuit()
             else:
                 logger.info(f"Compiling DSS file: {self.dss_file}")
-                dss.run_command(f"compile [{self.dss_file}]")
-                if not dss.Solution.Converged():
-                    logger.error("DSS compilation/solve failed")
-                    raise RuntimeError("DSS compilation/solve failed")
+                self.session.load(self.dss_file)
 
             # Solve baseline
-            dss.run_command("solve")
-            if not dss.Solution.Converged():
+            if not self.session.solve():
                 logger.warning("DSS baseline solve did not converge")
 
             self._store_baseline()
@@ -126,6 +131,12 @@ class OpenDSSAnomalySimulator:
     def _create_default_ehv_circuit(self):
         """Create a default 400/220 kV substation circuit in OpenDSS"""
         logger.info("Creating default EHV substation circuit")
+        self.session.attach(self._build_default_ehv_circuit)
+        self.session.solve()
+        logger.info("Default EHV circuit created successfully")
+
+    def _build_default_ehv_circuit(self):
+        """Default circuit definition (re-run if another component replaces the circuit)"""
 
         # Clear any existing circuit
         dss.run_command("clear")
@@ -214,26 +225,21 @@ class OpenDSSAnomalySimulator:
         dss.run_command("new monitor.Mon_TR1 element=transformer.TR1 terminal=1 mode=0")
         dss.run_command("new monitor.Mon_220_1 element=line.Line220_1 terminal=1 mode=0")
 
-        # Solve the circuit
-        dss.run_command("solve")
-
-        logger.info("Default EHV circuit created successfully")
-
     def _store_baseline(self):
         """Store baseline values for comparison"""
-        # Get all buses
-        bus_names = dss.Circuit.AllBusNames()
-
-        for bus_name in bus_names:
-            dss.Circuit.SetActiveBus(bus_name)
-
-            # Store voltage
-            voltages = dss.Bus.puVmagAngle()
-            self.baseline_voltages[bus_name] = voltages
+        # Store voltages of all buses
+        results = self.extractor.extract(include_pc=False)
+        self.baseline_voltages.update(results.bus_vmag_angle())
 
         # Store baseline for circuit-level metrics
         # Note: Element-level baselines can be added if needed using specific element types
 
+    def _solve_with(self, edits: CircuitEditSet, capture=None) -> Dict[str, Any]:
+        """Solve with edits applied on top of the current circuit, capture, then revert them"""
+        with self.session.transient(edits):
+            self.session.solve()
+            return (capture or self._capture_system_state)()
+
     def inject_voltage_sag(self, bus: str, magnitude: float = 0.7,
                           duration_cycles: int = 30, phases: List[str] = ['A', 'B', 'C']):
         """Inject voltage sag anomaly"""
@@ -245,64 +251,34 @@ class OpenDSSAnomalySimulator:
         # Create fault to simulate voltage sag
         fault_resistance = 0.001 + (1 - magnitude) * 10  # Adjust fault resistance based on sag depth
 
-        if 'A' in phases:
-            dss.run_command(f"new fault.sag_A bus1={bus}.1 bus2={bus}.0 r=({fault_resistance})")
-        if 'B' in phases:
-            dss.run_command(f"new fault.sag_B bus1={bus}.2 bus2={bus}.0 r=({fault_resistance})")
-        if 'C' in phases:
-            dss.run_command(f"new fault.sag_C bus1={bus}.3 bus2={bus}.0 r=({fault_resistance})")
+        edits = CircuitEditSet()
+        for phase, node in (('A', 1), ('B', 2), ('C', 3)):
+            if phase in phases:
+                edits.objects[f"Fault.sag_{phase}"] = f"bus1={bus}.{node} bus2={bus}.0 r={fault_resistance}"
 
-        # Solve with fault
-        dss.run_command("solve")
-
-        # Record anomaly data
-        anomaly_data = self._capture_system_state()
+        # Solve with fault, then clear it
+        anomaly_data = self._solve_with(edits)
         anomaly_data['anomaly_type'] = 'voltage_sag'
         anomaly_data['location'] = bus
         anomaly_data['severity'] = 1 - magnitude
 
-        # Clear faults
-        if 'A' in phases:
-            dss.run_command("disable fault.sag_A")
-        if 'B' in phases:
-            dss.run_command("disable fault.sag_B")
-        if 'C' in phases:
-            dss.run_command("disable fault.sag_C")
-
-        dss.run_command("solve")
-
         return anomaly_data
 
     def inject_harmonic_distortion(self, bus: str, harmonics: Dict[int, float]):
         """Inject harmonic distortion at a bus"""
         logger.info(f"Injecting harmonic distortion at {bus}")
 
-        # Create harmonic current source
+        # Harmonic current sources, solved in harmonics mode (mode is restored afterwards)
+        edits = CircuitEditSet(options={'mode': 'harmonics'})
         for h_order, h_magnitude in harmonics.items():
-            dss.run_command(f"""
-                new isource.harm_{h_order} bus1={bus}
-                ~ amps={h_magnitude}
-                ~ angle=0
-                ~ frequency={50 * h_order}
-            """)
-
-        # Enable harmonics mode and solve
-        dss.run_command("set mode=harmonics")
-        dss.run_command("solve")
-
-        # Capture harmonic data
-        anomaly_data = self._capture_harmonic_state()
+            edits.objects[f"Isource.harm_{h_order}"] = (
+                f"bus1={bus} amps={h_magnitude} angle=0 frequency={50 * h_order}"
+            )
+
+        anomaly_data = self._solve_with(edits, lambda: self._capture_harmonic_state(sorted(harmonics)))
         anomaly_data['anomaly_type'] = 'harmonic_distortion'
         anomaly_data['location'] = bus
-        anomaly_data['harmonics'] = harmonics
-
-        # Clean up harmonic sources
-        for h_order in harmonics.keys():
-            dss.run_command(f"disable isource.harm_{h_order}")
-
-        # Reset to normal mode
-        dss.run_command("set mode=snapshot")
-        dss.run_command("solve")
+        anomaly_data['harmonics']['injected'] = harmonics
 
         return anomaly_data
 
@@ -310,42 +286,29 @@ class OpenDSSAnomalySimulator:
         """Simulate transformer overload condition"""
         logger.info(f"Injecting transformer overload: {transformer} at {overload_factor}x")
 
-        # Get transformer rated power
-        dss.Circuit.set_active_element(f"transformer.{transformer}")
-        kva_rating = dss.Transformers.kva()
+        # Get transformer rated power and secondary bus
+        self.session.ensure_compiled()
+        dss.Circuit.SetActiveElement(f"transformer.{transformer}")
+        kva_rating = dss.Transformers.kVA()
+        bus2 = dss.CktElement.BusNames()[1]
 
         # Add additional load to cause overload
         overload_kw = kva_rating * overload_factor * 0.9  # Assuming 0.9 power factor
         overload_kvar = kva_rating * overload_factor * 0.436  # For 0.9 power factor
 
-        # Get transformer secondary bus
-        dss.Circuit.set_active_element(f"transformer.{transformer}")
-        bus2 = dss.CktElement.bus_names[1]
-
-        # Add temporary overload
-        dss.run_command(f"""
-            new load.overload_{transformer} bus1={bus2}
-            ~ phases=3 kv=220
-            ~ kw={overload_kw} kvar={overload_kvar}
-            ~ model=1
-        """)
-
-        dss.run_command("solve")
+        # Temporary overload load
+        edits = CircuitEditSet(objects={
+            f"Load.overload_{transformer}": (
+                f"bus1={bus2} phases=3 kv=220 kw={overload_kw} kvar={overload_kvar} model=1"
+            )
+        })
 
         # Capture overload condition
-        anomaly_data = self._capture_system_state()
+        anomaly_data = self._solve_with(edits)
         anomaly_data['anomaly_type'] = 'transformer_overload'
         anomaly_data['location'] = transformer
         anomaly_data['overload_factor'] = overload_factor
 
-        # Calculate transformer loading
-        dss.Circuit.set_active_element(f"transformer.{transformer}")
-        currents = dss.CktElement.currents_mag_ang
-
-        # Remove temporary load
-        dss.run_command(f"disable load.overload_{transformer}")
-        dss.run_command("solve")
-
         return anomaly_data
 
     def inject_capacitor_switching(self, capacitor: str):
@@ -353,15 +316,13 @@ class OpenDSSAnomalySimulator:
         logger.info(f"Simulating capacitor switching: {capacitor}")
 
         # Disable capacitor (opening)
-        dss.run_command(f"disable capacitor.{capacitor}")
-        dss.run_command("solve")
-
-        opening_data = self._capture_system_state()
+        opening_data = self._solve_with(CircuitEditSet(
+            properties={(f"Capacitor.{capacitor}", 'enabled'): 'no'}
+        ))
         opening_data['event'] = 'capacitor_open'
 
-        # Re-enable capacitor (closing) - this creates switching transient
-        dss.run_command(f"enable capacitor.{capacitor}")
-        dss.run_command("solve")
+        # Re-enabled on restore (closing) - this creates switching transient
+        self.session.solve()
 
         closing_data = self._capture_system_state()
         closing_data['event'] = 'capacitor_close'
@@ -375,6 +336,11 @@ class OpenDSSAnomalySimulator:
 
         return anomaly_data
 
+    def _fault_current(self, fault: str) -> float:
+        """Highest conductor current magnitude of a fault element"""
+        dss.Circuit.SetActiveElement(fault)
+        return max(dss.CktElement.CurrentsMagAng()[::2])  # Get magnitudes
+
     def inject_ground_fault(self, bus: str, fault_resistance: float = 0.01, phase: str = 'A'):
         """Inject single line to ground fault"""
         logger.info(f"Injecting ground fault at {bus} phase {phase}")
@@ -382,30 +348,23 @@ class OpenDSSAnomalySimulator:
         phase_num = {'A': 1, 'B': 2, 'C': 3}[phase]
 
         # Create ground fault
-        dss.run_command(f"""
-            new fault.gnd_fault bus1={bus}.{phase_num} bus2={bus}.0
-            ~ r={fault_resistance}
-            ~ ontime=0.0
-            ~ temporary=yes
-        """)
+        edits = CircuitEditSet(objects={
+            "Fault.gnd_fault": f"bus1={bus}.{phase_num} bus2={bus}.0 r={fault_resistance} ontime=0.0 temporary=yes"
+        })
+
+        # Capture fault data and fault current before the fault is cleared
+        fault_current = {}
 
-        dss.run_command("solve")
+        def capture():
+            fault_current['a'] = self._fault_current("Fault.gnd_fault")
+            return self._capture_system_state()
 
-        # Capture fault data
-        anomaly_data = self._capture_system_state()
+        anomaly_data = self._solve_with(edits, capture)
         anomaly_data['anomaly_type'] = 'ground_fault'
         anomaly_data['location'] = bus
         anomaly_data['phase'] = phase
         anomaly_data['fault_resistance'] = fault_resistance
-
-        # Calculate fault current
-        dss.Circuit.set_active_element(f"fault.gnd_fault")
-        fault_current = max(dss.CktElement.currents_mag_ang[::2])  # Get magnitudes
-        anomaly_data['fault_current_a'] = fault_current
-
-        # Clear fault
-        dss.run_command("disable fault.gnd_fault")
-        dss.run_command("solve")
+        anomaly_data['fault_current_a'] = fault_current['a']
 
         return anomaly_data
 
@@ -413,23 +372,16 @@ class OpenDSSAnomalySimulator:
         """Simulate frequency deviation"""
         logger.info(f"Injecting frequency deviation: {deviation_hz} Hz")
 
-        # Change system frequency
+        # Change system frequency (original frequency is restored afterwards)
         original_freq = 50.0
         new_freq = original_freq + deviation_hz
 
-        dss.run_command(f"set frequency={new_freq}")
-        dss.run_command("solve")
-
         # Capture system response
-        anomaly_data = self._capture_system_state()
+        anomaly_data = self._solve_with(CircuitEditSet(options={'frequency': new_freq}))
         anomaly_data['anomaly_type'] = 'frequency_deviation'
         anomaly_data['frequency_hz'] = new_freq
         anomaly_data['deviation_hz'] = deviation_hz
 
-        # Restore original frequency
-        dss.run_command(f"set frequency={original_freq}")
-        dss.run_command("solve")
-
         return anomaly_data
 
     def inject_ct_saturation(self, ct_location: str, saturation_level: float = 0.8):
@@ -437,17 +389,12 @@ class OpenDSSAnomalySimulator:
         logger.info(f"Simulating CT saturation at {ct_location}")
 
         # Create a high current fault to cause CT saturation
-        dss.run_command(f"""
-            new fault.ct_sat_fault bus1={ct_location}.1.2.3
-            ~ bus2={ct_location}.0
-            ~ r=0.001
-        """)
-
-        dss.run_command("solve")
+        edits = CircuitEditSet(objects={
+            "Fault.ct_sat_fault": f"bus1={ct_location}.1.2.3 bus2={ct_location}.0 r=0.001"
+        })
 
         # Get fault current
-        dss.Circuit.set_active_element(f"fault.ct_sat_fault")
-        actual_current = max(dss.CktElement.currents_mag_ang[::2])
+        actual_current = self._solve_with(edits, lambda: self._fault_current("Fault.ct_sat_fault"))
 
         # Simulate saturated CT output (clipped waveform)
         saturated_current = min(actual_current, actual_current * saturation_level)
@@ -461,14 +408,14 @@ class OpenDSSAnomalySimulator:
             'error_percent': ((actual_current - saturated_current) / actual_current * 100) if actual_current > 0 else 0
         }
 
-        # Clear fault
-        dss.run_command("disable fault.ct_sat_fault")
-        dss.run_command("solve")
-
         return anomaly_data
 
-    def _capture_system_state(self) -> Dict[str, Any]:
-        """Capture current system state"""
+    def _capture_system_state(self, harmonic_volts: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Capture current system state, including its ML feature vector
+
+        harmonic_volts are the node voltages per harmonic order (see
+        _capture_harmonic_state); with them the state also gets per-bus THD.
+        """
         state = {
             'timestamp': datetime.now().isoformat(),
             'buses': {},
@@ -477,19 +424,14 @@ class OpenDSSAnomalySimulator:
             'summary': {}
         }
 
-        # Capture bus voltages
-        bus_names = dss.Circuit.AllBusNames()
-        for bus_name in bus_names:
-            dss.Circuit.SetActiveBus(bus_name)
-            voltages = dss.Bus.puVmagAngle()
-
-            # Extract magnitude and angle from puVmagAngle
-            voltage_mags = [voltages[i] for i in range(0, len(voltages), 2)]
-            voltage_angles = [voltages[i] for i in range(1, len(voltages), 2)]
-
+        # Capture bus voltages (bulk read of all nodes)
+        results = self.extractor.extract(include_pc=False)
+        voltage_mags = results.per_bus(results.node_v_pu)
+        voltage_angles = results.per_bus(results.node_v_angle)
+        for bus_name in results.topology.bus_names:
             state['buses'][bus_name] = {
-                'voltage_pu_mag': voltage_mags,
-                'voltage_angle': voltage_angles,
+                'voltage_pu_mag': voltage_mags[bus_name].tolist(),
+                'voltage_angle': voltage_angles[bus_name].tolist(),
             }
 
         # Element data capture simplified for now
@@ -505,160 +447,118 @@ class OpenDSSAnomalySimulator:
             'losses_kvar': losses[1] / 1000
         }
 
-        return state
-
-    def _capture_harmonic_state(self) -> Dict[str, Any]:
-        """Capture harmonic analysis results"""
-        state = self._capture_system_state()
-
-        # Add harmonic specific data
-        harmonic_data = {
-            'harmonic_voltages': {},
-            'harmonic_currents': {},
-            'thd_voltage': {},
-            'thd_current': {}
-        }
-
-        # Get voltage harmonics for each bus
-        bus_names = dss.Circuit.AllBusNames()
-        for bus_name in bus_names:
-            dss.Circuit.SetActiveBus(bus_name)
-
-            # Get harmonic voltages (simplified - would need harmonic solution)
-            v_harmonics = dss.Bus.puVmagAngle()
-
-            # Calculate THD (simplified) - using pu voltages
-            fundamental = v_harmonics[0] if len(v_harmonics) > 0 else 0
-
-            # Simplified THD calculation (would need actual harmonic solution in production)
-            thd = 0.0  # Placeholder
+        if harmonic_volts is not None:
+            thd = self.feature_extractor.voltage_thd(results, harmonic_volts)
+            state['harmonics'] = {
+                'thd_voltage': {bus: float(values.max()) if len(values) else 0.0
+                                for bus, values in results.per_bus(thd).items()}
+            }
 
-            harmonic_data['thd_voltage'][bus_name] = thd
+        # Fixed-width float32 vector in FEATURE_NAMES order
+        state['features'] = self.feature_extractor.extract(results, state['summary'], harmonic_volts)
+        return state
 
-        state['harmonics'] = harmonic_data
+    def _capture_harmonic_state(self, orders: List[int]) -> Dict[str, Any]:
+        """Capture the fundamental state plus voltage THD over the given harmonic orders
+
+        Each order is solved on its own and read back in bulk; the fundamental is
+        solved last so the captured state is the 50 Hz one. The harmonics option
+        is reverted with the rest of the edits.
+        """
+        current = self.session.snapshot()
+        harmonic_volts = []
+        for order in list(orders) + [1]:
+            self.session.apply(current.copy().merge(CircuitEditSet(options={'harmonics': f'[{order}]'})))
+            self.session.solve()
+            if order != 1:
+                harmonic_volts.append(np.asarray(dss.Circuit.AllBusVolts(), dtype=float).view(complex))
+
+        state = self._capture_system_state(np.array(harmonic_volts).reshape(len(orders), -1))
+        state['harmonics']['orders'] = list(orders)
         return state
 
     def generate_anomaly_dataset(self, num_samples: int = 1000) -> pd.DataFrame:
-        """Generate dataset with various anomalies for AI/ML training"""
+        """Generate dataset with various anomalies for AI/ML training
+
+        Builds the whole dataset in memory on this process; for large sets use
+        anomaly_dataset.AnomalyDatasetGenerator, which shards across processes
+        and streams rows to disk.
+        """
         logger.info(f"Generating anomaly dataset with {num_samples} samples")
 
         dataset = []
-        anomaly_types = list(AnomalyType)
-
         for i in range(num_samples):
-            # Randomly select anomaly type
-            if random.random() < 0.7:  # 70% normal operation
-                # Normal operation
-                dss.run_command("solve")
-                state = self._capture_system_state()
-                state['label'] = 0  # Normal
-                state['anomaly_type'] = 'normal'
-            else:
-                # Inject random anomaly
-                anomaly_type = random.choice(anomaly_types)
-
-                try:
-                    if anomaly_type == AnomalyType.VOLTAGE_SAG:
-                        bus = random.choice(['Bus220_1', 'Bus220_2', 'Bus400_1'])
-                        magnitude = random.uniform(0.5, 0.9)
-                        state = self.inject_voltage_sag(bus, magnitude)
-
-                    elif anomaly_type == AnomalyType.HARMONIC_DISTORTION:
-                        bus = random.choice(['Bus220_1', 'Bus220_2'])
-                        harmonics = {
-                            3: random.uniform(0.01, 0.05),
-                            5: random.uniform(0.02, 0.08),
-                            7: random.uniform(0.01, 0.04)
-                        }
-                        state = self.inject_harmonic_distortion(bus, harmonics)
-
-                    elif anomaly_type == AnomalyType.TRANSFORMER_OVERLOAD:
-                        transformer = random.choice(['TR1', 'TR2'])
-                        overload = random.uniform(1.1, 1.5)
-                        state = self.inject_transformer_overload(transformer, overload)
-
-                    elif anomaly_type == AnomalyType.GROUND_FAULT:
-                        bus = random.choice(['Bus220_1', 'Bus220_2', 'Bus400_1'])
-                        phase = random.choice(['A', 'B', 'C'])
-                        state = self.inject_ground_fault(bus, phase=phase)
-
-                    else:
-                        # Default to voltage sag for unimplemented types
-                        state = self.inject_voltage_sag('Bus220_1', 0.8)
-
-                    state['label'] = 1  # Anomaly
-
-                except Exception as e:
-                    logger.error(f"Error injecting {anomaly_type}: {e}")
-                    continue
-
-            # Extract features for ML
-            features = self._extract_features(state)
-            dataset.append(features)
+            features = self.generate_sample()
+            if features is not None:
+                dataset.append(features)
 
             if (i + 1) % 100 == 0:
                 logger.info(f"Generated {i + 1}/{num_samples} samples")
 
         return pd.DataFrame(dataset)
 
+    def generate_sample(self, rng=None) -> Optional[Dict]:
+        """Features of one random sample (70% normal operation), None if injection failed
+
+        rng is a random.Random for reproducible sampling (module random by default).
+        """
+        rng = rng or random
+        if rng.random() < 0.7:  # 70% normal operation
+            # Normal operation
+            self.session.solve()
+            state = self._capture_system_state()
+            state['label'] = 0  # Normal
+            state['anomaly_type'] = 'normal'
+        else:
+            # Inject random anomaly
+            anomaly_type = rng.choice(list(AnomalyType))
+
+            try:
+                if anomaly_type == AnomalyType.VOLTAGE_SAG:
+                    bus = rng.choice(['Bus220_1', 'Bus220_2', 'Bus400_1'])
+                    magnitude = rng.uniform(0.5, 0.9)
+                    state = self.inject_voltage_sag(bus, magnitude)
+
+                elif anomaly_type == AnomalyType.HARMONIC_DISTORTION:
+                    bus = rng.choice(['Bus220_1', 'Bus220_2'])
+                    harmonics = {
+                        3: rng.uniform(0.01, 0.05),
+                        5: rng.uniform(0.02, 0.08),
+                        7: rng.uniform(0.01, 0.04)
+                    }
+                    state = self.inject_harmonic_distortion(bus, harmonics)
+
+                elif anomaly_type == AnomalyType.TRANSFORMER_OVERLOAD:
+                    transformer = rng.choice(['TR1', 'TR2'])
+                    overload = rng.uniform(1.1, 1.5)
+                    state = self.inject_transformer_overload(transformer, overload)
+
+                elif anomaly_type == AnomalyType.GROUND_FAULT:
+                    bus = rng.choice(['Bus220_1', 'Bus220_2', 'Bus400_1'])
+                    phase = rng.choice(['A', 'B', 'C'])
+                    state = self.inject_ground_fault(bus, phase=phase)
+
+                else:
+                    # Default to voltage sag for unimplemented types
+                    state = self.inject_voltage_sag('Bus220_1', 0.8)
+
+                state['label'] = 1  # Anomaly
+
+            except Exception as e:
+                logger.error(f"Error injecting {anomaly_type}: {e}")
+                return None
+
+        # Extract features for ML
+        return self._extract_features(state)
+
     def _extract_features(self, state: Dict) -> Dict:
-        """Extract relevant features from system state for ML"""
+        """Label columns plus the state's feature vector, keyed by FEATURE_NAMES"""
         features = {
             'timestamp': state.get('timestamp', datetime.now().isoformat()),
             'label': state.get('label', 0),
             'anomaly_type': state.get('anomaly_type', 'normal')
         }
-
-        # Extract voltage features
-        voltage_mags = []
-        voltage_imbalances = []
-
-        for bus_name, bus_data in state.get('buses', {}).items():
-            if 'voltage_mag' in bus_data:
-                v_mag = bus_data['voltage_mag']
-                if len(v_mag) >= 3:
-                    voltage_mags.extend(v_mag[:3])
-                    # Calculate voltage imbalance
-                    v_avg = np.mean(v_mag[:3])
-                    v_imbalance = max(abs(v - v_avg) for v in v_mag[:3]) / v_avg if v_avg > 0 else 0
-                    voltage_imbalances.append(v_imbalance)
-
-        features['voltage_mag_mean'] = np.mean(voltage_mags) if voltage_mags else 0
-        features['voltage_mag_std'] = np.std(voltage_mags) if voltage_mags else 0
-        features['voltage_mag_min'] = min(voltage_mags) if voltage_mags else 0
-        features['voltage_mag_max'] = max(voltage_mags) if voltage_mags else 0
-        features['voltage_imbalance_max'] = max(voltage_imbalances) if voltage_imbalances else 0
-
-        # Extract current features
-        current_mags = []
-        for element_name, element_data in state.get('elements', {}).items():
-            if 'current_mag' in element_data:
-                current_mags.extend(element_data['current_mag'])
-
-        features['current_mag_mean'] = np.mean(current_mags) if current_mags else 0
-        features['current_mag_std'] = np.std(current_mags) if current_mags else 0
-        features['current_mag_max'] = max(current_mags) if current_mags else 0
-
-        # System level features
-        summary = state.get('summary', {})
-        features['total_power_kw'] = summary.get('total_power_kw', 0)
-        features['total_reactive_kvar'] = summary.get('total_reactive_kvar', 0)
-        features['losses_kw'] = summary.get('losses_kw', 0)
-        features['losses_kvar'] = summary.get('losses_kvar', 0)
-
-        # Power factor
-        if features['total_power_kw'] != 0:
-            apparent_power = np.sqrt(features['total_power_kw']**2 + features['total_reactive_kvar']**2)
-            features['power_factor'] = features['total_power_kw'] / apparent_power if apparent_power > 0 else 0
-        else:
-            features['power_factor'] = 0
-
-        # Harmonic features (if available)
-        if 'harmonics' in state:
-            thd_voltages = list(state['harmonics'].get('thd_voltage', {}).values())
-            features['thd_voltage_mean'] = np.mean(thd_voltages) if thd_voltages else 0
-            features['thd_voltage_max'] = max(thd_voltages) if thd_voltages else 0
-
+        features.update(zip(FEATURE_NAMES, state['features'].tolist()))
         return features
 
     def run_anomaly_scenario(self, scenario: str) -> Dict[str, Any]:
@@ -679,74 +579,59 @@ class OpenDSSAnomalySimulator:
             logger.error(f"Unknown scenario: {scenario}")
             return {}
 
+    def _run_stages(self, stages: List[CircuitEditSet]) -> List[Dict[str, Any]]:
+        """Solve each stage's edits on top of the current circuit, then revert to it"""
+        restore_point = self.session.snapshot()
+        states = []
+        try:
+            for edits in stages:
+                self.session.apply(restore_point.copy().merge(edits))
+                self.session.solve()
+                states.append(self._capture_system_state())
+        finally:
+            # Reverts only the touched elements; no recompile
+            self.session.restore(restore_point)
+        return states
+
     def _scenario_voltage_collapse(self) -> Dict[str, Any]:
         """Simulate voltage collapse scenario"""
-        results = {
-            'scenario': 'voltage_collapse',
-            'stages': []
-        }
-
         # Stage 1: Heavy loading
-        dss.run_command("new load.heavy_load bus1=Bus220_1 phases=3 kv=220 kw=200000 kvar=100000")
-        dss.run_command("solve")
-        results['stages'].append(self._capture_system_state())
-
+        heavy_loading = CircuitEditSet(objects={
+            "Load.heavy_load": "bus1=Bus220_1 phases=3 kv=220 kw=200000 kvar=100000"
+        })
         # Stage 2: Loss of reactive support
-        dss.run_command("disable capacitor.Cap220_1")
-        dss.run_command("solve")
-        results['stages'].append(self._capture_system_state())
-
+        reactive_loss = heavy_loading.copy().merge(CircuitEditSet(
+            properties={("Capacitor.Cap220_1", 'enabled'): 'no'}
+        ))
         # Stage 3: Line outage
-        dss.run_command("disable line.Line220_1")
-        dss.run_command("solve")
-        results['stages'].append(self._capture_system_state())
+        line_outage = reactive_loss.copy().merge(CircuitEditSet(
+            properties={("Line.Line220_1", 'enabled'): 'no'}
+        ))
 
-        # Restore
-        dss.run_command("disable load.heavy_load")
-        dss.run_command("enable capacitor.Cap220_1")
-        dss.run_command("enable line.Line220_1")
-        dss.run_command("solve")
-
-        return results
+        return {
+            'scenario': 'voltage_collapse',
+            'stages': self._run_stages([heavy_loading, reactive_loss, line_outage])
+        }
 
     def _scenario_cascading_failure(self) -> Dict[str, Any]:
         """Simulate cascading failure scenario"""
-        results = {
-            'scenario': 'cascading_failure',
-            'cascade_sequence': []
-        }
-
         # Initial fault
-        dss.run_command("new fault.initial bus1=Bus400_1.1.2.3 bus2=Bus400_1.0 r=0.001")
-        dss.run_command("solve")
-        results['cascade_sequence'].append({
-            'event': 'initial_fault',
-            'state': self._capture_system_state()
+        initial_fault = CircuitEditSet(objects={
+            "Fault.initial": "bus1=Bus400_1.1.2.3 bus2=Bus400_1.0 r=0.001"
         })
-
-        # Breaker trips (simulated by disabling line)
-        dss.run_command("disable fault.initial")
-        dss.run_command("disable line.Line400_1")
-        dss.run_command("solve")
-        results['cascade_sequence'].append({
-            'event': 'line_trip',
-            'state': self._capture_system_state()
-        })
-
+        # Breaker trips (fault cleared by disabling line)
+        line_trip = CircuitEditSet(properties={("Line.Line400_1", 'enabled'): 'no'})
         # Overload on remaining path
-        dss.run_command("disable transformer.TR1")
-        dss.run_command("solve")
-        results['cascade_sequence'].append({
-            'event': 'transformer_trip',
-            'state': self._capture_system_state()
-        })
-
-        # Restore
-        dss.run_command("enable line.Line400_1")
-        dss.run_command("enable transformer.TR1")
-        dss.run_command("solve")
+        transformer_trip = line_trip.copy().merge(CircuitEditSet(
+            properties={("Transformer.TR1", 'enabled'): 'no'}
+        ))
 
-        return results
+        states = self._run_stages([initial_fault, line_trip, transformer_trip])
+        events = ['initial_fault', 'line_trip', 'transformer_trip']
+        return {
+            'scenario': 'cascading_failure',
+            'cascade_sequence': [{'event': event, 'state': state} for event, state in zip(events, states)]
+        }
 
     def _scenario_transformer_failure(self) -> Dict[str, Any]:
         """Simulate transformer failure with various fault types"""
@@ -756,13 +641,13 @@ class OpenDSSAnomalySimulator:
         }
 
         # Winding short circuit
-        dss.run_command("new fault.winding bus1=Bus400_1.1 bus2=Bus220_1.1 r=0.1")
-        dss.run_command("solve")
+        winding_state = self._solve_with(CircuitEditSet(objects={
+            "Fault.winding": "bus1=Bus400_1.1 bus2=Bus220_1.1 r=0.1"
+        }))
         results['fault_types'].append({
             'type': 'winding_short',
-            'state': self._capture_system_state()
+            'state': winding_state
         })
-        dss.run_command("disable fault.winding")
 
         # Core saturation (simulated by harmonic injection)
         harmonics = {3: 0.15, 5: 0.10, 7: 0.05}
@@ -775,62 +660,56 @@ class OpenDSSAnomalySimulator:
 
     def _scenario_harmonic_resonance(self) -> Dict[str, Any]:
         """Simulate harmonic resonance condition"""
-        results = {
-            'scenario': 'harmonic_resonance',
-            'frequency_scan': []
-        }
-
-        # Scan different harmonic frequencies
-        for h_order in [3, 5, 7, 9, 11]:
-            dss.run_command(f"set frequency={50 * h_order}")
-            dss.run_command("solve")
-
-            state = self._capture_system_state()
+        # Scan different harmonic frequencies (fundamental restored afterwards)
+        orders = [3, 5, 7, 9, 11]
+        states = self._run_stages([CircuitEditSet(options={'frequency': 50 * h}) for h in orders])
+        for h_order, state in zip(orders, states):
             state['harmonic_order'] = h_order
-            results['frequency_scan'].append(state)
-
-        # Restore fundamental frequency
-        dss.run_command("set frequency=50")
-        dss.run_command("solve")
 
-        return results
+        return {
+            'scenario': 'harmonic_resonance',
+            'frequency_scan': states
+        }
 
     def _scenario_protection_misoperation(self) -> Dict[str, Any]:
         """Simulate protection system misoperation"""
-        results = {
-            'scenario': 'protection_misoperation',
-            'events': []
-        }
-
         # Sympathetic trip (healthy line trips due to fault on adjacent line)
         # Fault on Line220_1
-        dss.run_command("new fault.test bus1=Bus220_1.1.2.3 bus2=Bus220_1.0 r=0.01")
-        dss.run_command("solve")
-
-        fault_state = self._capture_system_state()
-        results['events'].append({
-            'type': 'fault_applied',
-            'state': fault_state
+        fault_applied = CircuitEditSet(objects={
+            "Fault.test": "bus1=Bus220_1.1.2.3 bus2=Bus220_1.0 r=0.01"
+        })
+        # Misoperation: Line220_2 also trips alongside the correct Line220_1 trip
+        misoperation = CircuitEditSet(properties={
+            ("Line.Line220_1", 'enabled'): 'no',
+            ("Line.Line220_2", 'enabled'): 'no'
         })
 
-        # Misoperation: Line220_2 also trips (simulated)
-        dss.run_command("disable fault.test")
-        dss.run_command("disable line.Line220_1")  # Correct trip
-        dss.run_command("disable line.Line220_2")  # Misoperation
-        dss.run_command("solve")
+        fault_state, trip_state = self._run_stages([fault_applied, misoperation])
+        return {
+            'scenario': 'protection_misoperation',
+            'events': [
+                {
+                    'type': 'fault_applied',
+                    'state': fault_state
+                },
+                {
+                    'type': 'protection_misoperation',
+                    'state': trip_state,
+                    'description': 'Healthy line tripped due to sympathetic operation'
+                }
+            ]
+        }
 
-        results['events'].append({
-            'type': 'protection_misoperation',
-            'state': self._capture_system_state(),
-            'description': 'Healthy line tripped due to sympathetic operation'
-        })
+# Per-process simulator for scenarios run in background job workers
+_worker_simulator: Optional[OpenDSSAnomalySimulator] = None
 
-        # Restore
-        dss.run_command("enable line.Line220_1")
-        dss.run_command("enable line.Line220_2")
-        dss.run_command("solve")
 
-        return results
+def run_scenario_in_worker(dss_file: str, scenario: str) -> Dict[str, Any]:
+    """Run an anomaly scenario on this worker's own circuit, compiling it on first use"""
+    global _worker_simulator
+    if _worker_simulator is None or _worker_simulator.dss_file != dss_file:
+        _worker_simulator = OpenDSSAnomalySimulator(dss_file)
+    return _worker_simulator.run_anomaly_scenario(scenario)
 
 def create_anomaly_training_data():
     """Create comprehensive anomaly training dataset"""
@@ -0,0 +1,267 @@
+"""
+Columnar Simulation Result Export
+Streams bus voltages, branch flows, stability trajectories, fault currents and
+contingency cases to Parquet, Arrow IPC or NPZ files
+"""
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+    ARROW_TYPES = {"str": pa.string(), "float64": pa.float64(), "int64": pa.int64(), "bool": pa.bool_()}
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Column name -> dtype of each exported table (long format, one row per element and sample)
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "bus_voltages": {
+        "scenario": "str", "bus": "str",
+        "voltage_pu": "float64", "angle_deg": "float64", "voltage_kv": "float64"
+    },
+    "branch_flows": {
+        "scenario": "str", "branch": "str", "kind": "str",
+        "p_mw": "float64", "q_mvar": "float64", "current_a": "float64", "loading_percent": "float64"
+    },
+    "stability": {
+        "scenario": "str", "quantity": "str", "element": "str",  # rotor_angle_deg | frequency_hz | voltage_pu
+        "time_s": "float64", "value": "float64"
+    },
+    "fault_currents": {
+        "scenario": "str", "bus": "str", "fault_type": "str",
+        "symmetrical_current_ka": "float64", "peak_current_ka": "float64",
+        "breaking_current_ka": "float64", "x_r_ratio": "float64"
+    },
+    "contingencies": {
+        "scenario": "str", "contingency": "str", "kind": "str", "severity": "str",
+        "converged": "bool", "screened_out": "bool",
+        "voltage_violations": "int64", "line_overloads": "int64", "transformer_overloads": "int64",
+        "islanded_buses": "int64", "dc_max_loading_percent": "float64"
+    },
+}
+
+FILE_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "npz": ".npz"}
+
+
+def _load_flow_columns(results: Dict[str, Any]) -> Dict[str, Dict[str, np.ndarray]]:
+    tables = {}
+    buses = results.get("buses")
+    if buses:
+        ids = list(buses)
+        tables["bus_voltages"] = {
+            "bus": np.array(ids, dtype=object),
+            **{name: np.array([buses[i].get(name, np.nan) for i in ids], dtype=float)
+               for name in ("voltage_pu", "angle_deg", "voltage_kv")}
+        }
+
+    branches = results.get("branches")
+    if branches:
+        ids = list(branches)
+        tables["branch_flows"] = {
+            "branch": np.array(ids, dtype=object),
+            "kind": np.array([branches[i]["kind"] for i in ids], dtype=object),
+            **{name: np.array([branches[i][name] for i in ids], dtype=float)
+               for name in ("p_mw", "q_mvar", "current_a", "loading_percent")}
+        }
+    return tables
+
+
+def _stability_columns(results: Dict[str, Any]) -> Dict[str, Dict[str, np.ndarray]]:
+    time_s = np.asarray(results["time"], dtype=float)
+    quantity, element, series = [], [], []
+    for name, traces in (("rotor_angle_deg", results["rotor_angles"]),
+                         ("frequency_hz", results.get("frequencies", {})),
+                         ("voltage_pu", results.get("voltages", {}))):
+        for element_id, trace in traces.items():
+            quantity.append(name)
+            element.append(element_id)
+            series.append(np.asarray(trace, dtype=float))
+    n_samples = len(time_s)
+    return {"stability": {
+        "quantity": np.repeat(np.array(quantity, dtype=object), n_samples),
+        "element": np.repeat(np.array(element, dtype=object), n_samples),
+        "time_s": np.tile(time_s, len(series)),
+        "value": np.concatenate(series) if series else np.zeros(0)
+    }}
+
+
+def _fault_columns(results: Dict[str, Any]) -> Dict[str, Dict[str, np.ndarray]]:
+    """One row per bus and fault type, from a single fault or a sweep_all_faults result"""
+    if "buses" in results:
+        rows = [(bus_id, fault_type, fault, entry.get("x_r_ratio"))
+                for bus_id, entry in results["buses"].items()
+                for fault_type, fault in entry["faults"].items()]
+    else:
+        rows = [(results["bus"], results["fault_type"], results, results.get("x_r_ratio"))]
+    return {"fault_currents": {
+        "bus": np.array([row[0] for row in rows], dtype=object),
+        "fault_type": np.array([row[1] for row in rows], dtype=object),
+        **{name: np.array([row[2][name] for row in rows], dtype=float)
+           for name in ("symmetrical_current_ka", "peak_current_ka", "breaking_current_ka")},
+        "x_r_ratio": np.array([row[3] for row in rows], dtype=float)
+    }}
+
+
+def _contingency_columns(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, np.ndarray]]:
+    """One row per contingency case, with violation counts rather than the violation lists"""
+    def count(case, kind):
+        return len(case["violations"].get(kind, ()))
+
+    return {"contingencies": {
+        "contingency": np.array([case["contingency"] for case in results], dtype=object),
+        "kind": np.array([case["type"] for case in results], dtype=object),
+        "severity": np.array([case["severity"] for case in results], dtype=object),
+        "converged": np.array([case["converged"] for case in results], dtype=bool),
+        "screened_out": np.array([case.get("screened_out", False) for case in results], dtype=bool),
+        "voltage_violations": np.array([count(case, "voltage") for case in results], dtype=np.int64),
+        "line_overloads": np.array([count(case, "line_overload") for case in results], dtype=np.int64),
+        "transformer_overloads": np.array([count(case, "transformer_overload") for case in results],
+                                          dtype=np.int64),
+        "islanded_buses": np.array([count(case, "islanded") for case in results], dtype=np.int64),
+        "dc_max_loading_percent": np.array([case.get("dc_max_loading_percent", np.nan)
+                                            for case in results], dtype=float)
+    }}
+
+
+# Simulation type (SimulationType value) -> table columns of its result
+RESULT_COLUMNS: Dict[str, Callable[[Any], Dict[str, Dict[str, np.ndarray]]]] = {
+    "load_flow": _load_flow_columns,
+    "short_circuit": _fault_columns,
+    "transient_stability": _stability_columns,
+    "contingency_analysis": _contingency_columns,
+}
+
+
+def _columns_from_result(scenario: str, sim_type: str, results: Any) -> Dict[str, Dict[str, np.ndarray]]:
+    """Table columns of one simulation result, routed by its simulation type
+
+    Failed runs and types without a table (not implemented in the engine)
+    export nothing.
+    """
+    extract = RESULT_COLUMNS.get(sim_type)
+    if extract is None or not results or (isinstance(results, dict) and "error" in results):
+        return {}
+    tables = {name: columns for name, columns in extract(results).items()
+              if len(next(iter(columns.values())))}
+    for columns in tables.values():
+        n_rows = len(next(iter(columns.values())))
+        columns["scenario"] = np.full(n_rows, scenario, dtype=object)
+    return tables
+
+
+class ColumnarResultWriter:
+    """Append-only writer of simulation results as columnar tables
+
+    Rows are buffered as numpy column chunks and flushed every
+    flush_rows rows: as Parquet row groups or Arrow IPC record batches
+    (one file per table), or, without pyarrow, as numbered NPZ part files.
+    Memory use therefore stays bounded however many scenarios are written.
+    """
+
+    def __init__(self, directory: Union[str, Path], format: str = "parquet", flush_rows: int = 65536):
+        if format not in FILE_SUFFIXES:
+            raise ValueError(f"Unknown export format: {format}")
+        if format != "npz" and not PYARROW_AVAILABLE:
+            logger.warning(f"pyarrow not available, exporting NPZ instead of {format}")
+            format = "npz"
+        self.directory = Path(directory)
+        self.format = format
+        self.flush_rows = flush_rows
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._chunks: Dict[str, List[Dict[str, np.ndarray]]] = {name: [] for name in TABLE_SCHEMAS}
+        self._buffered_rows = {name: 0 for name in TABLE_SCHEMAS}
+        self._writers: Dict[str, Any] = {}
+        self._sinks: Dict[str, Any] = {}
+        self._parts = {name: 0 for name in TABLE_SCHEMAS}
+        self.rows_written = {name: 0 for name in TABLE_SCHEMAS}
+
+    def __enter__(self) -> 'ColumnarResultWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, outcome: Any, scenario: Optional[str] = None, sim_type: Optional[str] = None):
+        """Add one result: a run_batch outcome, or plain results with their simulation type
+
+        sim_type is a SimulationType value and defaults to the scenario name,
+        as export_results stores results under their type.
+        """
+        if isinstance(outcome, dict) and "results" in outcome and "scenario" in outcome:
+            scenario, sim_type, outcome = outcome["scenario"], outcome["type"], outcome["results"]
+        for name, columns in _columns_from_result(scenario or "", sim_type or scenario or "",
+                                                  outcome).items():
+            self._chunks[name].append(columns)
+            self._buffered_rows[name] += len(columns["scenario"])
+            if self._buffered_rows[name] >= self.flush_rows:
+                self._flush(name)
+
+    def _flush(self, name: str):
+        chunks = self._chunks[name]
+        if not chunks:
+            return
+        schema = TABLE_SCHEMAS[name]
+        columns = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in schema}
+        n_rows = len(columns["scenario"])
+        self._chunks[name] = []
+        self._buffered_rows[name] = 0
+
+        if self.format == "npz":
+            path = self.directory / f"{name}-{self._parts[name]:05d}.npz"
+            np.savez(path, **{column: values.astype(str) if schema[column] == "str" else values
+                              for column, values in columns.items()})
+            self._parts[name] += 1
+        else:
+            batch = pa.record_batch(
+                [pa.array(columns[column], type=ARROW_TYPES[dtype]) for column, dtype in schema.items()],
+                names=list(schema))
+            writer = self._writers.get(name)
+            if writer is None:
+                path = self.directory / f"{name}{FILE_SUFFIXES[self.format]}"
+                if self.format == "parquet":
+                    writer = pq.ParquetWriter(str(path), batch.schema)
+                else:
+                    self._sinks[name] = pa.OSFile(str(path), "wb")
+                    writer = pa.ipc.new_file(self._sinks[name], batch.schema)
+                self._writers[name] = writer
+            writer.write_batch(batch)
+        self.rows_written[name] += n_rows
+
+    def close(self):
+        """Flush buffered rows and finalize the files"""
+        for name in TABLE_SCHEMAS:
+            self._flush(name)
+        for writer in self._writers.values():
+            writer.close()
+        for sink in self._sinks.values():
+            sink.close()
+        self._writers.clear()
+        self._sinks.clear()
+
+
+def load_table(directory: Union[str, Path], table: str) -> pd.DataFrame:
+    """Read an exported table back as a DataFrame, whichever format it was written in"""
+    directory = Path(directory)
+    columns = list(TABLE_SCHEMAS[table])
+    if (directory / f"{table}.parquet").exists():
+        return pq.read_table(directory / f"{table}.parquet").to_pandas()
+    if (directory / f"{table}.arrow").exists():
+        with pa.memory_map(str(directory / f"{table}.arrow")) as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    parts = sorted(directory.glob(f"{table}-*.npz"))
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    frames = []
+    for part in parts:
+        with np.load(part, allow_pickle=False) as data:
+            frames.append(pd.DataFrame({column: data[column] for column in columns}))
+    return pd.concat(frames, ignore_index=True)
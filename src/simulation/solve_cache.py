@@ -0,0 +1,83 @@
+"""
+Shared Solve-Result Cache
+Reuses a recent load flow result for every consumer asking about the same circuit operating point
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SolveKey = Tuple[Optional[str], Optional[float], str]
+
+
+class SolveResultCache:
+    """Freshness-window cache of solve results
+
+    Keyed on (DSS version hash, load multiplier, active anomaly states); any
+    change to one of these is a different operating point and misses the cache.
+    """
+
+    def __init__(self, freshness_seconds: float = 1.0, max_entries: int = 32):
+        self.freshness_seconds = freshness_seconds
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[SolveKey, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    @staticmethod
+    def make_key(version_hash: Optional[str], load_multiplier: Optional[float],
+                 anomalies: Optional[List[Dict[str, Any]]]) -> SolveKey:
+        """Build the cache key for a circuit operating point"""
+        if load_multiplier is not None:
+            load_multiplier = round(float(load_multiplier), 6)
+        return version_hash, load_multiplier, json.dumps(anomalies, sort_keys=True, default=str)
+
+    def get(self, key: SolveKey) -> Optional[Any]:
+        """Return the cached result if still fresh, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.freshness_seconds:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self.stats['evictions'] += 1
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key: SolveKey, value: Any):
+        """Store a fresh result for the operating point"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            self.stats['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self):
+        """Drop all cached results (e.g. after a circuit change)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'freshness_seconds': self.freshness_seconds
+            }
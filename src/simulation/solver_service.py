@@ -0,0 +1,204 @@
+"""
+Out-of-process OpenDSS Solver Service
+Runs load flow solves in dedicated worker processes behind an async client with request coalescing
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from .load_flow import LoadFlowAnalysis
+from .anomaly_scheduler import AnomalyTimeline, run_timeline
+
+logger = logging.getLogger(__name__)
+
+# Per-process load flow engine (one OpenDSS engine per worker process)
+_worker_load_flow: Optional[LoadFlowAnalysis] = None
+
+
+@dataclass
+class SolveResult:
+    """Load flow summary plus the per-element data needed to update assets"""
+    flow: Dict[str, Any]
+    elements: Dict[str, Any] = field(default_factory=dict)
+    solved_at: float = field(default_factory=time.time)
+
+
+def _worker_circuit(dss_file: str, version_hash: Optional[str]) -> LoadFlowAnalysis:
+    """Load flow engine of the current worker, compiling only on a version change"""
+    global _worker_load_flow
+    if _worker_load_flow is None:
+        _worker_load_flow = LoadFlowAnalysis()
+
+    load_flow = _worker_load_flow
+    session = load_flow.session
+    if (session is None or getattr(load_flow, '_dss_file', None) != dss_file or
+            version_hash is None or session.version_hash != version_hash):
+        if not load_flow.load_circuit(dss_file):
+            raise RuntimeError(f"Solver worker could not load circuit {dss_file}")
+    return load_flow
+
+
+def _solve_in_worker(dss_file: str, version_hash: Optional[str],
+                     anomalies: Optional[List[Dict[str, Any]]]) -> SolveResult:
+    """Solve the circuit in the current worker"""
+    load_flow = _worker_circuit(dss_file, version_hash)
+    flow = load_flow.solve(anomalies or [])
+    return SolveResult(flow=flow, elements=load_flow.get_element_results())
+
+
+def qsts_in_worker(dss_file: str, version_hash: Optional[str], options: Dict[str, Any],
+                    on_chunk: Optional[Callable[[List[Dict[str, Any]]], None]]) -> Dict[str, Any]:
+    """Run a QSTS simulation in the current worker; returns its summary"""
+    load_flow = _worker_circuit(dss_file, version_hash)
+    return load_flow.run_qsts(on_chunk=on_chunk, **options)['summary']
+
+
+def fault_in_worker(dss_file: str, version_hash: Optional[str], bus: Optional[str],
+                     breaker_rating_ka: float) -> Dict[str, Any]:
+    """Fault levels and breaker adequacy at a bus, from the current worker's fault study"""
+    load_flow = _worker_circuit(dss_file, version_hash)
+    return load_flow.analyze_fault_current(bus=bus, breaker_rating_ka=breaker_rating_ka)
+
+
+def fault_levels_in_worker(dss_file: str, version_hash: Optional[str],
+                            bus: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Fault levels of one bus or of every bus, from the current worker's fault study"""
+    load_flow = _worker_circuit(dss_file, version_hash)
+    return load_flow.get_fault_levels(bus)
+
+
+def timeline_in_worker(dss_file: str, timeline: Dict[str, Any], step: float,
+                        speed: Optional[float], start_time: Optional[str]) -> List[Dict[str, Any]]:
+    """Play an anomaly timeline against the current worker's circuit"""
+    load_flow = _worker_circuit(dss_file, None)
+    return run_timeline(load_flow, AnomalyTimeline.from_dict(timeline), step=step, speed=speed,
+                        start_time=datetime.fromisoformat(start_time) if start_time else None)
+
+
+def _request_key(dss_file: str, version_hash: Optional[str],
+                 anomalies: Optional[List[Dict[str, Any]]]) -> Tuple[str, Optional[str], str]:
+    """Identity of a circuit state; identical keys can share one solve"""
+    return dss_file, version_hash, json.dumps(anomalies, sort_keys=True, default=str)
+
+
+class SolverService:
+    """Async client for a pool of OpenDSS solver worker processes
+
+    opendssdirect holds one process-global circuit and blocks while solving, so
+    solves run in worker processes instead of on the event loop. Requests for a
+    circuit state that is already being solved await the in-flight solve rather
+    than queueing another one.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self._executor = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.stats = {
+            'requests': 0,
+            'solves': 0,
+            'coalesced': 0,
+            'errors': 0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        """Start the worker pool"""
+        if self._executor is not None:
+            return
+        # spawn: workers must not inherit the parent's OpenDSS engine state
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        logger.info(f"OpenDSS solver service started with {self.workers} worker process(es)")
+
+    def shutdown(self):
+        """Stop the worker pool, cancelling queued solves"""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._inflight.clear()
+        logger.info("OpenDSS solver service stopped")
+
+    async def solve(self, dss_file: str, version_hash: Optional[str] = None,
+                    anomalies: Optional[List[Dict[str, Any]]] = None) -> SolveResult:
+        """Solve the circuit with the given anomaly states, sharing any identical solve in flight"""
+        if self._executor is None:
+            self.start()
+
+        self.stats['requests'] += 1
+        key = _request_key(dss_file, version_hash, anomalies)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, _solve_in_worker,
+                                          dss_file, version_hash, anomalies)
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._on_solve_done(key, f))
+
+        # Shield so a cancelled caller does not cancel the solve for the others
+        return await asyncio.shield(future)
+
+    async def run_qsts(self, dss_file: str, version_hash: Optional[str] = None,
+                       on_chunk: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                       **options) -> Dict[str, Any]:
+        """Run a QSTS simulation in a worker; on_chunk must be picklable"""
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, qsts_in_worker,
+                                          dss_file, version_hash, options, on_chunk)
+
+    async def analyze_fault(self, dss_file: str, version_hash: Optional[str] = None,
+                            bus: Optional[str] = None, breaker_rating_ka: float = 40.0) -> Dict[str, Any]:
+        """Fault current analysis at a bus, run in a worker"""
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fault_in_worker,
+                                          dss_file, version_hash, bus, breaker_rating_ka)
+
+    async def fault_levels(self, dss_file: str, version_hash: Optional[str] = None,
+                           bus: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Fault levels of one bus (None if unknown) or of every bus, run in a worker"""
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fault_levels_in_worker,
+                                          dss_file, version_hash, bus)
+
+    def _on_solve_done(self, key: Tuple, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            self.stats['errors'] += 1
+            if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                # A worker died (e.g. engine crash); start a fresh pool on the next request
+                logger.error("OpenDSS solver worker terminated abruptly, restarting pool")
+                self.shutdown()
+        else:
+            self.stats['solves'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Service statistics"""
+        return {
+            **self.stats,
+            'workers': self.workers,
+            'running': self.is_running,
+            'in_flight': len(self._inflight)
+        }
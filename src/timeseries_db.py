@@ -142,6 +142,27 @@ class TimeSeriesDB:
 
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_power_timestamp ON power_flow_history(timestamp)")
 
+            # Quasi-static time-series simulation results (simulated time, kept apart from live history)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS qsts_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    step INTEGER NOT NULL,
+                    timestamp DATETIME NOT NULL,
+                    load_multiplier REAL,
+                    converged BOOLEAN,
+                    total_power_kw REAL,
+                    total_power_kvar REAL,
+                    total_losses_mw REAL,
+                    min_voltage_pu REAL,
+                    max_voltage_pu REAL,
+                    voltage_400kv REAL,
+                    voltage_220kv REAL
+                )
+            """)
+
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_qsts_run ON qsts_results(run_id, step)")
+
             conn.commit()
             logger.info("Time-series database initialized")
 
@@ -205,6 +226,37 @@ class TimeSeriesDB:
             ))
             conn.commit()
 
+    def insert_qsts_results(self, run_id: str, rows: List[Dict[str, Any]]):
+        """Insert a chunk of QSTS step results in one transaction"""
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO qsts_results
+                (run_id, step, timestamp, load_multiplier, converged, total_power_kw,
+                 total_power_kvar, total_losses_mw, min_voltage_pu, max_voltage_pu,
+                 voltage_400kv, voltage_220kv)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (run_id, row['step'], row['timestamp'], row.get('load_multiplier'),
+                 row.get('converged'), row.get('total_power_kw'), row.get('total_power_kvar'),
+                 row.get('total_losses_mw'), row.get('min_voltage_pu'), row.get('max_voltage_pu'),
+                 row.get('voltage_400kv'), row.get('voltage_220kv'))
+                for row in rows
+            ])
+            conn.commit()
+
+    def get_qsts_results(self, run_id: str, offset: int = 0, limit: int = 1000) -> List[Dict]:
+        """Get QSTS step results of one run"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM qsts_results
+                WHERE run_id = ? AND step >= ?
+                ORDER BY step
+                LIMIT ?
+            """, (run_id, offset, limit))
+
+            return [dict(row) for row in cursor.fetchall()]
+
     def insert_asset_health(self, asset_id: str, health_data: Dict[str, Any],
                            timestamp: Optional[datetime] = None):
         """Insert asset health record"""
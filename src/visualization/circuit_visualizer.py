@@ -57,6 +57,13 @@ import numpy as np
 from matplotlib.patches import FancyBboxPatch, Circle, Rectangle
 import seaborn as sns
 
+sys.path.append(str(Path(__file__).parent.parent))
+try:
+    # Same package root as the importer (src.visualization -> src.simulation)
+    from ..simulation.dss_extract import DSSResultExtractor
+except ImportError:
+    from simulation.dss_extract import DSSResultExtractor
+
 # Set style for better plots
 try:
     plt.style.use('seaborn-v0_8')
@@ -136,48 +143,32 @@ class OpenDSSVisualizer:
     def _extract_circuit_data(self):
         """Extract circuit data from OpenDSS"""
         try:
+            # Read the whole solved circuit in bulk (fresh topology for the compiled file)
+            extractor = DSSResultExtractor(dss)
+            results = extractor.extract()
+            topology = results.topology
+
             # Get all elements
-            self.circuit_data['buses'] = dss.Circuit.AllBusNames()
-            self.circuit_data['elements'] = dss.Circuit.AllElementNames()
+            self.circuit_data['buses'] = topology.bus_names
+            self.circuit_data['elements'] = topology.element_names
             
             print(f"Found {len(self.circuit_data['buses'])} buses and {len(self.circuit_data['elements'])} elements")
             
-            # Get bus voltages
-            self.circuit_data['voltages'] = {}
-            for bus in self.circuit_data['buses']:
-                try:
-                    dss.Circuit.SetActiveBus(bus)
-                    voltage_data = dss.Bus.puVmagAngle()
-                    if voltage_data and len(voltage_data) > 0:
-                        self.circuit_data['voltages'][bus] = voltage_data
-                    else:
-                        # Fallback to default voltage
-                        self.circuit_data['voltages'][bus] = [1.0, 0.0]
-                except Exception as e:
-                    print(f"Warning: Could not get voltage for bus {bus}: {e}")
-                    self.circuit_data['voltages'][bus] = [1.0, 0.0]
+            # Get bus voltages (fallback to default voltage for buses without nodes)
+            self.circuit_data['voltages'] = {
+                bus: voltage_data if voltage_data else [1.0, 0.0]
+                for bus, voltage_data in results.bus_vmag_angle().items()
+            }
                     
             # Get element data
             self.circuit_data['element_info'] = {}
-            for element in self.circuit_data['elements']:
-                try:
-                    dss.Circuit.SetActiveElement(element)
-                    buses = dss.CktElement.BusNames()
-                    power = dss.CktElement.Powers()
-                    enabled = dss.CktElement.Enabled()
-                    
-                    self.circuit_data['element_info'][element] = {
-                        'buses': buses if buses else [],
-                        'power': power if power else [0.0, 0.0],
-                        'enabled': enabled
-                    }
-                except Exception as e:
-                    print(f"Warning: Could not get data for element {element}: {e}")
-                    self.circuit_data['element_info'][element] = {
-                        'buses': [],
-                        'power': [0.0, 0.0],
-                        'enabled': True
-                    }
+            for element in topology.element_names:
+                power = results.element_powers(element)
+                self.circuit_data['element_info'][element] = {
+                    'buses': topology.element_buses.get(element, []),
+                    'power': power if power else [0.0, 0.0],
+                    'enabled': topology.element_enabled.get(element, True)
+                }
                     
         except Exception as e:
             print(f"Error extracting circuit data: {e}")
@@ -0,0 +1,603 @@
+"""
+Unit tests for the advanced power system simulation engine
+"""
+import cmath
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from simulation.advanced_simulation import (
+    PowerSystemNetwork, LineData, LoadFlowSolver, ContingencyAnalysis, FaultAnalysis, FaultType,
+    TransientStabilityAnalysis, AdvancedSimulationEngine, Scenario, SimulationType
+)
+
+
+@pytest.fixture
+def network():
+    """Standard 400/220 kV substation network"""
+    net = PowerSystemNetwork()
+    net.initialize_standard_substation()
+    return net
+
+
+class TestPowerInjections:
+    """Test bus power injection calculation"""
+
+    def test_matches_elementwise_formula(self, network):
+        """Vectorized injections should equal the per-entry polar formula"""
+        y_bus = network.build_ybus()
+        n = len(network.buses)
+        rng = np.random.default_rng(0)
+        v_mag = rng.uniform(0.95, 1.05, n)
+        v_ang = rng.uniform(-0.2, 0.2, n)
+
+        p, q = LoadFlowSolver(network)._calculate_power(v_mag, v_ang, y_bus)
+
+        for i in range(n):
+            p_ref = q_ref = 0.0
+            for j in range(n):
+                y_mag, y_ang = abs(y_bus[i, j]), cmath.phase(y_bus[i, j])
+                p_ref += v_mag[i] * v_mag[j] * y_mag * math.cos(v_ang[i] - v_ang[j] - y_ang)
+                q_ref += v_mag[i] * v_mag[j] * y_mag * math.sin(v_ang[i] - v_ang[j] - y_ang)
+            assert p[i] == pytest.approx(p_ref)
+            assert q[i] == pytest.approx(q_ref)
+
+    def test_flat_start_has_no_injection_without_shunts(self, network):
+        """At a flat start only shunt admittance draws reactive power"""
+        y_bus = network.build_ybus()
+        n = len(network.buses)
+
+        p, q = LoadFlowSolver(network)._calculate_power(np.ones(n), np.zeros(n), y_bus)
+
+        assert np.allclose(p, 0)
+        assert np.allclose(q, -np.asarray(y_bus.sum(axis=1)).ravel().imag)
+
+
+class TestSparseNewtonRaphson:
+    """Test the sparse Y-bus, analytical Jacobian and sparse LU solve"""
+
+    def test_ybus_is_sparse_and_symmetric(self, network):
+        """Y-bus is CSR and symmetric at nominal taps"""
+        y_bus = network.build_ybus()
+
+        assert sparse.isspmatrix_csr(y_bus)
+        assert abs(y_bus - y_bus.T).max() == pytest.approx(0)
+
+    def test_jacobian_matches_finite_differences(self, network):
+        """Analytical Jacobian should equal a numerical derivative of the mismatch"""
+        y_bus = network.build_ybus()
+        solver = LoadFlowSolver(network)
+        pq, pv = [1, 2, 3, 4], []
+        rng = np.random.default_rng(1)
+        v_mag = rng.uniform(0.95, 1.05, len(network.buses))
+        v_ang = rng.uniform(-0.1, 0.1, len(network.buses))
+
+        jacobian = solver._build_jacobian(v_mag, v_ang, y_bus, pq, pv).toarray()
+
+        def injections(x):
+            va, vm = v_ang.copy(), v_mag.copy()
+            va[pq] = x[:len(pq)]
+            vm[pq] = x[len(pq):]
+            p, q = solver._calculate_power(vm, va, y_bus)
+            return np.concatenate([p[pq], q[pq]])
+
+        x0 = np.concatenate([v_ang[pq], v_mag[pq]])
+        step = 1e-7
+        numerical = np.column_stack([
+            (injections(x0 + step * e) - injections(x0 - step * e)) / (2 * step)
+            for e in np.eye(len(x0))
+        ])
+        assert np.allclose(jacobian, numerical, atol=1e-4 * np.abs(numerical).max())
+
+    def test_standard_network_converges(self, network):
+        """Standard substation converges quadratically to its scheduled injections"""
+        solver = LoadFlowSolver(network)
+        result = solver.solve()
+
+        assert result["converged"]
+        assert result["iterations"] <= 6
+        for bus_id in ["BUS_220_1", "BUS_220_2", "BUS_220_3"]:
+            assert 0.9 < result["buses"][bus_id]["voltage_pu"] < 1.0
+
+        names = list(network.buses)
+        v_mag = np.array([network.buses[b].voltage_pu for b in names])
+        v_ang = np.radians([network.buses[b].angle_deg for b in names])
+        p, _ = solver._calculate_power(v_mag, v_ang, network.build_ybus())
+        assert p[names.index("BUS_220_1")] * network.base_mva == pytest.approx(-150, abs=1e-3)
+
+    def test_islanded_bus_is_deenergised(self, network):
+        """Buses not connected to the slack are left out instead of making the Jacobian singular"""
+        result = LoadFlowSolver(network).solve()
+
+        assert result["converged"]
+        assert result["buses"]["BUS_33_1"]["voltage_pu"] == 0.0
+
+
+class TestFastDecoupled:
+    """Test the fast-decoupled load flow and its cached factorizations"""
+
+    def test_matches_newton_raphson(self, network):
+        """Fast-decoupled converges to the Newton-Raphson operating point"""
+        nr = LoadFlowSolver(network).solve()
+        fd = LoadFlowSolver(network, method="fast_decoupled").solve()
+
+        assert fd["converged"]
+        assert fd["method"] == "fast_decoupled"
+        assert not fd["fallback"]
+        for bus_id, state in nr["buses"].items():
+            assert fd["buses"][bus_id]["voltage_pu"] == pytest.approx(state["voltage_pu"], abs=1e-5)
+            assert fd["buses"][bus_id]["angle_deg"] == pytest.approx(state["angle_deg"], abs=1e-4)
+
+    def test_factors_reused_per_topology(self, network):
+        """B'/B'' are factored once per topology and reused on later solves"""
+        solver = LoadFlowSolver(network, method="fast_decoupled")
+        solver.solve()
+        solver.solve()
+        assert solver.factor_stats == {"factorizations": 1, "low_rank_updates": 0, "hits": 1}
+
+        network.build_ybus()
+        network.transformers["TR1"].tap_position = 2
+        network.build_ybus()
+        solver.solve()
+        assert solver.factor_stats["factorizations"] == 2
+
+    def test_falls_back_to_newton_raphson(self, network):
+        """Cases fast-decoupled cannot solve are handed to Newton-Raphson"""
+        solver = LoadFlowSolver(network, method="fast_decoupled")
+        solver.max_iterations = 2
+
+        result = solver.solve()
+
+        assert result["fallback"]
+        assert result["method"] == "newton_raphson"
+
+    def test_contingency_reuses_factors(self, network):
+        """Repeated N-1 sweeps do not refactor any outage topology"""
+        analysis = ContingencyAnalysis(network)
+        first = analysis.run_n1_contingency()
+        factorizations = analysis.solver.factor_stats["factorizations"]
+        second = analysis.run_n1_contingency()
+
+        assert all(case["converged"] for case in first)
+        assert analysis.solver.factor_stats["factorizations"] == factorizations
+        assert [c["severity"] for c in first] == [c["severity"] for c in second]
+
+
+class TestDCSensitivities:
+    """Test DC power flow, PTDF/LODF and the N-1 DC screen"""
+
+    def test_dc_flows_satisfy_kirchhoff(self, network):
+        """DC branch flows balance the scheduled injection at every non-slack bus"""
+        flows = network.dc_power_flow()["branch_flows_mw"]
+        branches = network.branch_arrays()
+        names = list(network.buses)
+
+        net_out = np.zeros(len(names))
+        for branch_id, f, t in zip(branches["id"], branches["from"], branches["to"]):
+            net_out[f] += flows[branch_id]
+            net_out[t] -= flows[branch_id]
+        injections = np.array([b.generation_mw - b.load_mw for b in network.buses.values()])
+        assert np.allclose(net_out[1:], injections[1:])
+
+    def test_lodf_matches_resolved_outage(self, network):
+        """LODF-predicted post-outage flows equal a DC solve without the branch"""
+        base = network.dc_power_flow()["branch_flows_mw"]
+        sensitivities = network.dc_sensitivities()
+        k = sensitivities.branch_ids.index("LINE_220_1")
+
+        outaged = network.lines.pop("LINE_220_1")
+        after = network.dc_power_flow()["branch_flows_mw"]
+        network.lines["LINE_220_1"] = outaged
+
+        for l, branch_id in enumerate(sensitivities.branch_ids):
+            if branch_id == "LINE_220_1":
+                continue
+            predicted = base[branch_id] + sensitivities.lodf[l, k] * base["LINE_220_1"]
+            assert predicted == pytest.approx(after[branch_id], abs=1e-6)
+
+    def test_sensitivities_cached_per_topology(self, network):
+        """PTDF/LODF are reused until the topology changes"""
+        first = network.dc_sensitivities()
+        assert network.dc_sensitivities() is first
+
+        network.update_branch("line", "LINE_220_1", length_km=60)
+        assert network.dc_sensitivities() is not first
+
+    def test_screen_flags_islanding_and_overloads(self, network):
+        """Radial and overloading outages are flagged, the rest skip the AC solve"""
+        analysis = ContingencyAnalysis(network)
+        screen = analysis.screen_n1_dc()
+
+        assert screen["LINE_220_2"]["islanding"]
+        assert screen["TR1"]["flagged"]
+        assert not screen["LINE_220_1"]["flagged"]
+
+        results = {r["contingency"]: r for r in analysis.run_n1_contingency()}
+        assert results["Line_LINE_220_1"]["screened_out"]
+        assert not results["Transformer_TR1"]["screened_out"]
+        assert list(network.lines) == ["LINE_400_1", "LINE_220_1", "LINE_220_2"]
+
+
+class TestFaultAnalysis:
+    """Test the factored Z-bus and the short-circuit sweep"""
+
+    def test_z_column_matches_dense_inverse(self, network):
+        """On-demand Z-bus column equals the inverse of the energised fault Y-bus"""
+        analysis = FaultAnalysis(network)
+        column = analysis.z_column("BUS_220_2")
+
+        y_bus = network.build_ybus().toarray()[:5, :5]
+        z_source = network.base_mva / network.source_short_circuit_mva
+        r_source = z_source / math.sqrt(1 + network.source_x_r ** 2)
+        y_bus[0, 0] += 1 / complex(r_source, r_source * network.source_x_r)
+        assert np.allclose(column, np.linalg.inv(y_bus)[:, 3])
+
+    def test_source_bus_fault_level(self, network):
+        """A fault at the slack bus is bounded by the grid source fault level"""
+        result = FaultAnalysis(network).calculate_fault("BUS_400_1", FaultType.THREE_PHASE)
+        source_ka = 20000.0 / (math.sqrt(3) * 400)
+
+        assert result["symmetrical_current_ka"] == pytest.approx(source_ka, rel=0.01)
+        assert result["symmetrical_current_ka"] < source_ka
+
+    def test_factorization_cached_per_topology(self, network):
+        """Faults on the same topology reuse one factorization"""
+        analysis = FaultAnalysis(network)
+        for bus_id in ["BUS_400_1", "BUS_220_1", "BUS_220_3"]:
+            analysis.calculate_fault(bus_id, FaultType.THREE_PHASE)
+        assert analysis.stats["factorizations"] == 1
+
+        del network.lines["LINE_220_1"]
+        analysis.calculate_fault("BUS_220_1", FaultType.THREE_PHASE)
+        assert analysis.stats["factorizations"] == 2
+
+    def test_sweep_matches_single_faults(self, network):
+        """Sweep table agrees with individual calculate_fault calls"""
+        analysis = FaultAnalysis(network)
+        table = analysis.sweep_all_faults()
+
+        for bus_id in ["BUS_400_2", "BUS_220_3"]:
+            for fault_type in FaultType:
+                if fault_type.value not in table["fault_types"]:
+                    continue
+                single = analysis.calculate_fault(bus_id, fault_type)
+                row = table["buses"][bus_id]["faults"][fault_type.value]
+                assert row["symmetrical_current_ka"] == pytest.approx(single["symmetrical_current_ka"])
+                assert row["peak_current_ka"] == pytest.approx(single["peak_current_ka"])
+
+    def test_deenergised_bus(self, network):
+        """Buses without a path to the source report no fault current"""
+        analysis = FaultAnalysis(network)
+
+        assert "error" in analysis.calculate_fault("BUS_33_1", FaultType.THREE_PHASE)
+        row = analysis.sweep_all_faults()["buses"]["BUS_33_1"]
+        assert not row["energised"]
+        assert row["faults"]["3PH"]["symmetrical_current_ka"] == 0.0
+
+
+class TestTransientStability:
+    """Test the multi-machine RK4 transient stability simulation"""
+
+    def test_output_is_decimated(self, network):
+        """Samples are recorded at the output step, not every integration step"""
+        analysis = TransientStabilityAnalysis(network)
+        result = analysis.simulate_fault_clearing("BUS_220_1", 0.1, output_step=0.1)
+
+        assert result["stability"] == "STABLE"
+        assert len(result["time"]) == 101
+        assert result["time"][1] == pytest.approx(0.1)
+        assert set(result["voltages"]) == set(network.buses)
+
+    def test_no_fault_is_steady_state(self, network):
+        """Without a fault every machine stays at its pre-fault angle and 50 Hz"""
+        network.buses["BUS_220_3"].type = "PV"
+        network.buses["BUS_220_3"].generation_mw = 60
+        network.generators = {
+            "G1": {"bus": "BUS_400_1", "p_mw": 350, "h": 4.0},
+            "G2": {"bus": "BUS_220_3", "p_mw": 60, "h": 3.0, "xd_prime": 0.25}
+        }
+        analysis = TransientStabilityAnalysis(network)
+        analysis.simulation_time = 1.0
+
+        result = analysis.simulate_fault_clearing("BUS_220_1", 0.0)
+
+        for gen_id in ["G1", "G2"]:
+            angles = np.array(result["rotor_angles"][gen_id])
+            assert np.ptp(angles) < 1e-3
+            assert np.allclose(result["frequencies"][gen_id], 50.0, atol=1e-6)
+
+    def test_repeated_study_reuses_reduction(self, network):
+        """The pre-fault solve changes bus voltages but not the cache key"""
+        analysis = TransientStabilityAnalysis(network)
+        analysis.simulation_time = 0.5
+
+        first = analysis.simulate_fault_clearing("BUS_220_1", 0.1)
+        second = analysis.simulate_fault_clearing("BUS_220_1", 0.1)
+
+        assert len(analysis._reduced_cache) == 1
+        assert second["rotor_angles"] == first["rotor_angles"]
+
+        network.buses["BUS_220_2"].load_mw += 10
+        analysis.simulate_fault_clearing("BUS_220_1", 0.1)
+        assert len(analysis._reduced_cache) == 2
+
+    def test_long_fault_loses_synchronism(self, network):
+        """Clearing too late at the machine bus makes the machine pull out of step"""
+        analysis = TransientStabilityAnalysis(network)
+
+        assert analysis.simulate_fault_clearing("BUS_400_1", 0.1)["stability"] == "STABLE"
+        unstable = analysis.simulate_fault_clearing("BUS_400_1", 0.8)
+        assert unstable["stability"] == "UNSTABLE"
+        assert unstable["time"][-1] < analysis.simulation_time
+
+
+class TestContingencyOverlays:
+    """Test outage overlays on an unchanged base network"""
+
+    def test_with_outages_is_independent(self, network):
+        """Overlays drop the outaged branches and solve into their own arrays, not the shared records"""
+        overlay = network.with_outages({("line", "LINE_220_1"), ("transformer", "TR2")})
+
+        assert list(overlay.lines) == ["LINE_400_1", "LINE_220_2"]
+        assert list(overlay.transformers) == ["TR1"]
+        assert overlay.buses["BUS_220_3"] is network.buses["BUS_220_3"]
+        result = LoadFlowSolver(overlay).solve()
+        assert network.buses["BUS_220_3"].voltage_pu == 1.0
+        assert network.lines["LINE_220_2"].loading_percent == 0.0
+
+        copy = network.copy({("line", "LINE_220_1"), ("transformer", "TR2")})
+        assert copy.buses["BUS_220_3"] is not network.buses["BUS_220_3"]
+        LoadFlowSolver(copy).solve()
+        assert overlay.solution.voltage_pu == pytest.approx(
+            [bus.voltage_pu for bus in copy.buses.values()], abs=1e-12)
+        assert result["branches"]["LINE_220_2"]["loading_percent"] == pytest.approx(
+            copy.lines["LINE_220_2"].loading_percent)
+        assert ContingencyAnalysis._check_violations(overlay) == ContingencyAnalysis._check_violations(copy)
+
+    def test_sweeps_leave_base_untouched(self, network):
+        """N-1 and N-2 sweeps do not modify the base network"""
+        analysis = ContingencyAnalysis(network)
+        analysis.run_n1_contingency()
+        n2 = analysis.run_n2_contingency()
+
+        assert len(n2) == 10
+        assert list(network.lines) == ["LINE_400_1", "LINE_220_1", "LINE_220_2"]
+        assert all(bus.voltage_pu == 1.0 for bus in network.buses.values())
+
+    def test_islanded_buses_are_not_undervoltage(self, network):
+        """De-energised buses are listed separately and do not raise severity"""
+        screened = ContingencyAnalysis(network)
+        ac = ContingencyAnalysis(network)
+        ac.dc_screening = False
+
+        dc_results = {r["contingency"]: r for r in screened.run_n1_contingency()}
+        ac_results = {r["contingency"]: r for r in ac.run_n1_contingency()}
+
+        result = ac_results["Line_LINE_220_1"]
+        assert result["violations"]["islanded"] == ["BUS_33_1"]
+        assert all(v["bus"] != "BUS_33_1" for v in result["violations"]["voltage"])
+        assert dc_results["Line_LINE_220_1"]["severity"] == result["severity"] == "SAFE"
+
+    def test_parallel_matches_serial(self, network):
+        """Cases shipped to worker processes give the same results as in-process solves"""
+        serial = ContingencyAnalysis(network)
+        serial.dc_screening = False
+        parallel = ContingencyAnalysis(network, workers=2)
+        parallel.dc_screening = False
+        try:
+            assert parallel.run_n1_contingency() == serial.run_n1_contingency()
+        finally:
+            parallel.shutdown()
+
+
+class TestIncrementalYbus:
+    """Test incremental Y-bus edits and low-rank factor updates"""
+
+    def test_edits_match_full_rebuild(self, network):
+        """Stamp/unstamp edits give the same Y-bus as building from scratch"""
+        network.get_ybus()
+        network.update_branch("transformer", "TR1", tap_position=3, x_percent=14)
+        network.update_bus("BUS_220_2", shunt_mvar=50)
+        line = network.remove_branch("line", "LINE_220_2")
+        incremental = network.get_ybus().copy()
+        assert abs(incremental - network.build_ybus()).max() < 1e-12
+
+        network.add_branch("line", line)
+        assert abs(network.get_ybus() - network.build_ybus()).max() < 1e-12
+
+    def test_cached_ybus_is_reused(self, network):
+        """Solving twice does not rebuild the Y-bus; direct dict changes do"""
+        first = network.get_ybus()
+        LoadFlowSolver(network).solve()
+        assert network.get_ybus() is first
+
+        del network.lines["LINE_220_1"]
+        assert network.get_ybus() is not first
+
+    def test_load_edits_leave_ybus_alone(self, network):
+        """Loads are not stamped, so editing them keeps the cached Y-bus and its key"""
+        first = network.get_ybus()
+        key = network.ybus_key
+        network.update_bus("BUS_220_1", load_mw=200, load_mvar=60)
+
+        assert network.ybus_key == key
+        assert network.get_ybus() is first
+
+    def test_direct_attribute_edits_rebuild(self, network):
+        """Editing element attributes without the mutators still gives a current Y-bus"""
+        first = network.get_ybus().copy()
+        network.lines["LINE_220_1"].x_ohm_per_km *= 2
+        network.transformers["TR1"].tap_position = 2
+        network.buses["BUS_220_2"].shunt_mvar = 30
+
+        edited = network.get_ybus()
+        assert abs(edited - first).max() > 0
+        assert abs(edited - network.build_ybus()).max() < 1e-12
+
+    def test_edit_tracking_is_per_network(self, network):
+        """Edits elsewhere, and pickling, keep the cached Y-bus; additions rebuild it"""
+        import pickle
+        other = PowerSystemNetwork()
+        other.initialize_standard_substation()
+        other.get_ybus()
+        first = network.get_ybus()
+        other.lines["LINE_220_1"].length_km = 60
+        assert network.get_ybus() is first
+
+        copy = pickle.loads(pickle.dumps(network))
+        assert copy.get_ybus() is copy.y_bus and copy.ybus_key == network.ybus_key
+
+        network.lines["LINE_X"] = LineData("LINE_X", "", "BUS_220_1", "BUS_220_3", 10, 220)
+        assert abs(network.get_ybus() - first).max() > 0
+
+    def test_outage_copy_unstamps_from_base(self, network):
+        """Outage copies start from the base Y-bus without touching it"""
+        base = network.get_ybus().copy()
+        overlay = network.with_outages({("line", "LINE_220_1")})
+
+        assert abs(overlay.get_ybus() - overlay.build_ybus()).max() < 1e-12
+        assert abs(network.get_ybus() - base).max() == 0
+
+    def test_low_rank_update_matches_refactorization(self, network):
+        """Fast-decoupled on a single-branch outage reuses the base factors with the same answer"""
+        solver = LoadFlowSolver(network.with_outages(()), method="fast_decoupled")
+        solver.solve()
+        solver.network = network.with_outages({("transformer", "TR1")})
+        updated = solver.solve()
+        assert solver.factor_stats["low_rank_updates"] == 1
+        assert solver.factor_stats["factorizations"] == 1
+
+        fresh = network.with_outages({("transformer", "TR1")})
+        fresh.build_ybus()
+        reference = LoadFlowSolver(fresh, method="fast_decoupled").solve()
+        for bus_id, state in reference["buses"].items():
+            assert updated["buses"][bus_id]["voltage_pu"] == pytest.approx(state["voltage_pu"], abs=1e-9)
+
+
+class TestBatchScenarios:
+    """Test batch what-if runs on copies of the engine network"""
+
+    @staticmethod
+    def scenarios():
+        return [
+            Scenario("base"),
+            Scenario("peak", load_multiplier=1.3),
+            Scenario("tap", updates={"transformers": {"TR1": {"tap_position": 4}}}),
+            Scenario("outage", outages=(("line", "LINE_220_1"),)),
+            {"name": "fault", "type": "short_circuit",
+             "parameters": {"bus_id": "BUS_220_2", "fault_type": "LINE_TO_GROUND"}},
+        ]
+
+    def test_batch_leaves_engine_network_untouched(self):
+        """Every scenario runs on its own copy of the network"""
+        engine = AdvancedSimulationEngine()
+        outcomes = {r["scenario"]: r for r in engine.run_batch(self.scenarios())}
+
+        assert set(outcomes) == {"base", "peak", "tap", "outage", "fault"}
+        assert all(r["success"] for r in outcomes.values())
+        base_v = outcomes["base"]["results"]["buses"]["BUS_220_3"]["voltage_pu"]
+        assert outcomes["peak"]["results"]["buses"]["BUS_220_3"]["voltage_pu"] < base_v
+        assert outcomes["fault"]["results"]["fault_type"] == "LG"
+        assert engine.network.buses["BUS_220_1"].load_mw == 150
+        assert engine.network.transformers["TR1"].tap_position == 0
+        assert "LINE_220_1" in engine.network.lines
+
+    def test_history_is_bounded(self):
+        """History keeps only the most recent runs"""
+        engine = AdvancedSimulationEngine(history_size=3)
+        list(engine.run_batch(self.scenarios()))
+        engine.run_simulation(SimulationType.LOAD_FLOW, {})
+
+        assert len(engine.simulation_history) == 3
+        assert engine.simulation_history[-1]["type"] == "load_flow"
+        assert "scenario" not in engine.simulation_history[-1]
+
+    def test_pool_matches_in_process(self):
+        """Scenarios run in worker processes give the same results as in-process runs"""
+        engine = AdvancedSimulationEngine()
+        serial = {r["scenario"]: r["results"] for r in engine.run_batch(self.scenarios())}
+        parallel = {r["scenario"]: r["results"] for r in engine.run_batch(self.scenarios(), workers=2)}
+
+        assert parallel == serial
+
+
+class TestColumnarExport:
+    """Test streaming columnar export of batch results"""
+
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow", "npz"])
+    def test_batch_round_trip(self, tmp_path, fmt):
+        """Bus voltages, branch flows and trajectories read back as tables"""
+        from simulation.result_export import load_table
+        if fmt != "npz":
+            pytest.importorskip("pyarrow")
+        engine = AdvancedSimulationEngine()
+        scenarios = [Scenario("base"), Scenario("peak", load_multiplier=1.2),
+                     Scenario("fault", SimulationType.TRANSIENT_STABILITY,
+                              {"fault_bus": "BUS_220_1", "fault_duration": 0.1})]
+        rows = engine.export_batch(scenarios, tmp_path, format=fmt)
+
+        voltages = load_table(tmp_path, "bus_voltages")
+        flows = load_table(tmp_path, "branch_flows")
+        stability = load_table(tmp_path, "stability")
+        assert rows == {"bus_voltages": 12, "branch_flows": 10, "stability": len(stability),
+                        "fault_currents": 0, "contingencies": 0}
+        assert len(voltages) == 12 and len(flows) == 10
+        peak = voltages[(voltages.scenario == "peak") & (voltages.bus == "BUS_220_3")].voltage_pu.iloc[0]
+        base = voltages[(voltages.scenario == "base") & (voltages.bus == "BUS_220_3")].voltage_pu.iloc[0]
+        assert peak < base
+        assert set(flows.kind) == {"line", "transformer"}
+        assert set(stability.quantity) == {"rotor_angle_deg", "frequency_hz", "voltage_pu"}
+        assert (stability.scenario == "fault").all()
+
+    def test_flushes_in_chunks(self, tmp_path):
+        """Rows are written out as the buffer fills rather than held until close"""
+        from simulation.result_export import ColumnarResultWriter, load_table
+        engine = AdvancedSimulationEngine()
+        writer = ColumnarResultWriter(tmp_path, format="npz", flush_rows=10)
+        for outcome in engine.run_batch([Scenario(f"s{i}") for i in range(5)]):
+            writer.write(outcome)
+        assert writer.rows_written["bus_voltages"] >= 24
+        writer.close()
+
+        assert len(list(tmp_path.glob("bus_voltages-*.npz"))) > 1
+        assert len(load_table(tmp_path, "bus_voltages")) == 30
+
+    def test_export_results_writes_latest_runs(self, tmp_path):
+        """Columnar export_results covers the stored result of each simulation type"""
+        from simulation.result_export import load_table
+        engine = AdvancedSimulationEngine()
+        engine.run_simulation(SimulationType.LOAD_FLOW, {})
+        assert engine.export_results("npz", str(tmp_path)) == str(tmp_path)
+        assert set(load_table(tmp_path, "bus_voltages").scenario) == {"load_flow"}
+        with pytest.raises(ValueError):
+            engine.export_results("npz")
+
+    def test_every_simulation_type_exports(self, tmp_path):
+        """Each result is routed to its own table; unimplemented types write nothing"""
+        from simulation.result_export import load_table
+        engine = AdvancedSimulationEngine()
+        for sim_type in SimulationType:
+            engine.run_simulation(sim_type, {})
+        engine.export_results("npz", str(tmp_path / "latest"))
+
+        assert set(load_table(tmp_path / "latest", "bus_voltages").scenario) == {"load_flow"}
+        assert set(load_table(tmp_path / "latest", "stability").scenario) == {"transient_stability"}
+        contingencies = load_table(tmp_path / "latest", "contingencies")
+        assert len(contingencies) == len(engine.simulation_results["contingency_analysis"])
+        assert set(contingencies.severity) <= {"SAFE", "WARNING", "CRITICAL"}
+        faults = load_table(tmp_path / "latest", "fault_currents")
+        assert list(faults.bus) == ["BUS_400_1"] and (faults.symmetrical_current_ka > 0).all()
+
+        rows = engine.export_batch([{"type": "contingency_analysis"},
+                                    {"name": "sweep", "type": "short_circuit", "parameters": {"sweep": True}}],
+                                   tmp_path / "batch", format="npz")
+        assert rows["bus_voltages"] == 0
+        assert rows["fault_currents"] == 3 * len(engine.network.buses)
+        assert rows["contingencies"] == len(contingencies)
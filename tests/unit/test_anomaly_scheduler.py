@@ -0,0 +1,166 @@
+"""
+Unit tests for the concurrent anomaly scheduler
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from simulation.anomaly_scheduler import (
+    AnomalyScheduler,
+    AnomalyTimeline,
+    ScheduledAnomaly,
+    compose_anomaly_edits,
+    run_timeline
+)
+
+
+class RecordingLoadFlow:
+    """Stands in for LoadFlowAnalysis, recording what each solve was given"""
+
+    def __init__(self):
+        self.calls = []
+
+    def solve(self, anomalies=None, when=None):
+        self.calls.append((anomalies, when))
+        return {"converged": True}
+
+
+class TestScheduledAnomaly:
+    """Timing and ramp profiles"""
+
+    def test_step_profile(self):
+        anomaly = ScheduledAnomaly('voltage_sag', start=10, duration=5)
+        assert [anomaly.intensity(t) for t in (9.9, 10, 14.9, 15)] == [0.0, 1.0, 1.0, 0.0]
+
+    def test_linear_ramp_up_and_down(self):
+        anomaly = ScheduledAnomaly('voltage_sag', start=0, duration=10, ramp='linear', ramp_time=2)
+        assert anomaly.intensity(1) == pytest.approx(0.5)
+        assert anomaly.intensity(5) == 1.0
+        assert anomaly.intensity(9.5) == pytest.approx(0.25)
+
+    def test_smooth_ramp_without_end(self):
+        anomaly = ScheduledAnomaly('overload', ramp='smooth', ramp_time=4)
+        assert anomaly.intensity(2) == pytest.approx(0.5)
+        assert anomaly.intensity(1e6) == 1.0
+
+    def test_invalid_timing(self):
+        with pytest.raises(ValueError):
+            ScheduledAnomaly('voltage_sag', ramp='cubic')
+        with pytest.raises(ValueError):
+            ScheduledAnomaly('voltage_sag', duration=-1)
+
+
+class TestComposition:
+    """Several anomalies become one edit set"""
+
+    def test_overlapping_effects_combine(self):
+        edits = compose_anomaly_edits([
+            {'type': 'voltage_sag', 'parameters': {'severity': 0.9}},
+            {'type': 'voltage_sag', 'parameters': {'severity': 0.9}, 'intensity': 0.5},
+            {'type': 'overload', 'parameters': {'load_factor': 1.2}},
+            {'type': 'frequency_deviation', 'parameters': {'deviation': 0.2, 'type': 'under'}},
+            {'type': 'frequency_deviation', 'parameters': {'deviation': 0.1, 'type': 'over'}},
+        ])
+        assert edits.properties[("Vsource.GridSource", "pu")] == pytest.approx(0.9 * 0.95)
+        assert edits.options['loadmult'] == pytest.approx(1.2)
+        assert edits.options['frequency'] == pytest.approx(49.9)
+
+    def test_each_fault_gets_its_own_object(self):
+        edits = compose_anomaly_edits([
+            {'type': 'ground_fault', 'parameters': {'resistance': 5}, 'location': 'Bus220kV_1'},
+            {'type': 'ground_fault', 'parameters': {'resistance': 5, 'location': 'Bus33kV_1'}, 'intensity': 0.5},
+        ])
+        assert edits.objects == {
+            "Fault.AnomalyFault": "bus1=Bus220kV_1 phases=1 r=5",
+            "Fault.AnomalyFault2": "bus1=Bus33kV_1 phases=1 r=10",
+        }
+
+    def test_inactive_and_empty(self):
+        assert compose_anomaly_edits(None).options == {}
+        edits = compose_anomaly_edits([{'type': 'voltage_sag', 'parameters': {}, 'intensity': 0}])
+        assert not edits.properties
+
+
+class TestAnomalyScheduler:
+    """Concurrent anomalies on the scheduler clock"""
+
+    def test_concurrent_anomalies_and_cancel(self):
+        scheduler = AnomalyScheduler()
+        sag = scheduler.start_now('voltage_sag', {'severity': 0.9})
+        fault = scheduler.start_now('ground_fault', {'resistance': 5})
+        assert [a['id'] for a in scheduler.active()] == [sag.id, fault.id]
+
+        assert scheduler.cancel(sag.id)
+        assert not scheduler.cancel(sag.id)
+        assert [a['type'] for a in scheduler.active()] == ['ground_fault']
+
+    def test_timeline_clock_runs_at_speed(self):
+        scheduler = AnomalyScheduler()
+        scheduler.load_timeline([ScheduledAnomaly('voltage_sag', start=5, duration=5),
+                                 ScheduledAnomaly('overload', start=8, duration=100)], speed=1000)
+        assert scheduler.active(6)[0]['type'] == 'voltage_sag'
+        assert len(scheduler.active(9)) == 2
+
+        time.sleep(0.02)
+        assert scheduler.now() >= 20
+        # The finished sag is dropped from the schedule
+        assert [a['type'] for a in scheduler.active()] == ['overload']
+        assert len(scheduler.scheduled()) == 1
+
+
+    def test_timeline_speed_ends_with_timeline(self):
+        scheduler = AnomalyScheduler()
+        scheduler.load_timeline([ScheduledAnomaly('voltage_sag', start=0, duration=10)], speed=1000)
+        time.sleep(0.05)
+
+        # The clock stops at the timeline end and carries on in real time
+        assert 10 <= scheduler.now() < 11
+        assert scheduler.speed == 1.0
+        sag = scheduler.start_now('voltage_sag', {}, duration=60)
+        time.sleep(0.05)
+        assert [a['id'] for a in scheduler.active()] == [sag.id]
+
+    def test_clear_restores_real_time(self):
+        scheduler = AnomalyScheduler()
+        scheduler.load_timeline([ScheduledAnomaly('overload')], speed=60)
+        assert scheduler.speed == 60
+
+        scheduler.clear()
+        assert scheduler.speed == 1.0
+        assert scheduler.get_status()['timeline_end'] is None
+
+class TestTimeline:
+    """Scripted timelines"""
+
+    def test_duration_and_validation(self):
+        timeline = AnomalyTimeline.from_dict({'anomalies': [
+            {'type': 'voltage_sag', 'start': 10, 'duration': 20},
+            {'type': 'overload', 'start': 0, 'duration': 5},
+        ]})
+        assert timeline.duration == 30
+        assert AnomalyTimeline.from_dict(timeline.to_dict()).anomalies[0].id == timeline.anomalies[0].id
+
+        with pytest.raises(ValueError, match="duration"):
+            AnomalyTimeline([ScheduledAnomaly('overload')])
+        with pytest.raises(ValueError, match="capacitor_switching"):
+            AnomalyTimeline([ScheduledAnomaly('capacitor_switching', duration=1)])
+
+    def test_run_timeline_steps_and_pacing(self):
+        from datetime import datetime
+
+        load_flow = RecordingLoadFlow()
+        timeline = AnomalyTimeline([ScheduledAnomaly('voltage_sag', start=60, duration=60),
+                                    ScheduledAnomaly('ground_fault', start=90, duration=60)])
+        started = time.monotonic()
+        samples = run_timeline(load_flow, timeline, step=30, speed=3000,
+                               start_time=datetime(2026, 1, 1, 18, 0))
+
+        assert time.monotonic() - started >= 150 / 3000
+        assert [s['t'] for s in samples] == [0, 30, 60, 90, 120, 150]
+        assert [len(s['anomalies']) for s in samples] == [0, 0, 1, 2, 1, 0]
+        assert load_flow.calls[3][1] == datetime(2026, 1, 1, 18, 1, 30)
@@ -0,0 +1,93 @@
+"""
+Unit tests for the OpenDSS result to asset mapping index
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from models.asset_models import SubstationAssetManager
+from models.asset_mapping import AssetResultMapper, load_asset_mapping
+
+
+def make_elements(version="v1", v_pu=(1.0, 0.99, 0.98)):
+    """Solve-result arrays in the layout returned by LoadFlowAnalysis.get_element_results"""
+    return {
+        "version": version,
+        "buses": {
+            "names": ["bus400kv_1", "bus220kv_1", "bus220kv_2"],
+            "v_pu": np.array(v_pu),
+            "kv_base": np.array([230.94, 127.02, 127.02])
+        },
+        "elements": {
+            "names": ["Line.feeder", "Transformer.tx1_400_220", "Transformer.tx2_400_220"],
+            "p_kw": np.array([100.0, 150000.0, -90000.0]),
+            "q_kvar": np.array([10.0, 50000.0, 30000.0]),
+            "current_a": np.array([1.0, 220.0, 130.0])
+        }
+    }
+
+
+@pytest.fixture
+def asset_manager():
+    return SubstationAssetManager()
+
+
+@pytest.fixture
+def mapper():
+    return AssetResultMapper({
+        "buses": {
+            "bus400kv_1": ["TR*", "CB_400_*"],
+            "bus220kv_1": ["CB_220_[1-5]"],
+            "bus220kv_2": ["CB_220_[6-9]", "CB_220_10"]
+        },
+        "elements": {
+            "Transformer.tx1_400_220": ["TR1"],
+            "Transformer.tx2_400_220": ["TR2"]
+        }
+    })
+
+
+class TestAssetResultMapper:
+    """Test bus/element to asset attribution"""
+
+    def test_bus_voltages_go_to_mapped_assets_only(self, mapper, asset_manager):
+        """Only assets mapped to a bus should receive its voltage"""
+        mapper.apply(asset_manager, make_elements())
+
+        assert asset_manager.assets['CB_400_1'].real_time_data['voltage_kv'] == pytest.approx(230.94 * np.sqrt(3))
+        assert asset_manager.assets['CB_220_10'].real_time_data['voltage_kv'] == pytest.approx(0.98 * 127.02 * np.sqrt(3))
+        assert 'voltage_kv' not in asset_manager.assets['CT_400_1_R'].real_time_data
+
+    def test_transformer_flows_are_attributed_per_element(self, mapper, asset_manager):
+        """Each transformer asset should get its own element's flows"""
+        mapper.apply(asset_manager, make_elements())
+
+        tr1 = asset_manager.assets['TR1'].real_time_data
+        tr2 = asset_manager.assets['TR2'].real_time_data
+        assert tr1['current_a'] == pytest.approx(220.0)
+        assert tr2['current_a'] == pytest.approx(130.0)
+        assert tr2['power_mw'] == pytest.approx(90.0)
+        assert tr1['loading_percent'] == pytest.approx(np.hypot(150000, 50000) / 315000 * 100)
+        assert 'current_a' not in asset_manager.assets['CT_400_1_R'].real_time_data
+
+    def test_index_built_once_per_version(self, mapper, asset_manager):
+        """The index should only be rebuilt when the circuit version changes"""
+        mapper.apply(asset_manager, make_elements())
+        signature = mapper._signature
+
+        mapper.apply(asset_manager, make_elements(v_pu=(0.9, 0.9, 0.9)))
+        assert mapper._signature is signature
+
+        mapper.apply(asset_manager, make_elements(version="v2"))
+        assert mapper._signature is not signature
+
+    def test_default_mapping_file_loads(self):
+        """The bundled mapping config should be valid"""
+        config = load_asset_mapping()
+        assert "Transformer.tx1_400_220" in config['elements']
+        assert config['buses']
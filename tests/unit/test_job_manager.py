@@ -0,0 +1,188 @@
+"""
+Unit tests for the background job manager
+"""
+
+import asyncio
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from services.job_manager import JobFailed, JobManager, JobQueueFull, JobStatus
+
+
+async def _add(job, a, b):
+    return {"sum": np.float64(a + b), "values": np.arange(3)}
+
+
+def _fail(job):
+    raise ValueError("bad input")
+
+
+def _blocking(job, release: threading.Event, steps: int = 100):
+    for step in range(steps):
+        job.update_progress({"step": step})
+        if release.wait(0.01):
+            break
+    return "done"
+
+
+def _touch_and_sleep(path: str, seconds: float):
+    Path(path).touch()
+    time.sleep(seconds)
+
+
+async def _in_process(job, manager, path, seconds):
+    return await manager.run_in_process(_touch_and_sleep, path, seconds)
+
+
+class TestJobLifecycle:
+    """Job execution, results store and failure handling"""
+
+    def test_result_is_stored_and_reloaded(self, tmp_path):
+        async def run():
+            manager = JobManager(tmp_path, max_concurrent=2)
+            job = manager.submit("add", _add, 2, 3, params={"a": 2})
+            assert job.status == JobStatus.QUEUED
+            result = await manager.wait(job)
+            return manager, job, result
+
+        manager, job, result = asyncio.run(run())
+        assert result["sum"] == 5
+        assert job.status == JobStatus.SUCCEEDED and job.has_result
+        assert manager.result(job.id) == {"sum": 5.0, "values": [0, 1, 2]}
+
+        # A new manager on the same directory sees the finished job
+        reloaded = JobManager(tmp_path)
+        assert reloaded.get(job.id).status == JobStatus.SUCCEEDED
+        assert reloaded.get(job.id).params == {"a": 2}
+        assert reloaded.result(job.id)["sum"] == 5.0
+
+    def test_failed_job(self, tmp_path):
+        async def run():
+            manager = JobManager(tmp_path)
+            job = manager.submit("fail", _fail)
+            with pytest.raises(JobFailed, match="bad input"):
+                await manager.wait(job)
+            return manager, job
+
+        manager, job = asyncio.run(run())
+        assert job.status == JobStatus.FAILED
+        assert job.error == "bad input"
+        with pytest.raises(KeyError):
+            manager.result(job.id)
+        assert manager.get_stats()["failed"] == 1
+
+    def test_old_jobs_are_pruned(self, tmp_path):
+        async def run():
+            manager = JobManager(tmp_path, max_jobs=2)
+            jobs = [manager.submit("add", _add, i, i) for i in range(4)]
+            await asyncio.gather(*[manager.wait(job) for job in jobs])
+            return manager, jobs
+
+        manager, jobs = asyncio.run(run())
+        assert [job.id for job in manager.list_jobs()] == [jobs[3].id, jobs[2].id]
+        assert len(list(tmp_path.glob("*.result.json"))) == 2
+
+    def test_run_in_process(self, tmp_path):
+        async def run():
+            manager = JobManager(tmp_path, max_concurrent=1)
+            try:
+                return await manager.run_in_process(math.sqrt, 16.0)
+            finally:
+                manager.shutdown()
+
+        assert asyncio.run(run()) == 4.0
+
+
+class TestJobConcurrency:
+    """Bounded concurrency, queue limits and cancellation"""
+
+    def test_concurrency_limit_and_queued_cancel(self, tmp_path):
+        release = threading.Event()
+
+        async def run():
+            manager = JobManager(tmp_path, max_concurrent=1)
+            first = manager.submit("block", _blocking, release)
+            second = manager.submit("block", _blocking, release)
+            await asyncio.sleep(0.1)
+            statuses = (first.status, second.status)
+            assert manager.cancel(second.id)
+            release.set()
+            assert await manager.wait(first) == "done"
+            with pytest.raises(JobFailed):
+                await manager.wait(second)
+            return statuses, first, second
+
+        statuses, first, second = asyncio.run(run())
+        assert statuses == (JobStatus.RUNNING, JobStatus.QUEUED)
+        assert first.status == JobStatus.SUCCEEDED
+        assert second.status == JobStatus.CANCELLED
+        assert second.started_at is None
+
+    def test_running_thread_job_stops_at_progress(self, tmp_path):
+        release = threading.Event()
+
+        async def run():
+            manager = JobManager(tmp_path)
+            job = manager.submit("block", _blocking, release, 10000)
+            while not job.progress:
+                await asyncio.sleep(0.01)
+            assert manager.cancel(job.id)
+            with pytest.raises(JobFailed):
+                await manager.wait(job)
+            return manager, job
+
+        manager, job = asyncio.run(run())
+        assert job.status == JobStatus.CANCELLED
+        assert job.progress["step"] < 9999
+        assert not manager.cancel(job.id)
+
+    def test_cancelled_process_call_keeps_its_slot(self, tmp_path):
+        """A job cancelled while its worker runs stays cancelling and blocks the next job"""
+        marker = tmp_path / "started"
+
+        async def run():
+            manager = JobManager(tmp_path / "jobs", max_concurrent=1)
+            try:
+                job = manager.submit("process", _in_process, manager, str(marker), 1.0)
+                while not marker.exists():
+                    await asyncio.sleep(0.01)
+                assert manager.cancel(job.id)
+                assert job.status == JobStatus.CANCELLING
+                queued = manager.submit("add", _add, 1, 2)
+                await asyncio.sleep(0.3)
+                waiting = (job.status, queued.status)
+                await manager.wait(queued)
+                return job, waiting
+            finally:
+                manager.shutdown()
+
+        job, waiting = asyncio.run(run())
+        assert waiting == (JobStatus.CANCELLING, JobStatus.QUEUED)
+        assert job.status == JobStatus.CANCELLED
+
+    def test_queue_full(self, tmp_path):
+        release = threading.Event()
+
+        async def run():
+            manager = JobManager(tmp_path, max_concurrent=1, max_pending=2)
+            jobs = [manager.submit("block", _blocking, release) for _ in range(2)]
+            with pytest.raises(JobQueueFull):
+                manager.submit("block", _blocking, release)
+            release.set()
+            for job in jobs:
+                await manager.wait(job)
+            # Finished jobs free their places in the queue
+            await manager.wait(manager.submit("add", _add, 1, 1))
+            return manager
+
+        manager = asyncio.run(run())
+        assert manager.get_stats()["rejected"] == 1
+        assert manager.get_stats()["succeeded"] == 3
@@ -0,0 +1,660 @@
+"""
+Unit tests for OpenDSS load flow analysis and the persistent circuit session
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+dss = pytest.importorskip("opendssdirect")
+
+from simulation.load_flow import LoadFlowAnalysis
+from simulation.dss_session import DSSCircuitSession, CircuitEditSet
+
+DSS_PATH = Path(__file__).parent.parent.parent / "src" / "models" / "IndianEHVSubstation.dss"
+
+
+@pytest.fixture
+def load_flow():
+    """Load flow engine with the substation model compiled"""
+    if not DSS_PATH.exists():
+        pytest.skip("DSS file not found")
+    lf = LoadFlowAnalysis()
+    assert lf.load_circuit(str(DSS_PATH.resolve()))
+    return lf
+
+
+class TestDSSCircuitSession:
+    """Test compile-once session behaviour"""
+
+    def test_repeated_solves_do_not_recompile(self, load_flow):
+        """Solving many times should reuse the compiled circuit"""
+        for _ in range(5):
+            result = load_flow.solve()
+            assert result['converged']
+
+        assert load_flow.session.stats['compiles'] == 1
+        assert load_flow.session.stats['solves'] == 5
+
+    def test_reload_same_content_skips_compile(self, load_flow):
+        """Loading identical DSS content should not recompile"""
+        load_flow.load_circuit(str(DSS_PATH.resolve()))
+        assert load_flow.session.stats['compiles'] == 1
+
+    def test_reload_changed_content_recompiles(self, load_flow, tmp_path):
+        """A new DSS version should trigger a recompile"""
+        modified = tmp_path / "modified.dss"
+        modified.write_text(DSS_PATH.read_text().replace("kW=15000", "kW=16000"))
+
+        old_hash = load_flow.session.version_hash
+        load_flow.load_circuit(str(modified))
+
+        assert load_flow.session.stats['compiles'] == 2
+        assert load_flow.session.version_hash != old_hash
+
+    def test_foreign_clear_triggers_recompile(self, load_flow):
+        """Another component clearing the engine should be detected"""
+        load_flow.solve()
+        dss.Text.Command("clear")
+
+        result = load_flow.solve()
+
+        assert result['converged']
+        assert load_flow.session.stats['compiles'] == 2
+
+    def test_edits_are_only_applied_when_changed(self, load_flow):
+        """Unchanged edit sets should issue no commands"""
+        session = load_flow.session
+        edits = CircuitEditSet(options={'loadmult': 0.9})
+
+        session.apply(edits)
+        applied = session.stats['edits_applied']
+        session.apply(CircuitEditSet(options={'loadmult': 0.9}))
+
+        assert session.stats['edits_applied'] == applied
+
+    def test_removed_edits_revert_to_baseline(self, load_flow):
+        """Edits dropped from the set should restore compiled values"""
+        session = load_flow.session
+        session.apply(CircuitEditSet(properties={("Vsource.GridSource", "pu"): 0.9}))
+        session.apply(CircuitEditSet())
+
+        dss.Text.Command("? Vsource.GridSource.pu")
+        assert float(dss.Text.Result()) == pytest.approx(1.0)
+
+    def test_transient_edits_revert_touched_elements(self, load_flow):
+        """A transient edit set should return to the restore point without recompiling"""
+        session = load_flow.session
+        session.apply(CircuitEditSet(options={'loadmult': 0.9}))
+        before = session.snapshot()
+
+        with session.transient(CircuitEditSet(
+            properties={("Line.Feeder33kV_1", "enabled"): "no"},
+            objects={"Fault.Test": "bus1=Bus220kV_1.1 phases=1 r=1"}
+        )):
+            session.solve()
+            assert "Fault.Test" in session.snapshot().objects
+
+        assert session.snapshot() == before
+        dss.Circuit.SetActiveElement("Line.Feeder33kV_1")
+        assert dss.CktElement.Enabled()
+        dss.Circuit.SetActiveElement("Fault.Test")
+        assert not dss.CktElement.Enabled()
+        assert session.stats['compiles'] == 1
+
+    def test_attached_circuit_rebuilt_after_clear(self):
+        """A command-built circuit should be rebuilt by its builder when replaced"""
+        def build():
+            dss.Text.Command("clear")
+            dss.Text.Command("new circuit.attached basekv=33 phases=3")
+            dss.Text.Command("new load.l1 bus1=sourcebus kv=33 kw=1000")
+
+        session = DSSCircuitSession(dss)
+        session.attach(build)
+        assert session.solve()
+
+        dss.Text.Command("clear")
+        assert session.solve()
+        assert session.stats['compiles'] == 2
+        assert dss.Circuit.Name() == "attached"
+
+
+class TestLoadFlowAnomalies:
+    """Test anomaly injection through the session"""
+
+    def test_voltage_sag_and_clear(self, load_flow):
+        """Voltage sag should lower voltages and clearing should restore them"""
+        baseline = load_flow.solve()
+
+        load_flow.set_anomaly('voltage_sag', {'severity': 0.85})
+        sagged = load_flow.solve()
+        assert sagged['voltage_400kv'] < baseline['voltage_400kv']
+
+        load_flow.clear_anomaly()
+        restored = load_flow.solve()
+        assert restored['voltage_400kv'] == pytest.approx(baseline['voltage_400kv'])
+
+    def test_ground_fault_reinjection(self, load_flow):
+        """Re-applying a fault anomaly should edit, not redefine, the fault object"""
+        load_flow.set_anomaly('ground_fault', {'resistance': 5})
+        load_flow.solve()
+        load_flow.clear_anomaly()
+        load_flow.solve()
+        load_flow.set_anomaly('ground_fault', {'resistance': 2})
+
+        result = load_flow.solve()
+
+        assert result['converged']
+        assert load_flow.session.stats['compiles'] == 1
+
+    def test_frequency_deviation(self, load_flow):
+        """Frequency deviation should be reflected in the solution"""
+        load_flow.set_anomaly('frequency_deviation', {'deviation': 0.5, 'type': 'under'})
+        assert load_flow.solve()['frequency'] == pytest.approx(49.5)
+
+        load_flow.clear_anomaly()
+        assert load_flow.solve()['frequency'] == pytest.approx(50.0)
+
+    def test_concurrent_anomalies(self, load_flow):
+        """Concurrent anomalies are combined into one solve and cleared independently"""
+        baseline = load_flow.solve()
+        sag = load_flow.set_anomaly('voltage_sag', {'severity': 0.9})
+        load_flow.set_anomaly('ground_fault', {'resistance': 5, 'location': 'Bus220kV_1'})
+        load_flow.set_anomaly('ground_fault', {'resistance': 5, 'location': 'Bus33kV_1'})
+        load_flow.set_anomaly('frequency_deviation', {'deviation': 0.2, 'type': 'under'})
+
+        combined = load_flow.solve()
+        names = load_flow.last_results.topology.element_names
+        assert combined['voltage_400kv'] < baseline['voltage_400kv']
+        assert combined['frequency'] == pytest.approx(49.8)
+        assert 'Fault.anomalyfault' in names and 'Fault.anomalyfault2' in names
+
+        load_flow.clear_anomaly(sag.id)
+        assert len(load_flow.active_anomalies()) == 3
+        load_flow.clear_anomaly()
+        restored = load_flow.solve()
+        assert restored['voltage_400kv'] == pytest.approx(baseline['voltage_400kv'])
+        assert load_flow.session.stats['compiles'] == 1
+
+    def test_timeline_playback(self, load_flow):
+        """A scripted timeline is solved step by step on the timeline clock"""
+        from simulation.anomaly_scheduler import AnomalyTimeline, run_timeline
+
+        timeline = AnomalyTimeline.from_dict({'anomalies': [
+            {'type': 'voltage_sag', 'parameters': {'severity': 0.8}, 'start': 60,
+             'duration': 240, 'ramp': 'linear', 'ramp_time': 120},
+        ]})
+        samples = run_timeline(load_flow, timeline, step=60)
+
+        voltages = [s['flow']['voltage_400kv'] for s in samples]
+        assert [s['t'] for s in samples] == [0, 60, 120, 180, 240, 300]
+        assert voltages[2] < voltages[1] and voltages[3] < voltages[2]
+        assert voltages[-1] == pytest.approx(voltages[0])
+
+
+class TestSolverService:
+    """Test the out-of-process solver service"""
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        """Identical requests in flight together should share one solve"""
+        import asyncio
+        from simulation.solver_service import SolverService
+
+        service = SolverService(workers=1)
+
+        async def run():
+            return await asyncio.gather(*[
+                service.solve(str(DSS_PATH.resolve()), "v1", None) for _ in range(4)
+            ])
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            service.shutdown()
+
+        assert all(r is results[0] for r in results)
+        assert results[0].flow['converged']
+        assert service.stats['solves'] == 1
+        assert service.stats['coalesced'] == 3
+
+    def test_worker_process_solve(self):
+        """A worker process should return the flow summary and element data"""
+        import asyncio
+        from simulation.solver_service import SolverService
+
+        service = SolverService(workers=1)
+        anomalies = [{'type': 'voltage_sag', 'parameters': {'severity': 0.85}}]
+
+        async def run():
+            normal = await service.solve(str(DSS_PATH.resolve()), "v1", None)
+            sagged = await service.solve(str(DSS_PATH.resolve()), "v1", anomalies)
+            return normal, sagged
+
+        try:
+            normal, sagged = asyncio.run(run())
+        finally:
+            service.shutdown()
+
+        assert normal.flow['converged']
+        assert sagged.flow['voltage_400kv'] < normal.flow['voltage_400kv']
+        assert 'bus400kv_1' in normal.elements['buses']['names']
+        assert 'Transformer.tx1_400_220' in normal.elements['elements']['names']
+
+    def test_worker_fault_levels(self, load_flow):
+        """Fault levels from a worker should match the in-process fault study"""
+        import asyncio
+        from simulation.solver_service import SolverService
+
+        service = SolverService(workers=1)
+
+        async def run():
+            return (await service.fault_levels(str(DSS_PATH.resolve()), "v1"),
+                    await service.fault_levels(str(DSS_PATH.resolve()), "v1", "nope"))
+
+        try:
+            levels, unknown = asyncio.run(run())
+        finally:
+            service.shutdown()
+
+        assert unknown is None
+        assert levels['bus33kv_1']['three_phase_ka'] == pytest.approx(
+            load_flow.get_fault_levels('bus33kv_1')['three_phase_ka'])
+
+
+class TestSolveResultCache:
+    """Test the shared solve-result cache"""
+
+    def test_hit_within_freshness_window(self):
+        """A second lookup for the same operating point should hit"""
+        from simulation.solve_cache import SolveResultCache
+
+        cache = SolveResultCache(freshness_seconds=60)
+        key = cache.make_key("v1", 0.95, None)
+        assert cache.get(key) is None
+        cache.put(key, "result")
+
+        assert cache.get(cache.make_key("v1", 0.95, None)) == "result"
+        assert cache.stats['hits'] == 1
+        assert cache.stats['misses'] == 1
+
+    def test_operating_point_changes_miss(self):
+        """Version, load multiplier and anomaly are all part of the key"""
+        from simulation.solve_cache import SolveResultCache
+
+        cache = SolveResultCache(freshness_seconds=60)
+        cache.put(cache.make_key("v1", 0.95, None), "result")
+
+        assert cache.get(cache.make_key("v2", 0.95, None)) is None
+        assert cache.get(cache.make_key("v1", 1.2, None)) is None
+        assert cache.get(cache.make_key("v1", 0.95, [{'type': 'voltage_sag', 'parameters': {}}])) is None
+
+    def test_stale_entries_expire(self):
+        """Results older than the freshness window should not be served"""
+        from simulation.solve_cache import SolveResultCache
+
+        cache = SolveResultCache(freshness_seconds=0)
+        key = cache.make_key("v1", 0.95, None)
+        cache.put(key, "result")
+
+        import time
+        time.sleep(0.01)
+        assert cache.get(key) is None
+
+
+class TestBulkExtraction:
+    """Test bulk result extraction against per-object OpenDSS reads"""
+
+    def test_bus_voltages_match_per_bus_reads(self, load_flow):
+        """Bulk node arrays should reproduce Bus.puVmagAngle for every bus"""
+        load_flow.set_anomaly('ground_fault', {'resistance': 5})
+        load_flow.solve()
+        results = load_flow.last_results
+
+        bulk = results.bus_vmag_angle()
+        for bus_name in dss.Circuit.AllBusNames():
+            dss.Circuit.SetActiveBus(bus_name)
+            assert bulk[bus_name] == pytest.approx(dss.Bus.puVmagAngle(), abs=1e-6)
+            assert results.topology.bus_kv_base[results.topology.bus_index[bus_name]] == pytest.approx(dss.Bus.kVBase())
+
+    def test_element_powers_match_per_element_reads(self, load_flow):
+        """Bulk PD powers/currents should match CktElement reads"""
+        load_flow.solve()
+        results = load_flow.last_results
+
+        for name in results.topology.pd_names:
+            dss.Circuit.SetActiveElement(name)
+            assert results.element_powers(name) == pytest.approx(dss.CktElement.Powers())
+            assert results.element_currents(name) == pytest.approx(dss.CktElement.Currents())
+
+    def test_topology_rebuilt_when_objects_added(self, load_flow):
+        """Injecting a new element should refresh the cached topology"""
+        load_flow.solve()
+        before = load_flow.last_results.topology
+
+        load_flow.set_anomaly('ground_fault', {'resistance': 5})
+        load_flow.solve()
+
+        assert load_flow.last_results.topology is not before
+        assert 'Fault.anomalyfault' in load_flow.last_results.topology.element_names
+
+
+@pytest.fixture(scope="class")
+def analyzer():
+    """Contingency analyzer with a two-process worker pool"""
+    from simulation.contingency import ContingencyAnalyzer
+    analyzer = ContingencyAnalyzer(workers=2)
+    yield analyzer
+    analyzer.shutdown()
+
+
+class TestContingencyAnalyzer:
+    """Test the parallel outage sweep"""
+
+    def test_n1_covers_every_line_and_transformer(self, analyzer):
+        """One case per enabled line/transformer, ranked by severity"""
+        sweep = analyzer.run(str(DSS_PATH.resolve()))
+        results = sweep['results']
+
+        candidates = analyzer.list_candidates(str(DSS_PATH.resolve()))
+        assert all(name.lower().startswith(('line.', 'transformer.')) for name in candidates)
+        assert sweep['summary']['n1_cases'] == len(candidates) == len(results)
+
+        severities = [r['severity'] for r in results]
+        assert severities == sorted(severities, reverse=True)
+
+    def test_radial_feeder_outage_islands_load(self, analyzer):
+        """Losing a radial 33 kV feeder should de-energise its downstream nodes"""
+        sweep = analyzer.run(str(DSS_PATH.resolve()))
+        case = next(r for r in sweep['results'] if r['outage'] == ['Line.feeder33kv_1'])
+
+        assert case['status'] == 'islanded'
+        assert case['islanded_nodes'] > 0
+
+    def test_n2_pairs_are_pruned(self, analyzer):
+        """N-2 should only pair outages whose N-1 case is insecure or near a limit"""
+        sweep = analyzer.run(str(DSS_PATH.resolve()), load_multiplier=0.8, n2=True)
+        summary = sweep['summary']
+        n = summary['n1_cases']
+
+        assert summary['n2_cases'] + summary['n2_pruned'] == n * (n - 1) // 2
+        assert summary['n2_pruned'] > 0
+        assert any(len(r['outage']) == 2 for r in sweep['results'])
+
+
+class TestFaultStudy:
+    """Test the cached OpenDSS fault study"""
+
+    def test_fault_levels_match_sequence_impedances(self, load_flow):
+        """3-phase level should equal V_LN / |Zsc1| at every bus"""
+        import numpy as np
+        levels = load_flow.get_fault_levels()
+
+        for bus_name in dss.Circuit.AllBusNames():
+            dss.Circuit.SetActiveBus(bus_name)
+            z1 = abs(complex(*dss.Bus.Zsc1()))
+            level = levels[bus_name]
+            assert level['three_phase_ka'] == pytest.approx(dss.Bus.kVBase() / z1, rel=1e-6)
+            assert level['single_phase_ka'] > 0 and level['line_to_line_ka'] > 0
+            assert level['line_to_line_ka'] == pytest.approx(level['three_phase_ka'] * np.sqrt(3) / 2)
+
+    def test_study_runs_once_per_version(self, load_flow):
+        """Repeated lookups should reuse the study until the cache is invalidated"""
+        load_flow.analyze_fault_current()
+        load_flow.analyze_fault_current(bus="bus33kv_1")
+        assert load_flow.fault_study.stats['studies'] == 1
+
+        load_flow.fault_study.invalidate()
+        load_flow.analyze_fault_current()
+        assert load_flow.fault_study.stats['studies'] == 2
+
+    def test_load_flow_unaffected_by_study(self, load_flow):
+        """The study must leave the circuit in load flow mode"""
+        before = load_flow.solve()['voltage_400kv']
+        load_flow.analyze_fault_current()
+        after = load_flow.solve()
+        assert after['converged']
+        assert after['voltage_400kv'] == pytest.approx(before)
+
+    def test_breaker_adequacy(self, load_flow):
+        """Margin and adequacy should follow the requested breaker rating"""
+        result = load_flow.analyze_fault_current(bus="bus33kv_1", breaker_rating_ka=1000.0)
+        assert result['three_phase_fault']['location'] == 'bus33kv_1'
+        assert result['adequate']
+        assert not load_flow.analyze_fault_current(bus="bus33kv_1", breaker_rating_ka=0.1)['adequate']
+
+    def test_bus_lookup(self, load_flow):
+        """Bus names are checked case-insensitively, ignoring node suffixes"""
+        assert load_flow.has_bus("Bus33kV_1.1.2.3")
+        assert not load_flow.has_bus("NoSuchBus")
+
+
+class TestDSSNetworkConversion:
+    """Test building the in-house network from the DSS model"""
+
+    def test_network_matches_model(self, load_flow):
+        """Buses, branches, loads and shunts should come from the compiled circuit"""
+        from simulation.dss_network import network_from_dss
+        network = network_from_dss(DSS_PATH.resolve(), session=load_flow.session)
+
+        assert set(network.buses) == set(dss.Circuit.AllBusNames())
+        assert network.buses['gridbus400kv'].type == 'Slack'
+        assert len(network.lines) == dss.Lines.Count()
+        assert len(network.transformers) == dss.Transformers.Count()
+        assert network.buses['loadbus33kv_1'].load_mw == pytest.approx(23.0)
+        assert network.buses['bus400kv_1'].shunt_mvar == pytest.approx(-50.0)
+        assert network.buses['bus33kv_1'].shunt_mvar == pytest.approx(10.0)
+        assert network.lines['feeder220kv_1'].get_impedance() == pytest.approx(complex(0.025, 0.05))
+        assert network.transformers['tx1_400_220'].rating_mva == pytest.approx(315.0)
+        # Reusing the caller's session must not recompile it
+        assert load_flow.session.stats['compiles'] == 1
+
+    def test_in_house_load_flow_tracks_opendss(self, load_flow):
+        """Newton-Raphson on the converted network should land near the OpenDSS solution"""
+        from simulation.dss_network import network_from_dss
+        from simulation.advanced_simulation import LoadFlowSolver
+        network = network_from_dss(DSS_PATH.resolve(), session=load_flow.session)
+        assert LoadFlowSolver(network).solve()['converged']
+
+        load_flow.session.apply(CircuitEditSet())
+        load_flow.session.solve()
+        source_pu = None
+        for bus_id, bus in network.buses.items():
+            dss.Circuit.SetActiveBus(bus_id)
+            opendss_pu = dss.Bus.puVmagAngle()[0]
+            source_pu = source_pu or opendss_pu  # slack bus is first; OpenDSS drops across the source
+            assert bus.voltage_pu * source_pu == pytest.approx(opendss_pu, abs=2e-3)
+
+    def test_cache_skips_conversion(self, tmp_path):
+        """A second lookup of unchanged content should load the .npz without compiling"""
+        from simulation.dss_network import NetworkCache
+        cache = NetworkCache(tmp_path)
+        first = cache.get(DSS_PATH.resolve())
+        session = DSSCircuitSession(dss)
+        second = cache.get(DSS_PATH.resolve(), session=session)
+
+        assert cache.stats == {'conversions': 1, 'hits': 1}
+        assert session.stats['compiles'] == 0
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+        assert list(second.buses) == list(first.buses)
+        assert (second.get_ybus() != first.get_ybus()).nnz == 0
+
+    def test_changed_content_converts_again(self, tmp_path):
+        """A new DSS version should get its own cache entry"""
+        from simulation.dss_network import NetworkCache
+        modified = tmp_path / "modified.dss"
+        modified.write_text(DSS_PATH.read_text().replace("kW=15000", "kW=16000"))
+        cache = NetworkCache(tmp_path / "cache")
+        cache.get(DSS_PATH.resolve())
+        network = cache.get(modified)
+
+        assert cache.stats['conversions'] == 2
+        assert network.buses['loadbus33kv_1'].load_mw == pytest.approx(24.0)
+
+
+    def test_off_step_tap_ratio_is_exact(self, tmp_path):
+        """A DSS tap between 1.25 % steps should be kept exactly, not rounded to a step"""
+        from simulation.dss_network import NetworkCache
+        modified = tmp_path / "tapped.dss"
+        modified.write_text(DSS_PATH.read_text().replace(
+            "~ KVs=(400 220)\n", "~ KVs=(400 220)\n~ Taps=(1.013 1.0)\n", 1))
+        cache = NetworkCache(tmp_path / "cache")
+        converted = cache.get(modified)
+        cached = cache.get(modified)
+
+        for network in (converted, cached):
+            transformer = network.transformers['tx1_400_220']
+            assert transformer.get_tap_ratio() == pytest.approx(1.013)
+            assert transformer.tap_position == 1
+
+class TestQSTS:
+    """Test the quasi-static time-series mode"""
+
+    def test_steps_follow_load_profile(self, load_flow):
+        """Each step should match a snapshot solve at that step's load multiplier"""
+        from datetime import datetime
+        start = datetime(2024, 5, 1)
+        result = load_flow.run_qsts(start=start, hours=48)
+
+        assert result['summary']['steps'] == 48
+        assert result['summary']['non_converged'] == 0
+        assert result['load_multiplier'][18] == pytest.approx(
+            load_flow.get_realistic_load_factor(datetime(2024, 5, 1, 18)))
+
+        step = 18
+        load_flow.session.apply(CircuitEditSet(options={'loadmult': float(result['load_multiplier'][step])}))
+        load_flow.session.solve()
+        assert result['total_power_kw'][step] == pytest.approx(dss.Circuit.TotalPower()[0], rel=1e-3)
+
+    def test_results_streamed_in_chunks(self, load_flow):
+        """on_chunk should receive every step, chunk_steps at a time"""
+        chunks = []
+        load_flow.run_qsts(hours=24, step_minutes=30, chunk_steps=20, on_chunk=chunks.append)
+
+        assert [len(c) for c in chunks] == [20, 20, 8]
+        assert [row['step'] for c in chunks for row in c] == list(range(48))
+
+    def test_snapshot_solve_restored(self, load_flow):
+        """A snapshot solve after QSTS should be unchanged"""
+        before = load_flow.solve()
+        load_flow.run_qsts(hours=24)
+        after = load_flow.solve()
+
+        assert after['converged']
+        assert after['total_power_kw'] == pytest.approx(before['total_power_kw'], rel=1e-3)
+        assert after['voltage_220kv'] == pytest.approx(before['voltage_220kv'], rel=1e-4)
+
+
+class TestOpenDSSAnomalySimulator:
+    """Test anomaly injection without recompiles"""
+
+    @pytest.fixture
+    def simulator(self):
+        from simulation.opendss_anomaly_simulator import OpenDSSAnomalySimulator
+        return OpenDSSAnomalySimulator(str(DSS_PATH.resolve()))
+
+    def test_repeated_injections_reuse_circuit(self, simulator):
+        """Injecting the same anomaly twice should edit, not re-create or recompile"""
+        compiles = simulator.session.stats['compiles']
+        deep = simulator.inject_voltage_sag('Bus220_1', 0.6)
+        shallow = simulator.inject_voltage_sag('Bus220_1', 0.9)
+
+        assert simulator.session.stats['compiles'] == compiles
+        assert deep['summary']['total_power_kw'] != shallow['summary']['total_power_kw']
+
+    def test_circuit_restored_after_anomalies(self, simulator):
+        """Each injection and scenario should leave the baseline circuit behind"""
+        simulator.session.solve()
+        baseline = simulator._capture_system_state()['summary']['total_power_kw']
+
+        simulator.inject_ground_fault('Bus220_1')
+        simulator.inject_capacitor_switching('Cap220_1')
+        simulator.run_anomaly_scenario('cascading_failure')
+
+        simulator.session.solve()
+        restored = simulator._capture_system_state()['summary']['total_power_kw']
+        assert restored == pytest.approx(baseline, rel=1e-4)
+        assert simulator.session.snapshot() == CircuitEditSet()
+
+    def test_feature_vector(self, simulator):
+        """Every state carries a fixed-width float32 vector with live voltage and current features"""
+        import numpy as np
+        from simulation.anomaly_features import FEATURE_NAMES
+
+        simulator.session.solve()
+        state = simulator._capture_system_state()
+        features = dict(zip(FEATURE_NAMES, state['features']))
+
+        assert state['features'].dtype == np.float32
+        assert state['features'].shape == (len(FEATURE_NAMES),)
+        assert 0.5 < features['voltage_mag_mean'] < 2.0
+        assert features['voltage_mag_min'] <= features['voltage_mag_max']
+        assert features['current_mag_max'] > 0
+        assert features['voltage_unbalance_zero_max'] < 1e-3
+
+        row = simulator._extract_features(state)
+        assert list(row)[3:] == FEATURE_NAMES
+
+    def test_fault_and_harmonic_features(self, simulator):
+        """A ground fault shows up as unbalance, injected harmonics as THD"""
+        from simulation.anomaly_features import FEATURE_NAMES
+
+        fault = dict(zip(FEATURE_NAMES, simulator.inject_ground_fault('Bus220_1')['features']))
+        assert fault['voltage_imbalance_max'] > 0.1
+        assert fault['voltage_unbalance_zero_max'] > 0.1
+
+        harmonic = simulator.inject_harmonic_distortion('Bus220_1', {3: 0.03, 5: 0.05})
+        thd = dict(zip(FEATURE_NAMES, harmonic['features']))
+        assert harmonic['harmonics']['orders'] == [3, 5]
+        assert 0 < thd['thd_voltage_mean'] <= thd['thd_voltage_max']
+        assert max(harmonic['harmonics']['thd_voltage'].values()) == pytest.approx(thd['thd_voltage_max'], rel=1e-4)
+
+        # Harmonic orders and solution mode are reverted with the injection
+        assert simulator.session.snapshot() == CircuitEditSet()
+        dss.Text.Command("get harmonics")
+        assert dss.Text.Result().upper() == "ALL"
+
+
+class TestAnomalyDatasetGenerator:
+    """Test sharded, streamed anomaly dataset generation"""
+
+    def test_same_seed_same_dataset_across_worker_counts(self, tmp_path):
+        """Per-shard seeding makes the samples independent of how shards are spread"""
+        import numpy as np
+        import pandas as pd
+        pytest.importorskip("pyarrow")
+        from simulation.anomaly_dataset import AnomalyDatasetGenerator
+
+        # Both in fresh worker processes, so no engine state of this test process leaks in
+        two_workers = AnomalyDatasetGenerator(str(DSS_PATH.resolve()), workers=2, shard_size=10, seed=3)
+        three_workers = AnomalyDatasetGenerator(str(DSS_PATH.resolve()), workers=3, shard_size=10, seed=3)
+        stats_2 = two_workers.generate(40, tmp_path / "two.parquet")
+        stats_3 = three_workers.generate(40, tmp_path / "three.parquet")
+
+        a = pd.read_parquet(tmp_path / "two.parquet").sort_values('sample_id').reset_index(drop=True)
+        b = pd.read_parquet(tmp_path / "three.parquet").sort_values('sample_id').reset_index(drop=True)
+        assert stats_2['anomaly_types'] == stats_3['anomaly_types']
+        assert stats_2['total_samples'] == len(a) == len(b)
+        for column in ('sample_id', 'label', 'anomaly_type'):
+            assert (a[column] == b[column]).all()
+        # Solver warm starts differ between processes, so values agree to solver tolerance
+        numeric = a.columns.drop(['sample_id', 'label', 'anomaly_type', 'timestamp'])
+        assert np.allclose(a[numeric], b[numeric], rtol=1e-3, equal_nan=True)
+
+    def test_csv_written_in_chunks_with_progress(self, tmp_path):
+        """Each shard is appended to the CSV and reported as it completes"""
+        import pandas as pd
+        from simulation.anomaly_dataset import AnomalyDatasetGenerator, DATASET_COLUMNS
+
+        reports = []
+        generator = AnomalyDatasetGenerator(str(DSS_PATH.resolve()), workers=1, shard_size=8, seed=1)
+        stats = generator.generate(20, tmp_path / "data.csv", format='csv', progress=reports.append)
+
+        dataset = pd.read_csv(tmp_path / "data.csv")
+        assert list(dataset.columns) == DATASET_COLUMNS
+        assert len(dataset) == stats['total_samples']
+        assert stats['normal_samples'] + stats['anomaly_samples'] == stats['total_samples']
+        assert [r['completed_shards'] for r in reports] == [1, 2, 3]
+        assert reports[-1]['samples_written'] == stats['total_samples']
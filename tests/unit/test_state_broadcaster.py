@@ -0,0 +1,107 @@
+"""
+Unit tests for the shared state broadcaster
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from services.state_broadcaster import StateBroadcaster
+
+
+class Counter:
+    """Producer that numbers its snapshots"""
+
+    def __init__(self, fail_on=()):
+        self.calls = 0
+        self.fail_on = set(fail_on)
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls in self.fail_on:
+            raise RuntimeError("capture failed")
+        return self.calls
+
+
+class TestStateBroadcaster:
+    """Fan-out, bounded queues and pausing"""
+
+    def test_one_capture_per_tick_for_all_subscribers(self):
+        produce = Counter()
+
+        async def run():
+            stream = StateBroadcaster(produce, interval=0.01)
+            queues = [stream.subscribe() for _ in range(5)]
+            received = [[await queue.get() for _ in range(3)] for queue in queues]
+            for queue in queues:
+                stream.unsubscribe(queue)
+            return received
+
+        received = asyncio.run(run())
+        assert all(snapshots == [1, 2, 3] for snapshots in received)
+        assert produce.calls <= 5
+
+    def test_slow_subscriber_keeps_newest(self):
+        async def run():
+            stream = StateBroadcaster(Counter(), interval=0.005, queue_size=2)
+            slow = stream.subscribe()
+            fast = stream.subscribe()
+            for _ in range(8):
+                await fast.get()
+            assert slow.qsize() <= 2
+            snapshots = [slow.get_nowait() for _ in range(slow.qsize())]
+            stream.unsubscribe(slow)
+            stream.unsubscribe(fast)
+            return stream, snapshots
+
+        stream, snapshots = asyncio.run(run())
+        assert snapshots == sorted(snapshots) and snapshots[-1] >= 7
+        assert stream.stats['dropped'] >= 5
+
+    def test_pauses_without_subscribers(self):
+        produce = Counter()
+
+        async def run():
+            stream = StateBroadcaster(produce, interval=0.01)
+            queue = stream.subscribe()
+            await queue.get()
+            stream.unsubscribe(queue)
+            await asyncio.sleep(0.05)
+            paused_calls = produce.calls
+            assert not stream.is_running
+            await asyncio.sleep(0.05)
+            assert produce.calls == paused_calls
+
+            # Resumes on the next subscriber, which first gets no stale snapshot
+            queue = stream.subscribe()
+            assert queue.empty()
+            assert await queue.get() == paused_calls + 1
+            stream.stop()
+
+        asyncio.run(run())
+
+    def test_errors_do_not_stop_the_stream(self):
+        async def run():
+            stream = StateBroadcaster(Counter(fail_on={2}), interval=0.005)
+            queue = stream.subscribe()
+            snapshots = [await queue.get() for _ in range(2)]
+            stream.stop()
+            return stream, snapshots
+
+        stream, snapshots = asyncio.run(run())
+        assert snapshots == [1, 3]
+        assert stream.stats['errors'] == 1
+
+    def test_new_subscriber_gets_fresh_snapshot(self):
+        async def run():
+            stream = StateBroadcaster(Counter(), interval=10)
+            first = stream.subscribe()
+            assert await first.get() == 1
+            second = stream.subscribe()
+            snapshot = second.get_nowait()
+            stream.stop()
+            return snapshot
+
+        assert asyncio.run(run()) == 1